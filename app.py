@@ -7,9 +7,9 @@ from office_addins_mcp_server/server.py for Azure App Service deployment.
 
 from __future__ import annotations
 
+import asyncio
 import logging
 import os
-import sys
 from pathlib import Path
 
 import contextlib
@@ -18,10 +18,26 @@ from contextlib import asynccontextmanager
 from dotenv import load_dotenv
 from starlette.applications import Starlette
 from starlette.middleware.cors import CORSMiddleware
-from starlette.routing import Mount
+from starlette.routing import Mount, Route
+
+from office_addins_mcp_server.logs import configure_logging
 
 # Import the MCP server creation function
 from office_addins_mcp_server.server import create_mcp_server
+from office_addins_mcp_server.tools import upstream
+from office_addins_mcp_server.tools.cache_backends import shared_cache
+from office_addins_mcp_server.tools.changelog import (
+    CATALOG_REFRESH_INTERVAL,
+    run_periodic_refresh,
+)
+from office_addins_mcp_server.web import (
+    AdmissionController,
+    AdmissionMiddleware,
+    CompressionMiddleware,
+    admin_routes,
+    icon_endpoint,
+    metrics_endpoint,
+)
 
 
 # Lifespan context manager to start/stop the MCP session manager with the FastAPI app
@@ -29,6 +45,14 @@ from office_addins_mcp_server.server import create_mcp_server
 async def mcp_lifespan(app):
     async with contextlib.AsyncExitStack() as stack:
         await stack.enter_async_context(mcp.session_manager.run())
+        # Close the pooled Office Add-ins API client on shutdown
+        stack.push_async_callback(upstream.aclose)
+        if shared_cache is not None:
+            stack.push_async_callback(shared_cache.close)
+        if CATALOG_REFRESH_INTERVAL > 0:
+            # Periodic full scans feed the change log behind get_catalog_changes
+            refresh = asyncio.create_task(run_periodic_refresh(CATALOG_REFRESH_INTERVAL))
+            stack.callback(refresh.cancel)
         yield
 
 
@@ -60,13 +84,7 @@ def load_app_config() -> dict:
 
 
 # Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.StreamHandler(sys.stdout)
-    ]
-)
+configure_logging()
 logger = logging.getLogger("office-addins-mcp-server-app")
 
 
@@ -74,16 +92,54 @@ logger = logging.getLogger("office-addins-mcp-server-app")
 mcp = create_mcp_server()
 
 
+# Admission control for tool calls: a global concurrency cap with a bounded
+# wait queue, plus per-session and per-client-IP limits.  Calls over the limit
+# fail fast with a retryable JSON-RPC error.
+admission = AdmissionController(
+    max_concurrent=int(os.getenv("ADMISSION_MAX_CONCURRENT", "16")),
+    max_queue=int(os.getenv("ADMISSION_MAX_QUEUE", "64")),
+    queue_timeout=float(os.getenv("ADMISSION_QUEUE_TIMEOUT", "5")),
+    per_session=int(os.getenv("ADMISSION_PER_SESSION", "4")),
+    per_client=int(os.getenv("ADMISSION_PER_CLIENT", "8")),
+)
+
+
+# Diagnostics (profiling, task dump, allocation tracing) are only mounted
+# when an admin token is configured.
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN")
+admin_mounts = [Mount("/admin", routes=admin_routes(ADMIN_TOKEN))] if ADMIN_TOKEN else []
+
+
 # Create the Starlette application
 app = Starlette(
     # debug=config.get("debug", False),
     routes=[
         # Mount the MCP server at /addins path
-        Mount("/addins", app=mcp.streamable_http_app()),
+        Mount(
+            "/addins",
+            app=AdmissionMiddleware(
+                mcp.streamable_http_app(),
+                admission,
+                # Proxies appending the caller's address to X-Forwarded-For
+                # (1 behind the App Service front ends)
+                trusted_proxies=int(os.getenv("ADMISSION_TRUSTED_PROXIES", "0")),
+            ),
+        ),
+        Route("/metrics", metrics_endpoint),
+        # Cached proxy for the store's add-in icons (optionally thumbnailed)
+        Route("/icons/{asset_id}", icon_endpoint),
+        *admin_mounts,
     ],
     lifespan=mcp_lifespan
 )
 
+# Compress MCP responses (including SSE streams) with brotli or gzip.  Small
+# responses are sent as-is; see COMPRESSION_MIN_SIZE.
+app = CompressionMiddleware(
+    app,
+    minimum_size=int(os.getenv("COMPRESSION_MIN_SIZE", "1024")),
+)
+
 # Wrap ASGI application with CORS middleware to expose Mcp-Session-Id header
 # for browser-based clients (ensures 500 errors get proper CORS headers)
 app = CORSMiddleware(
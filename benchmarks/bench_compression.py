@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Benchmark: response compression
+===============================
+
+Measures the bytes sent and the end-to-end latency of a ``top=50`` search
+result served as an MCP JSON response and as an SSE event, with and without
+CompressionMiddleware.  Transfer time is modelled for a constrained link
+(``--mbps``) on top of the measured server-side time.
+
+Run with: ``uv run python -m benchmarks.bench_compression``
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import time
+
+import httpx
+from starlette.applications import Starlette
+from starlette.responses import Response, StreamingResponse
+from starlette.routing import Route
+
+from benchmarks.payloads import search_response
+from office_addins_mcp_server.web.compression import CompressionMiddleware
+
+
+def build_app(body: bytes) -> Starlette:
+    async def json_endpoint(request):
+        return Response(body, media_type="application/json")
+
+    async def sse_endpoint(request):
+        async def stream():
+            yield b"event: message\ndata: " + body + b"\n\n"
+
+        return StreamingResponse(stream(), media_type="text/event-stream")
+
+    return Starlette(routes=[Route("/json", json_endpoint), Route("/sse", sse_endpoint)])
+
+
+async def measure(app, path: str, accept_encoding: str, rounds: int) -> tuple[int, float]:
+    """Return (bytes on the wire, mean server-side seconds) for ``path``."""
+    transport = httpx.ASGITransport(app=app)
+    wire = 0
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        started = time.perf_counter()
+        for _ in range(rounds):
+            async with client.stream("GET", path, headers={"Accept-Encoding": accept_encoding}) as response:
+                wire = sum([len(chunk) async for chunk in response.aiter_raw()])
+        elapsed = (time.perf_counter() - started) / rounds
+    return wire, elapsed
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--top", type=int, default=50)
+    parser.add_argument("--rounds", type=int, default=200)
+    parser.add_argument("--mbps", type=float, default=2.0, help="modelled link bandwidth")
+    args = parser.parse_args()
+
+    # MCP wraps the tool result as JSON text inside a JSON-RPC message.
+    result = json.dumps(search_response(top=args.top))
+    body = json.dumps({"jsonrpc": "2.0", "id": 1, "result": {"content": [{"type": "text", "text": result}]}}).encode()
+    plain = build_app(body)
+    compressed = CompressionMiddleware(plain)
+
+    print(f"payload: top={args.top}, {len(body)} bytes, link {args.mbps} Mbit/s")
+    print(f"{'path':6} {'encoding':9} {'bytes':>9} {'server ms':>10} {'total ms':>9}")
+    for path in ("/json", "/sse"):
+        for label, app, encoding in (
+            ("none", plain, "identity"),
+            ("gzip", compressed, "gzip"),
+            ("br", compressed, "br"),
+        ):
+            wire, seconds = await measure(app, path, encoding, args.rounds)
+            transfer = wire * 8 / (args.mbps * 1_000_000)
+            print(f"{path:6} {label:9} {wire:9d} {seconds * 1000:10.2f} {(seconds + transfer) * 1000:9.1f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Benchmark: upstream replay
+==========================
+
+Replays every request recorded in a cassette through :mod:`tools.upstream`
+(limiter, retries and pooled client included) at several concurrency
+levels, with the recorded latencies scaled by ``--latency-scale``, and
+reports the wall time and per-request latency percentiles of each level.
+
+Record a cassette against the live API first, for example::
+
+    ADDINS_UPSTREAM_MODE=record ADDINS_UPSTREAM_CASSETTE=traffic.jsonl.gz \
+        uv run office-addins-mcp-server
+
+Run with: ``uv run python -m benchmarks.bench_replay --cassette traffic.jsonl.gz``
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+
+from office_addins_mcp_server.tools import cassette, upstream
+
+
+async def replay(entries: list[dict], concurrency: int) -> tuple[float, list[float]]:
+    """Return the wall time and per-request latencies of one replay, in ms."""
+    upstream.MAX_CONCURRENCY = concurrency
+    # The next request binds a client with the new limits.
+    await upstream.aclose()
+    prefix = upstream.API_BASE_URL + "/"
+
+    async def one(entry: dict) -> float:
+        started = time.perf_counter()
+        url = httpx.URL(entry["url"])
+        if entry["url"].startswith(prefix):
+            path = str(url.copy_with(query=None))[len(prefix):]
+            params = dict(url.params.multi_items())
+            try:
+                await upstream.get_json(path, params=params, headers=entry.get("headers") or None)
+            except (httpx.HTTPStatusError, ValueError):
+                pass  # Recorded error responses are part of the traffic.
+        else:
+            try:
+                await upstream.get_bytes(entry["url"])
+            except httpx.HTTPStatusError:
+                pass
+        return (time.perf_counter() - started) * 1000
+
+    started = time.perf_counter()
+    latencies = await asyncio.gather(*(one(entry) for entry in entries))
+    return (time.perf_counter() - started) * 1000, latencies
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--cassette", required=True)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 8, 16])
+    parser.add_argument("--latency-scale", type=float, default=1.0)
+    args = parser.parse_args()
+
+    entries = cassette.load_cassette(args.cassette)
+    cassette.CASSETTE_MODE = "replay"
+    cassette.CASSETTE_PATH = args.cassette
+    cassette.REPLAY_LATENCY_SCALE = args.latency_scale
+    upstream.RETRY_BACKOFF = 0
+
+    recorded = sum(entry.get("latency_ms", 0) for entry in entries)
+    print(f"cassette: {len(entries)} exchanges, {recorded:.0f} ms recorded, scale x{args.latency_scale:g}")
+    print(f"{'concurrency':>11} {'wall ms':>9} {'p50 ms':>8} {'p95 ms':>8}")
+    for concurrency in args.concurrency:
+        wall, latencies = await replay(entries, concurrency)
+        p50 = statistics.median(latencies)
+        p95 = statistics.quantiles(latencies, n=20)[-1] if len(latencies) > 1 else p50
+        print(f"{concurrency:>11} {wall:9.1f} {p50:8.1f} {p95:8.1f}")
+    await upstream.aclose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Benchmark: addin_stats under catalog churn
+==========================================
+
+Interleaves catalog updates (as made by every search and details response
+bringing a new or changed record) with ``addin_stats`` calls over a large
+catalog, and reports how often the catalog columns were rebuilt and the
+mean time per ``addin_stats`` call, for several column staleness limits.
+Simulated time advances by ``--interval`` seconds per round; ``0``
+staleness rebuilds on every catalog change.
+
+Run with: ``uv run python -m benchmarks.bench_stats``
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import random
+import time
+
+from office_addins_mcp_server.tools import stats
+from office_addins_mcp_server.tools.catalog import catalog
+
+
+def make_record(index: int, rng: random.Random) -> dict:
+    return {
+        "Id": f"WA{100000000 + index}",
+        "ProviderName": f"Provider {index % 300}",
+        "Rating": rng.choice([None, 1.0, 2.5, 3.0, 4.5, 5.0]),
+        "NumberOfVotes": rng.randrange(0, 500),
+        "DateReleased": f"{rng.randrange(2015, 2026)}-01-01T00:00:00",
+        "Pricing": {"Category": rng.choice(["Free", "Paid", "Freemium"])},
+        "Categories": [{"Id": f"Cat{rng.randrange(20)}"} for _ in range(rng.randrange(3))],
+        "SupportedClients": [{"Client": "Win32_Outlook"}, {"Client": "Win32_Excel"}][: rng.randrange(1, 3)],
+    }
+
+
+class SimulatedClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+async def run(records: int, rounds: int, interval: float, staleness: float) -> tuple[int, float]:
+    """Return the column rebuilds and the mean milliseconds per addin_stats call."""
+    rng = random.Random(11)
+    catalog.clear()
+    catalog.add_records(make_record(i, rng) for i in range(records))
+    clock = SimulatedClock()
+    stats.columns_cache = stats.ColumnsCache(max_staleness=staleness, clock=clock)
+    await stats.addin_stats()
+
+    before = stats.column_rebuilds_total.value()
+    elapsed = 0.0
+    for round_ in range(rounds):
+        clock.now += interval
+        # A search response bringing one new record.
+        catalog.add_records([make_record(records + round_, rng)])
+        started = time.perf_counter()
+        await stats.addin_stats(group_by=stats.STATS_GROUPS[round_ % len(stats.STATS_GROUPS)])
+        elapsed += time.perf_counter() - started
+    return int(stats.column_rebuilds_total.value() - before), elapsed / rounds * 1000
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--records", type=int, default=20000)
+    parser.add_argument("--rounds", type=int, default=100)
+    parser.add_argument("--interval", type=float, default=0.5)
+    parser.add_argument("--staleness", type=float, nargs="+", default=[0, 5, 30])
+    args = parser.parse_args()
+
+    engine = "arrow" if stats.pyarrow is not None else "python"
+    print(f"catalog: {args.records} records, {args.rounds} rounds every {args.interval:g}s, {engine}")
+    print(f"{'staleness s':>11} {'rebuilds':>9} {'ms/call':>8}")
+    for staleness in args.staleness:
+        rebuilds, milliseconds = await run(args.records, args.rounds, args.interval, staleness)
+        print(f"{staleness:>11g} {rebuilds:>9} {milliseconds:8.2f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Benchmark: structured tool output
+=================================
+
+Measures the server-side cost of turning a ``search_addins`` result into a
+``tools/call`` response, from the tool's return to the CallToolResult:
+
+- ``unstructured``: the tool returns a ``dict`` without an output schema
+  (text content only);
+- ``sdk``: the tool is typed with :class:`SearchResult` and served by the
+  SDK's handler (model round trip plus JSON Schema validation);
+- ``strict`` / ``sample`` / ``off``: the same typed tool served by
+  :func:`install_structured_output` in each validation mode.
+
+Run with: ``uv run python -m benchmarks.bench_structured_output``
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+
+from mcp import types
+from mcp.server.fastmcp import FastMCP
+
+from benchmarks.payloads import search_response
+from office_addins_mcp_server.structured_output import OutputValidator, install_structured_output
+from office_addins_mcp_server.tools.models import SearchResult
+
+
+def build_server(payload: dict, typed: bool, mode: str | None) -> FastMCP:
+    mcp = FastMCP("bench")
+
+    if typed:
+
+        async def search() -> SearchResult:
+            return payload
+
+    else:
+
+        async def search() -> dict:
+            return payload
+
+    mcp.tool(name="search")(search)
+    if mode is not None:
+        install_structured_output(mcp, OutputValidator(mode, sample_rate=0.01))
+    return mcp
+
+
+async def measure(mcp: FastMCP, rounds: int) -> float:
+    """Return the mean milliseconds per tools/call."""
+    handler = mcp._mcp_server.request_handlers[types.CallToolRequest]
+    request = types.CallToolRequest(
+        method="tools/call", params=types.CallToolRequestParams(name="search", arguments={})
+    )
+    # Warm up the tool definition cache and pydantic validators.
+    assert not (await handler(request)).root.isError
+    started = time.perf_counter()
+    for _ in range(rounds):
+        await handler(request)
+    return (time.perf_counter() - started) / rounds * 1000
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--top", type=int, default=50)
+    parser.add_argument("--rounds", type=int, default=200)
+    args = parser.parse_args()
+
+    payload = search_response(top=args.top)
+    print(f"payload: top={args.top}")
+    print(f"{'path':13} {'ms/call':>8}")
+    for label, typed, mode in (
+        ("unstructured", False, None),
+        ("sdk", True, None),
+        ("strict", True, "strict"),
+        ("sample", True, "sample"),
+        ("off", True, "off"),
+    ):
+        milliseconds = await measure(build_server(payload, typed, mode), args.rounds)
+        print(f"{label:13} {milliseconds:8.2f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,93 @@
+"""
+Stand-in Office Add-ins API payloads
+====================================
+
+Deterministic, realistically shaped search responses used by the
+benchmarks in this folder, so they can run without access to the live
+Office Add-ins API.  Records follow the response format documented in
+docs/Office-AddIns-Search-API-Guide.md.
+"""
+
+from __future__ import annotations
+
+import random
+
+CATEGORIES = ["Productivity", "Communication", "Education", "Reference", "Data Analytics"]
+CLIENTS = [
+    ("Win32_Excel", "Excel 2013 Service Pack 1 or later on Windows"),
+    ("Mac_Excel", "Excel 2016 or later on Mac"),
+    ("WAC_Excel", "Excel on the web"),
+    ("Win32_Word", "Word 2013 or later on Windows"),
+    ("Win32_Outlook", "Outlook 2013 or later on Windows"),
+    ("WAC_PowerPoint", "PowerPoint on the web"),
+]
+WORDS = "calendar date picker chart mail sign meeting zoom template translate data report".split()
+
+
+def make_record(index: int, rng: random.Random) -> dict:
+    """Return one add-in record with every documented field populated."""
+    asset_id = f"WA{104300000 + index}"
+    title = " ".join(rng.sample(WORDS, 3)).title()
+    free = rng.random() < 0.6
+    return {
+        "Id": asset_id,
+        "Title": title,
+        "ShortDescription": f"{title} helps you work faster with " + " ".join(rng.choices(WORDS, k=12)) + ".",
+        "IconUrl": f"https://store-images.s-microsoft.com/image/apps.{index}.{rng.getrandbits(64):016x}",
+        "Rating": round(rng.uniform(1, 5), 14),
+        "NumberOfVotes": rng.randint(0, 5000),
+        "DateReleased": f"20{rng.randint(12, 25):02d}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}T12:00:00Z",
+        "LastUpdatedDate": f"2025-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}T05:49:21Z",
+        "ProductId": f"{rng.getrandbits(32):08x}-6d0d-4397-b4d3-{rng.getrandbits(48):012x}",
+        "ManifestUrl": f"https://addinsinstallation.store.office.com/app/download?assetid={asset_id}&cmu=en-US",
+        "Culture": "en-US",
+        "State": "Ok",
+        "Version": f"1.{rng.randint(0, 9)}.0",
+        "Shape": 1,
+        "Width": 240,
+        "Height": 220,
+        "Pricing": {
+            "Category": "Free" if free else "Paid",
+            "FreeType": "AppFree" if free else "None",
+            "SiteLicenseAvailable": False,
+            "Price": "Free" if free else f"{rng.randint(1, 50)}.99",
+            "Currency": "USD",
+            "SupportsTrial": not free,
+            "IsUnlimitedTrial": False,
+            "TrialLength": -1,
+        },
+        "Categories": [
+            {"Id": c, "Title": c, "LongTitle": f"Discover great {c.lower()} content"}
+            for c in rng.sample(CATEGORIES, 2)
+        ],
+        "SupportedClients": [
+            {"Client": c, "MinVersion": "15.0.4535.1511", "DisplayName": d}
+            for c, d in rng.sample(CLIENTS, 3)
+        ],
+        "Permissions": [
+            {
+                "Id": "ReadWrite Document",
+                "Description": "Can read and make changes to your document",
+                "LongDescription": None,
+            }
+        ],
+        "Certification": {"State": None, "Id": None, "Uri": None, "Description": None},
+        "ProviderName": f"Provider {index % 97}",
+        "LicenseTermsUrl": "https://go.microsoft.com/fwlink/?LinkID=521715&omkt=en-US",
+        "PrivacyPolicyUrl": f"https://provider{index % 97}.example.com/privacy.html",
+        "SupportUrl": f"https://provider{index % 97}.example.com/support",
+        "ExtendedPermissions": [],
+        "LeadEnabled": False,
+        "ActiveDirectoryAppId": None,
+        "ActiveDirectoryScopes": [],
+        "AutorunLaunchEvents": [],
+        "IsMetaOSApp": None,
+        "Successor": None,
+        "Predecessors": [],
+    }
+
+
+def search_response(top: int = 50, total: int = 2000, seed: int = 0) -> dict:
+    """Return a search response with ``top`` records."""
+    rng = random.Random(seed)
+    return {"TotalCount": total, "Values": [make_record(i, rng) for i in range(top)]}
@@ -0,0 +1,312 @@
+"""
+Office Add‑ins MCP Logging
+==========================
+
+Non-blocking, structured logging for the server.
+
+Log calls on the event loop only stamp the record with the current
+correlation IDs, apply sampling and rate limits, and put it on a bounded
+queue.  A background :class:`logging.handlers.QueueListener` thread formats
+the message (``%``-style arguments are only interpolated there) and writes
+one JSON object per line to the output stream.  If the stream stalls and the
+queue fills up, records are dropped and counted instead of blocking the
+event loop.
+
+Each tool call runs in a :func:`log_context` that assigns a ``call_id``;
+every record logged while handling the call, including those of the upstream
+requests it makes (and of tasks it spawns), carries the same ``call_id``,
+``tool`` and MCP ``request_id``.
+
+Configuration is read from the environment:
+
+- ``LOG_LEVEL``: minimum level (default ``INFO``)
+- ``LOG_FORMAT``: ``json`` (default) or ``text``
+- ``LOG_RATE`` / ``LOG_BURST``: sustained records per second and burst
+  allowed per message type below WARNING (default 20 / 100; 0 disables)
+- ``LOG_SAMPLE``: per-logger sampling fractions for records below WARNING,
+  e.g. ``office-addins-mcp.upstream=0.1``
+"""
+
+from __future__ import annotations
+
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import sys
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import IO, Iterator, Optional
+
+from office_addins_mcp_server.metrics import registry
+
+
+# Records waiting for the writer thread before new ones are dropped.
+LOG_QUEUE_SIZE = 10_000
+
+dropped_total = registry.counter(
+    "addins_log_dropped_total",
+    "Log records dropped before being written.",
+    labelnames=("reason",),
+)
+
+# Correlation fields of the current tool call.
+_context: ContextVar[dict] = ContextVar("addins_log_context", default={})
+
+# LogRecord attributes that are not user-supplied ``extra`` fields.
+_RECORD_ATTRIBUTES = frozenset(
+    vars(logging.LogRecord("", 0, "", 0, "", None, None)).keys()
+) | {"message", "asctime", "dropped"}
+
+_listener: Optional[logging.handlers.QueueListener] = None
+_handler: Optional[logging.Handler] = None
+
+
+def new_call_id() -> str:
+    return uuid.uuid4().hex[:16]
+
+
+@contextmanager
+def log_context(**fields) -> Iterator[dict]:
+    """Attach correlation ``fields`` to every record logged in this context.
+
+    A ``call_id`` is generated unless one is given.  Nested contexts extend
+    the enclosing one.
+    """
+    merged = {**_context.get(), **{k: v for k, v in fields.items() if v is not None}}
+    merged.setdefault("call_id", new_call_id())
+    token = _context.set(merged)
+    try:
+        yield merged
+    finally:
+        _context.reset(token)
+
+
+def current_context() -> dict:
+    """Return the correlation fields of the current context."""
+    return _context.get()
+
+
+class CorrelationFilter(logging.Filter):
+    """Copy the current correlation fields onto each record.
+
+    Runs in the thread that logs, before the record is queued, while the
+    caller's context variables are still visible.
+    """
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        for key, value in _context.get().items():
+            if not hasattr(record, key):
+                setattr(record, key, value)
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """Per-logger sampling and per-message-type rate limits.
+
+    Records at or above ``min_level`` always pass.  Below it, a record is
+    first kept with the probability configured for its logger (or the
+    nearest configured parent), then charged to a token bucket keyed by its
+    logger and unformatted message, so a hot message cannot flood the
+    output while rare ones still get through.  The next record that passes
+    for a message type reports how many were dropped in ``dropped``.
+
+    Parameters
+    ----------
+    rate : float
+        Records per second allowed per message type; 0 disables the limit.
+    burst : int
+        Records a message type may log at once before being limited.
+    sample : dict, optional
+        Logger name to fraction of records kept.
+    min_level : int
+        Records at this level or above are never dropped.
+    """
+
+    def __init__(
+        self,
+        rate: float = 20.0,
+        burst: int = 100,
+        sample: Optional[dict] = None,
+        min_level: int = logging.WARNING,
+        clock=time.monotonic,
+    ) -> None:
+        super().__init__()
+        self.rate = rate
+        self.burst = burst
+        self.sample = dict(sample or {})
+        self.min_level = min_level
+        self._clock = clock
+        # message type -> [tokens, last refill, dropped since last pass]
+        self._buckets: dict[tuple, list] = {}
+
+    def _fraction(self, name: str) -> float:
+        while True:
+            if name in self.sample:
+                return self.sample[name]
+            if "." not in name:
+                return 1.0
+            name = name.rsplit(".", 1)[0]
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= self.min_level:
+            return True
+        key = (record.name, str(record.msg))
+        fraction = self._fraction(record.name) if self.sample else 1.0
+        if fraction < 1.0 and random.random() >= fraction:
+            dropped_total.inc(reason="sampled")
+            return False
+        if self.rate <= 0:
+            return True
+        now = self._clock()
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            if len(self._buckets) > 10_000:
+                # Unbounded message variety (e.g. f-strings): start over.
+                self._buckets.clear()
+            bucket = self._buckets[key] = [float(self.burst), now, 0]
+        else:
+            bucket[0] = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+            bucket[1] = now
+        if bucket[0] < 1.0:
+            bucket[2] += 1
+            dropped_total.inc(reason="rate_limited")
+            return False
+        bucket[0] -= 1.0
+        if bucket[2]:
+            record.dropped = bucket[2]
+            bucket[2] = 0
+        return True
+
+
+class JSONFormatter(logging.Formatter):
+    """Render a record as one JSON object per line."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(
+                timespec="milliseconds"
+            ).replace("+00:00", "Z"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRIBUTES and not key.startswith("_"):
+                entry[key] = value
+        if getattr(record, "dropped", None):
+            entry["dropped"] = record.dropped
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        if record.stack_info:
+            entry["stack"] = self.formatStack(record.stack_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    """The classic text format, followed by the correlation fields."""
+
+    def __init__(self) -> None:
+        super().__init__("%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+
+    def format(self, record: logging.LogRecord) -> str:
+        text = super().format(record)
+        extras = " ".join(
+            f"{key}={value}"
+            for key, value in record.__dict__.items()
+            if key not in _RECORD_ATTRIBUTES and not key.startswith("_")
+        )
+        return f"{text} [{extras}]" if extras else text
+
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """Enqueue records without formatting them or waiting for room.
+
+    The stock handler formats the message before enqueueing it; here the
+    message and its arguments are passed through untouched and only
+    exception tracebacks (which cannot outlive the call) are rendered.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            dropped_total.inc(reason="queue_full")
+
+
+def _parse_sample(spec: str) -> dict:
+    sample = {}
+    for item in spec.split(","):
+        name, _, fraction = item.partition("=")
+        if name.strip() and fraction.strip():
+            sample[name.strip()] = float(fraction)
+    return sample
+
+
+def configure_logging(
+    level: Optional[str] = None,
+    stream: Optional[IO[str]] = None,
+    json_format: Optional[bool] = None,
+) -> logging.handlers.QueueListener:
+    """Route the root logger through the non-blocking pipeline.
+
+    Calling it again replaces the previous configuration.  Arguments
+    override the environment variables described in the module docstring.
+    """
+    global _handler, _listener
+    shutdown_logging()
+
+    level = (level or os.getenv("LOG_LEVEL", "INFO")).upper()
+    if json_format is None:
+        json_format = os.getenv("LOG_FORMAT", "json").lower() != "text"
+
+    output = logging.StreamHandler(stream or sys.stdout)
+    output.setFormatter(JSONFormatter() if json_format else TextFormatter())
+
+    records: queue.Queue = queue.Queue(LOG_QUEUE_SIZE)
+    handler = NonBlockingQueueHandler(records)
+    handler.addFilter(CorrelationFilter())
+    handler.addFilter(
+        SamplingFilter(
+            rate=float(os.getenv("LOG_RATE", "20")),
+            burst=int(os.getenv("LOG_BURST", "100")),
+            sample=_parse_sample(os.getenv("LOG_SAMPLE", "")),
+        )
+    )
+
+    root = logging.getLogger()
+    _handler = handler
+    root.addHandler(handler)
+    root.setLevel(level)
+
+    _listener = logging.handlers.QueueListener(records, output, respect_handler_level=True)
+    _listener.start()
+    return _listener
+
+
+def shutdown_logging() -> None:
+    """Flush queued records, stop the writer thread and detach the handler."""
+    global _handler, _listener
+    if _handler is not None:
+        logging.getLogger().removeHandler(_handler)
+        _handler = None
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+atexit.register(shutdown_logging)
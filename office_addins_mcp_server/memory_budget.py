@@ -0,0 +1,208 @@
+"""
+Office Add‑ins MCP Memory Budget
+================================
+
+One process-wide byte budget shared by the in-memory caches and the local
+catalog, instead of a hand-tuned entry limit per store.  The B1 App Service
+plan the server is deployed on (``infra/modules/app.bicep``) has 1.75 GB of
+memory for the interpreter, the worker and every store together.
+
+Each store registers with :data:`memory_budget` under a name and a weight,
+keeps an approximate byte footprint of its entries (:func:`approximate_size`)
+and asks the budget to :meth:`~MemoryBudget.enforce` itself whenever it
+grows.  When the registered stores together exceed ``ADDINS_MEMORY_BUDGET_MB``,
+the budget evicts entries until usage is back under
+:data:`LOW_WATERMARK` of the budget.  Every store evicts in its own order
+(least recently used first); across stores, the next victim is the store
+whose next entry has the lowest value::
+
+    weight / ((idle seconds + 1) * kilobytes)
+
+so idle and large entries go first, and entries of stores that are costly
+to rebuild (a high weight) stay longer.  Expired entries are always evicted
+first.  A budget of ``0`` disables eviction; usage is still reported.
+
+A store takes part by providing:
+
+- ``nbytes``: the approximate bytes of its entries;
+- ``__len__``: its number of entries;
+- ``coldest()``: ``(idle seconds, bytes)`` of the entry it would evict
+  next, or ``None`` when empty;
+- ``evict_coldest()``: evict that entry and return the bytes freed;
+- a ``budget`` attribute, set by :meth:`MemoryBudget.register`.
+
+Sizes are estimates: they count the objects a value holds but not
+dictionary keys (shared between records by the JSON decoder) nor allocator
+overhead, so the process uses more than the accounted bytes.  The admin
+snapshot reports the resident set size next to them.
+"""
+
+from __future__ import annotations
+
+import math
+import os
+import sys
+from typing import Any, Optional, Protocol
+
+from office_addins_mcp_server.metrics import registry
+
+
+# Bytes the registered stores may use together; 0 disables eviction.
+MEMORY_BUDGET_BYTES = int(float(os.getenv("ADDINS_MEMORY_BUDGET_MB", "256")) * 1024 * 1024)
+
+# Fraction of the budget usage is brought back under once exceeded, so that
+# eviction does not run again on every insertion.
+LOW_WATERMARK = 0.9
+
+# Per-entry bookkeeping of a store (index slots, timestamps), in bytes.
+ENTRY_OVERHEAD = 200
+
+
+def approximate_size(value: Any) -> int:
+    """Return the approximate bytes held by ``value`` and the objects it contains."""
+    size = 0
+    stack = [value]
+    getsizeof = sys.getsizeof
+    while stack:
+        item = stack.pop()
+        size += getsizeof(item)
+        if isinstance(item, dict):
+            stack.extend(item.values())
+        elif isinstance(item, (list, tuple, set, frozenset)):
+            stack.extend(item)
+    return size
+
+
+class MemoryComponent(Protocol):
+    """A store under the budget (see the module documentation)."""
+
+    nbytes: int
+    budget: Optional["MemoryBudget"]
+
+    def __len__(self) -> int: ...
+
+    def coldest(self) -> Optional[tuple[float, int]]: ...
+
+    def evict_coldest(self) -> int: ...
+
+
+evictions_total = registry.counter(
+    "addins_memory_evictions_total",
+    "Entries evicted to stay within the memory budget, by component.",
+    labelnames=("component",),
+)
+
+
+class MemoryBudget:
+    """Evict entries across registered stores to keep them within ``limit`` bytes.
+
+    Parameters
+    ----------
+    limit : int
+        Bytes the stores may use together; ``0`` disables eviction.
+    """
+
+    def __init__(self, limit: int = MEMORY_BUDGET_BYTES) -> None:
+        self.limit = limit
+        self._components: dict[str, tuple[MemoryComponent, float]] = {}
+        self._enforcing = False
+
+    def register(self, name: str, component: MemoryComponent, weight: float = 1.0) -> None:
+        """Account ``component`` under ``name``; a higher ``weight`` keeps its entries longer."""
+        if weight <= 0:
+            raise ValueError("weight must be positive")
+        self._components[name] = (component, weight)
+        component.budget = self
+
+    def unregister(self, name: str) -> None:
+        entry = self._components.pop(name, None)
+        if entry is not None:
+            entry[0].budget = None
+
+    def usage(self) -> dict[str, int]:
+        """Return the approximate bytes used by each component."""
+        return {name: component.nbytes for name, (component, _) in self._components.items()}
+
+    @property
+    def used(self) -> int:
+        return sum(component.nbytes for component, _ in self._components.values())
+
+    def _victim(self) -> Optional[str]:
+        victim, lowest = None, math.inf
+        for name, (component, weight) in self._components.items():
+            coldest = component.coldest()
+            if coldest is None:
+                continue
+            idle, size = coldest
+            value = weight / ((idle + 1) * max(size, 1) / 1024)
+            if value < lowest or victim is None:
+                victim, lowest = name, value
+        return victim
+
+    def enforce(self) -> int:
+        """Evict entries if usage exceeds the budget; return the number evicted."""
+        if self.limit <= 0 or self._enforcing:
+            return 0
+        used = self.used
+        if used <= self.limit:
+            return 0
+        target = self.limit * LOW_WATERMARK
+        evicted = 0
+        # Stores call enforce() when they grow, including while evicting.
+        self._enforcing = True
+        try:
+            while used > target:
+                name = self._victim()
+                if name is None:
+                    break
+                used -= self._components[name][0].evict_coldest()
+                evictions_total.inc(component=name)
+                evicted += 1
+        finally:
+            self._enforcing = False
+        return evicted
+
+    def snapshot(self) -> dict:
+        """Return the budget, usage per component and process memory."""
+        components = []
+        for name, (component, weight) in sorted(self._components.items()):
+            components.append(
+                {
+                    "Name": name,
+                    "Bytes": component.nbytes,
+                    "Entries": len(component),
+                    "Weight": weight,
+                    "Evictions": int(evictions_total.value(component=name)),
+                }
+            )
+        return {
+            "BudgetBytes": self.limit,
+            "UsedBytes": self.used,
+            "ResidentBytes": resident_bytes(),
+            "Components": components,
+        }
+
+
+def resident_bytes() -> Optional[int]:
+    """Return the resident set size of the process, where the platform reports it."""
+    try:
+        with open("/proc/self/statm") as handle:
+            return int(handle.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+# Process-wide budget; stores register with it where they are created.
+memory_budget = MemoryBudget()
+
+registry.gauge(
+    "addins_memory_bytes",
+    "Approximate bytes held by each component under the memory budget.",
+    labelnames=("component",),
+    callback=lambda: {(name,): size for name, size in memory_budget.usage().items()},
+)
+registry.gauge(
+    "addins_memory_budget_bytes",
+    "Bytes the components under the memory budget may use together.",
+    callback=lambda: memory_budget.limit,
+)
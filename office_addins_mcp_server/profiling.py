@@ -0,0 +1,196 @@
+"""
+Office Add‑ins MCP Profiling
+============================
+
+On-demand diagnostics for a running server:
+
+- :class:`StackSampler`, a sampling profiler that records the Python stack
+  of one thread (by default the event loop thread) at a fixed interval and
+  renders the samples in the folded format read by flamegraph.pl,
+  speedscope and inferno;
+- :func:`dump_tasks`, the state and current stack of every asyncio task;
+- :func:`trace_allocations`, the top allocation sites over a window using
+  :mod:`tracemalloc`.
+
+Nothing here runs until it is asked for: the sampler thread only exists
+while a profile is being taken and tracemalloc is stopped again at the end
+of its window, so the server pays no overhead otherwise.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from types import FrameType
+from typing import Optional
+
+
+# Default seconds between two stack samples.
+DEFAULT_SAMPLE_INTERVAL = 0.005
+
+# Deepest stack recorded per sample; deeper frames are cut at the root.
+MAX_STACK_DEPTH = 128
+
+
+def _frame_name(frame: FrameType) -> str:
+    code = frame.f_code
+    module = frame.f_globals.get("__name__", "?")
+    name = getattr(code, "co_qualname", code.co_name)
+    # ';' separates frames and ' ' precedes the count in the folded format.
+    return f"{module}.{name}".replace(";", ":").replace(" ", "_")
+
+
+def _folded_stack(frame: Optional[FrameType]) -> str:
+    names = []
+    while frame is not None and len(names) < MAX_STACK_DEPTH:
+        names.append(_frame_name(frame))
+        frame = frame.f_back
+    return ";".join(reversed(names))
+
+
+class StackSampler:
+    """Sample the stack of a thread from a background thread.
+
+    Parameters
+    ----------
+    thread_id : int, optional
+        ``threading.get_ident()`` of the thread to sample; defaults to the
+        thread creating the sampler.
+    interval : float
+        Seconds between samples.
+    """
+
+    def __init__(
+        self, thread_id: Optional[int] = None, interval: float = DEFAULT_SAMPLE_INTERVAL
+    ) -> None:
+        self.thread_id = thread_id if thread_id is not None else threading.get_ident()
+        self.interval = interval
+        self.samples: Counter[str] = Counter()
+        self.started_at: Optional[float] = None
+        self.duration = 0.0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None
+
+    def start(self) -> None:
+        if self._thread is not None:
+            raise RuntimeError("sampler is already running")
+        self._stop.clear()
+        self.started_at = time.monotonic()
+        self._thread = threading.Thread(
+            target=self._run, name="addins-stack-sampler", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+        self.duration = time.monotonic() - self.started_at
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is not None:
+                self.samples[_folded_stack(frame)] += 1
+            # Drop the reference so the sampled thread's frames can be freed.
+            del frame
+
+    def folded(self) -> str:
+        """Return the samples as ``stack count`` lines, heaviest first."""
+        return "".join(
+            f"{stack} {count}\n" for stack, count in self.samples.most_common()
+        )
+
+
+async def profile_event_loop(seconds: float, interval: float = DEFAULT_SAMPLE_INTERVAL) -> StackSampler:
+    """Sample the running event loop's thread for ``seconds``."""
+    sampler = StackSampler(threading.get_ident(), interval)
+    sampler.start()
+    try:
+        await asyncio.sleep(seconds)
+    finally:
+        sampler.stop()
+    return sampler
+
+
+def dump_tasks(limit: int = 16) -> list[dict]:
+    """Describe every task of the running event loop.
+
+    Parameters
+    ----------
+    limit : int
+        Maximum number of frames reported per task.
+    """
+    current = asyncio.current_task()
+    tasks = []
+    for task in asyncio.all_tasks():
+        coro = task.get_coro()
+        stack = [
+            f"{frame.f_code.co_filename}:{frame.f_lineno} in {frame.f_code.co_name}"
+            for frame in task.get_stack(limit=limit)
+        ]
+        tasks.append(
+            {
+                "Name": task.get_name(),
+                "Coroutine": getattr(coro, "__qualname__", repr(coro)),
+                "State": "current" if task is current else ("done" if task.done() else "pending"),
+                "Stack": stack,
+            }
+        )
+    tasks.sort(key=lambda t: t["Name"])
+    return tasks
+
+
+async def trace_allocations(seconds: float, top: int = 25, frames: int = 1) -> dict:
+    """Trace memory allocations for ``seconds`` and return the top sites.
+
+    If tracemalloc was already tracing (e.g. ``PYTHONTRACEMALLOC``), it is
+    left running and the statistics cover everything it traced.
+
+    Returns
+    -------
+    dict
+        ``{"Seconds", "TracedBytes", "PeakBytes", "Top"}``, where ``Top``
+        lists ``{"Location", "SizeBytes", "Count"}`` by decreasing size.
+    """
+    was_tracing = tracemalloc.is_tracing()
+    if not was_tracing:
+        tracemalloc.start(frames)
+    try:
+        await asyncio.sleep(seconds)
+        snapshot = tracemalloc.take_snapshot()
+        traced, peak = tracemalloc.get_traced_memory()
+    finally:
+        if not was_tracing:
+            tracemalloc.stop()
+
+    snapshot = snapshot.filter_traces(
+        (tracemalloc.Filter(False, tracemalloc.__file__),)
+    )
+    key = "traceback" if frames > 1 else "lineno"
+    statistics = snapshot.statistics(key)[:top]
+    return {
+        "Seconds": seconds,
+        "TracedBytes": traced,
+        "PeakBytes": peak,
+        "Top": [
+            {
+                "Location": " <- ".join(
+                    f"{frame.filename}:{frame.lineno}" for frame in stat.traceback
+                ),
+                "SizeBytes": stat.size,
+                "Count": stat.count,
+            }
+            for stat in statistics
+        ],
+    }
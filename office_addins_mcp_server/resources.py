@@ -0,0 +1,190 @@
+"""
+Office Add‑ins MCP Resources
+============================
+
+Add-in records and category listings published as MCP resources:
+
+- ``addin://{asset_id}``: one add-in record
+- ``addins://categories``: known categories with their listing URIs
+- ``addins://category/{category_id}``: a page of a category listing; later
+  pages are read from ``addins://category/{category_id}?cursor=...``
+
+Resources are served from the local catalog (:mod:`tools.catalog`), which is
+filled by the search and details tools; an add-in record that is not in the
+catalog yet is fetched from the Office Add-ins API once.
+
+Clients can subscribe to any of these URIs.  Whenever a record in the
+catalog changes, subscribers of the record and of the category listings it
+belongs to receive ``notifications/resources/updated``, so they can keep
+their own copies instead of polling.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import weakref
+from typing import Optional
+from urllib.parse import parse_qs, quote, unquote
+
+from mcp.server.session import ServerSession
+
+from office_addins_mcp_server.tools import upstream
+from office_addins_mcp_server.tools.addin_tools import get_addin_details
+from office_addins_mcp_server.tools.catalog import Catalog, catalog
+
+
+logger = logging.getLogger("office-addins-mcp")
+
+ADDIN_URI = "addin://{asset_id}"
+CATEGORIES_URI = "addins://categories"
+CATEGORY_URI = "addins://category/{category_id}"
+
+# Records per page of a category listing.
+CATEGORY_PAGE_SIZE = int(os.getenv("ADDINS_CATEGORY_PAGE_SIZE", "50"))
+
+# Deadline, in seconds, for fetching a record missing from the catalog.
+RESOURCE_FETCH_TIMEOUT = 30.0
+
+
+def addin_uri(asset_id: str) -> str:
+    return ADDIN_URI.format(asset_id=quote(asset_id, safe=""))
+
+
+def category_uri(category_id: str, cursor: Optional[str] = None) -> str:
+    uri = CATEGORY_URI.format(category_id=quote(category_id, safe=""))
+    return f"{uri}?cursor={cursor}" if cursor else uri
+
+
+async def read_addin(asset_id: str) -> dict:
+    """Return the catalog record of an add-in, fetching it if unknown.
+
+    Raises
+    ------
+    ValueError
+        If the Office Add-ins API has no record for ``asset_id``.
+    """
+    asset_id = unquote(asset_id)
+    record = catalog.get(asset_id)
+    if record is None:
+        with upstream.deadline(RESOURCE_FETCH_TIMEOUT):
+            details = await get_addin_details(asset_id)
+        record = details.get("Value") if isinstance(details, dict) else None
+        if not isinstance(record, dict):
+            raise ValueError(f"unknown add-in {asset_id}")
+    return record
+
+
+def read_categories() -> dict:
+    """Return the known categories with their sizes and listing URIs."""
+    values = [
+        {"Id": category_id, "Count": count, "Uri": category_uri(category_id)}
+        for category_id, count in catalog.categories().items()
+    ]
+    return {"TotalCount": len(values), "Values": values}
+
+
+def read_category(category_ref: str) -> dict:
+    """Return one page of a category listing.
+
+    FastMCP resource templates do not model query strings, so the cursor
+    arrives as part of the last URI segment (``Productivity?cursor=...``).
+
+    Raises
+    ------
+    ValueError
+        If the cursor is malformed.
+    """
+    category_part, _, query = category_ref.partition("?")
+    category_id = unquote(category_part)
+    cursor = (parse_qs(query).get("cursor") or [None])[0]
+    records, next_cursor = catalog.list_category(
+        category_id, cursor=cursor, limit=CATEGORY_PAGE_SIZE
+    )
+    values = [
+        {
+            "Id": record["Id"],
+            "Title": record.get("Title"),
+            "ProviderName": record.get("ProviderName"),
+            "Uri": addin_uri(record["Id"]),
+        }
+        for record in records
+    ]
+    return {
+        "CategoryId": category_id,
+        "TotalCount": catalog.categories().get(category_id, 0),
+        "Values": values,
+        "NextCursor": next_cursor,
+        "NextUri": category_uri(category_id, next_cursor) if next_cursor else None,
+    }
+
+
+class ResourceSubscriptions:
+    """MCP sessions subscribed to resource URIs.
+
+    Sessions are held weakly so that disconnected clients drop out without
+    an explicit unsubscribe.
+    """
+
+    def __init__(self) -> None:
+        self._subscribers: dict[str, weakref.WeakSet[ServerSession]] = {}
+        self._tasks: set[asyncio.Task] = set()
+
+    def subscribe(self, uri: str, session: ServerSession) -> None:
+        self._subscribers.setdefault(uri, weakref.WeakSet()).add(session)
+
+    def unsubscribe(self, uri: str, session: ServerSession) -> None:
+        sessions = self._subscribers.get(uri)
+        if sessions is not None:
+            sessions.discard(session)
+            if not sessions:
+                del self._subscribers[uri]
+
+    def sessions(self, uri: str) -> list[ServerSession]:
+        return list(self._subscribers.get(uri, ()))
+
+    def clear(self) -> None:
+        self._subscribers.clear()
+
+    async def notify(self, uris: set[str]) -> None:
+        """Send ``resources/updated`` for every subscription to ``uris``.
+
+        A subscription matches when its URI, without any ``?cursor=``
+        query, is in ``uris``; each subscriber is told about the exact URI
+        it subscribed to.
+        """
+        for uri, sessions in list(self._subscribers.items()):
+            if uri.partition("?")[0] not in uris:
+                continue
+            for session in list(sessions):
+                try:
+                    await session.send_resource_updated(uri)
+                except Exception as exc:
+                    logger.debug("Dropping subscription to %s: %s", uri, exc)
+                    self.unsubscribe(uri, session)
+
+    def on_catalog_change(self, asset_ids: list, category_ids: set) -> None:
+        """Catalog listener scheduling notifications for the changed records."""
+        if not self._subscribers:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        uris = {addin_uri(asset_id) for asset_id in asset_ids}
+        uris |= {category_uri(category_id) for category_id in category_ids}
+        if category_ids:
+            uris.add(CATEGORIES_URI)
+        task = loop.create_task(self.notify(uris))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    def attach(self, source: Catalog = catalog) -> None:
+        """Start notifying subscribers of changes to ``source``."""
+        source.remove_listener(self.on_catalog_change)
+        source.add_listener(self.on_catalog_change)
+
+
+# Process-wide subscriptions, shared by every MCP session.
+subscriptions = ResourceSubscriptions()
@@ -9,29 +9,89 @@ Features:
 
 from __future__ import annotations
 
+import asyncio
+import json
 import logging
+import os
 import sys
+from contextlib import contextmanager
 from datetime import datetime
+from typing import Iterator
 
 import click
 
 # Import FastMCP from the official MCP SDK.  FastMCP is located in the
 # mcp.server.fastmcp module.
-from mcp.server.fastmcp import FastMCP
+from mcp.server.fastmcp import Context, FastMCP
 
-from office_addins_mcp_server.tools import get_addin_details, search_addins
+from office_addins_mcp_server import resources
+from office_addins_mcp_server.logs import configure_logging, log_context
+from office_addins_mcp_server.profiling import StackSampler
+from office_addins_mcp_server.structured_output import install_structured_output
+from office_addins_mcp_server.tools import (
+    addin_stats,
+    export_addins,
+    get_addin_details,
+    get_addin_manifest,
+    get_addin_manifests,
+    get_catalog_changes,
+    search_addins,
+    search_addins_multi,
+    search_and_expand,
+    suggest_addins,
+)
+from office_addins_mcp_server.tools import upstream
+from office_addins_mcp_server.tools.addin_tools import SearchSpec
+from office_addins_mcp_server.tools.export import EXPORT_FORMATS, ExportFilters, export_path
+from office_addins_mcp_server.tools.models import AddinDetailsResult, SearchResult
 
 
 # Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.StreamHandler(sys.stdout)
-    ]
-)
+configure_logging()
 logger = logging.getLogger("office-addins-mcp")
 
+# Default deadline, in seconds, for a tool call's upstream work.  Clients can
+# ask for a shorter one by sending "timeoutMs" in the request's _meta.
+DEFAULT_TOOL_TIMEOUT = float(os.getenv("ADDINS_TOOL_TIMEOUT", "60"))
+
+
+def tool_timeout(ctx: Context) -> float:
+    """Return the deadline in seconds for the tool call behind ``ctx``.
+
+    A client-supplied ``_meta.timeoutMs`` is honoured when it is shorter than
+    :data:`DEFAULT_TOOL_TIMEOUT`.
+    """
+    try:
+        meta = ctx.request_context.meta
+    except ValueError:
+        # Called outside of an MCP request (e.g. FastMCP.call_tool in tests).
+        meta = None
+    timeout_ms = getattr(meta, "timeoutMs", None) if meta is not None else None
+    if isinstance(timeout_ms, (int, float)) and timeout_ms > 0:
+        return min(DEFAULT_TOOL_TIMEOUT, timeout_ms / 1000)
+    return DEFAULT_TOOL_TIMEOUT
+
+
+@contextmanager
+def tool_call(name: str, ctx: Context, timeout: bool = True) -> Iterator[None]:
+    """Run the body of tool ``name`` in its correlation and deadline scope.
+
+    Every record logged inside, including those of the upstream requests the
+    tool makes, carries the same ``call_id`` and the MCP request ID.  Pass
+    ``timeout=False`` for tools that should not be bounded by
+    :func:`tool_timeout`.
+    """
+    try:
+        request_id = ctx.request_id
+    except ValueError:
+        request_id = None
+    with log_context(tool=name, request_id=request_id):
+        if not timeout:
+            yield
+            return
+        with upstream.deadline(tool_timeout(ctx)):
+            yield
+
 
 def register_tools(mcp: FastMCP) -> None:
     """Register all tools with the MCP server.
@@ -47,14 +107,20 @@ def register_tools(mcp: FastMCP) -> None:
         name="get_addin_details",
         description="Fetch details of a Microsoft Office add‑in by its asset ID.",
     )
-    async def get_addin_details_tool(asset_id: str) -> dict:
+    async def get_addin_details_tool(asset_id: str, ctx: Context) -> AddinDetailsResult:
         """MCP tool wrapper for get_addin_details."""
-        logger.debug(f"Fetching add-in details for asset ID: {asset_id}")
-        return await get_addin_details(asset_id)
+        with tool_call("get_addin_details", ctx):
+            logger.debug("Fetching add-in details for asset ID: %s", asset_id)
+            return await get_addin_details(asset_id)
     
     @mcp.tool(
         name="search_addins",
-        description="Search for Office Add-ins using comprehensive filtering, sorting, and pagination options.",
+        description=(
+            "Search for Office Add-ins using comprehensive filtering, sorting, and pagination options. "
+            "Pass `locale` for one market or `locales` to search several markets concurrently. "
+            "To get the next page, call again with only `cursor` set to the NextCursor "
+            "of the previous result."
+        ),
     )
     async def search_addins_tool(
         query: str | None = None,
@@ -71,27 +137,301 @@ def register_tools(mcp: FastMCP) -> None:
         skiptoitem: int | None = None,
         date: str | None = None,
         getMetaOSApps: bool | None = None,
-    ) -> dict:
+        locale: str | None = None,
+        locales: list[str] | None = None,
+        autocorrect: bool = True,
+        cursor: str | None = None,
+        ctx: Context = None,
+    ) -> SearchResult:
         """MCP tool wrapper for search_addins."""
-        logger.debug(f"Searching add-ins with query: {query}, filters: {locals()}")
-        return await search_addins(
-            query=query,
-            category=category,
-            free=free,
-            clients=clients,
-            productgroup=productgroup,
-            productids=productids,
-            assetids=assetids,
-            providertype=providertype,
-            orderfield=orderfield,
-            orderby=orderby,
-            top=top,
-            skiptoitem=skiptoitem,
-            date=date,
-            getMetaOSApps=getMetaOSApps,
-        )
+        with tool_call("search_addins", ctx):
+            logger.debug("Searching add-ins with query: %r", query)
+            return await search_addins(
+                query=query,
+                category=category,
+                free=free,
+                clients=clients,
+                productgroup=productgroup,
+                productids=productids,
+                assetids=assetids,
+                providertype=providertype,
+                orderfield=orderfield,
+                orderby=orderby,
+                top=top,
+                skiptoitem=skiptoitem,
+                date=date,
+                getMetaOSApps=getMetaOSApps,
+                locale=locale,
+                locales=locales,
+                autocorrect=autocorrect,
+                cursor=cursor,
+            )
+
+    @mcp.tool(
+        name="search_addins_multi",
+        description=(
+            "Run several Office Add-ins searches in one call (each entry takes the "
+            "search_addins arguments). Results are deduplicated across searches and "
+            "report which searches matched each add-in and at what rank; set "
+            "fusion='rrf' to rank the merged list by reciprocal rank fusion."
+        ),
+    )
+    async def search_addins_multi_tool(
+        queries: list[SearchSpec],
+        fusion: str | None = None,
+        ctx: Context = None,
+    ) -> dict:
+        """MCP tool wrapper for search_addins_multi."""
+        with tool_call("search_addins_multi", ctx):
+            logger.debug("Running %d searches with fusion: %s", len(queries), fusion)
+            return await search_addins_multi(queries, fusion=fusion)
+
+    @mcp.tool(
+        name="get_addin_manifest",
+        description=(
+            "Fetch the XML manifest of an Office add-in by asset ID and summarize its hosts, "
+            "permissions, requirement sets and extension points."
+        ),
+    )
+    async def get_addin_manifest_tool(asset_id: str, ctx: Context) -> dict:
+        """MCP tool wrapper for get_addin_manifest."""
+        with tool_call("get_addin_manifest", ctx):
+            logger.debug("Fetching manifest for asset ID: %s", asset_id)
+            return await get_addin_manifest(asset_id)
+
+    @mcp.tool(
+        name="get_addin_manifests",
+        description=(
+            "Fetch and summarize the manifests of several Office add-ins at once "
+            "(up to 25 asset IDs)."
+        ),
+    )
+    async def get_addin_manifests_tool(asset_ids: list[str], ctx: Context) -> dict:
+        """MCP tool wrapper for get_addin_manifests."""
+        with tool_call("get_addin_manifests", ctx):
+            logger.debug("Fetching manifests for %d asset IDs", len(asset_ids))
+            return await get_addin_manifests(asset_ids)
+
+    @mcp.tool(
+        name="suggest_addins",
+        description=(
+            "Suggest Office Add-ins by title or provider prefix, tolerating typos. "
+            "Answers from a local index without calling the Office Store API."
+        ),
+    )
+    async def suggest_addins_tool(text: str, limit: int = 10, ctx: Context = None) -> dict:
+        """MCP tool wrapper for suggest_addins."""
+        with tool_call("suggest_addins", ctx, timeout=False):
+            logger.debug("Suggesting add-ins for: %r", text)
+            return await suggest_addins(text, limit=limit)
+
+    @mcp.tool(
+        name="export_addins",
+        description=(
+            "Export the whole add-in catalog, or the results of a search (search_addins "
+            "arguments without paging), to an NDJSON file or Parquet directory in the "
+            "server's export folder. Supports field projection (dotted paths), local "
+            "filters (min_rating, min_votes, updated_since) and resumes an interrupted "
+            "export from its checkpoint."
+        ),
+    )
+    async def export_addins_tool(
+        output: str,
+        format: str = "ndjson",
+        search: SearchSpec | None = None,
+        fields: list[str] | None = None,
+        filters: ExportFilters | None = None,
+        max_records: int | None = None,
+        resume: bool = True,
+        ctx: Context = None,
+    ) -> dict:
+        """MCP tool wrapper for export_addins."""
+
+        async def report(summary: dict) -> None:
+            await ctx.report_progress(summary["Records"], summary["TotalCount"])
+
+        # No overall deadline: exports are long-running but resumable, and
+        # each page request is still bounded by the upstream timeout.
+        with tool_call("export_addins", ctx, timeout=False):
+            logger.debug("Exporting add-ins to %s as %s", output, format)
+            return await export_addins(
+                str(export_path(output)),
+                format=format,
+                search=search,
+                fields=fields,
+                filters=filters,
+                max_records=max_records,
+                resume=resume,
+                on_page=report if ctx is not None else None,
+            )
     
-    logger.info("Successfully registered 2 tools: get_addin_details, search_addins")
+    @mcp.tool(
+        name="get_catalog_changes",
+        description=(
+            "List Office add-ins added, updated or removed since an ISO 8601 timestamp, "
+            "including permission, version and pricing changes. Answers from the "
+            "server's change log without calling the Office Store API; set "
+            "include_diffs for old and new field values."
+        ),
+    )
+    async def get_catalog_changes_tool(
+        since: str,
+        change_types: list[str] | None = None,
+        permissions_only: bool = False,
+        include_diffs: bool = False,
+        ctx: Context = None,
+    ) -> dict:
+        """MCP tool wrapper for get_catalog_changes."""
+        with tool_call("get_catalog_changes", ctx, timeout=False):
+            logger.debug("Listing catalog changes since %s", since)
+            return await get_catalog_changes(
+                since,
+                change_types=change_types,
+                permissions_only=permissions_only,
+                include_diffs=include_diffs,
+            )
+
+    @mcp.tool(
+        name="search_and_expand",
+        description=(
+            "Search for Office Add-ins (search_addins arguments) and fetch the full "
+            "details of the top_k hits concurrently in the same call, instead of one "
+            "get_addin_details call per hit. Optionally project records to `fields` "
+            "(dotted paths). Expanded records are also streamed as progress "
+            "notifications as they arrive."
+        ),
+    )
+    async def search_and_expand_tool(
+        search: SearchSpec | None = None,
+        top_k: int = 5,
+        fields: list[str] | None = None,
+        ctx: Context = None,
+    ) -> dict:
+        """MCP tool wrapper for search_and_expand."""
+
+        async def report(done: int, total: int, record: dict) -> None:
+            message = json.dumps(record, ensure_ascii=False, default=str)
+            await ctx.report_progress(done, total, message=message)
+
+        with tool_call("search_and_expand", ctx):
+            logger.debug("Expanding the top %d hits of a search", top_k)
+            return await search_and_expand(
+                search,
+                top_k=top_k,
+                fields=fields,
+                on_record=report if ctx is not None else None,
+            )
+
+    @mcp.tool(
+        name="addin_stats",
+        description=(
+            "Aggregate the locally cached Office Add-ins catalog by category, provider, "
+            "client or pricing: add-in counts, mean/median rating, vote-weighted rating, "
+            "total votes and release-year histograms, with optional filters (free, "
+            "clients, categories, min_votes). Use this instead of paging through search "
+            "results to answer statistical questions."
+        ),
+    )
+    async def addin_stats_tool(
+        group_by: str = "category",
+        metrics: list[str] | None = None,
+        free: bool | None = None,
+        clients: list[str] | None = None,
+        categories: list[str] | None = None,
+        min_votes: int | None = None,
+        order_by: str = "count",
+        top: int = 20,
+        refresh: bool = False,
+        ctx: Context = None,
+    ) -> dict:
+        """MCP tool wrapper for addin_stats."""
+        with tool_call("addin_stats", ctx, timeout=not refresh):
+            logger.debug("Aggregating the catalog by %s", group_by)
+            return await addin_stats(
+                group_by=group_by,
+                metrics=metrics,
+                free=free,
+                clients=clients,
+                categories=categories,
+                min_votes=min_votes,
+                order_by=order_by,
+                top=top,
+                refresh=refresh,
+            )
+
+    logger.info(
+        "Successfully registered 10 tools: get_addin_details, search_addins, "
+        "search_addins_multi, get_addin_manifest, get_addin_manifests, suggest_addins, "
+        "export_addins, get_catalog_changes, search_and_expand, addin_stats"
+    )
+
+
+def register_resources(mcp: FastMCP) -> None:
+    """Register the catalog resources and resource subscriptions.
+
+    Parameters
+    ----------
+    mcp : FastMCP
+        The FastMCP server instance to register resources with.
+    """
+    logger.info("Registering MCP resources...")
+
+    @mcp.resource(
+        resources.ADDIN_URI,
+        name="addin",
+        description="An Office add-in record by asset ID, served from the local catalog.",
+        mime_type="application/json",
+    )
+    async def addin_resource(asset_id: str) -> dict:
+        return await resources.read_addin(asset_id)
+
+    @mcp.resource(
+        resources.CATEGORIES_URI,
+        name="addin_categories",
+        description="Add-in categories known to the local catalog, with their listing URIs.",
+        mime_type="application/json",
+    )
+    def categories_resource() -> dict:
+        return resources.read_categories()
+
+    @mcp.resource(
+        resources.CATEGORY_URI,
+        name="addin_category",
+        description=(
+            "A page of the add-ins in a category. Follow NextUri "
+            "(addins://category/{category_id}?cursor=...) for the next page."
+        ),
+        mime_type="application/json",
+    )
+    def category_resource(category_id: str) -> dict:
+        return resources.read_category(category_id)
+
+    server = mcp._mcp_server
+
+    @server.subscribe_resource()
+    async def subscribe(uri) -> None:
+        resources.subscriptions.subscribe(str(uri), server.request_context.session)
+
+    @server.unsubscribe_resource()
+    async def unsubscribe(uri) -> None:
+        resources.subscriptions.unsubscribe(str(uri), server.request_context.session)
+
+    # The SDK always advertises subscribe=False; report the handlers above.
+    get_capabilities = server.get_capabilities
+
+    def get_capabilities_with_subscribe(*args, **kwargs):
+        capabilities = get_capabilities(*args, **kwargs)
+        if capabilities.resources is not None:
+            capabilities.resources.subscribe = True
+        return capabilities
+
+    server.get_capabilities = get_capabilities_with_subscribe
+    resources.subscriptions.attach()
+
+    logger.info(
+        "Successfully registered 3 resources: addin://{asset_id}, "
+        "addins://categories, addins://category/{category_id}"
+    )
 
 
 def create_mcp_server() -> FastMCP:
@@ -100,13 +440,16 @@ def create_mcp_server() -> FastMCP:
     Returns
     -------
     FastMCP
-        Configured MCP server instance with tools registered
+        Configured MCP server instance with tools and resources registered
     """
     logger.info("Creating MCP server instance...")
     mcp = FastMCP("Office Add‑ins MCP Server")
     
-    # Register all tools with the server
+    # Register all tools and resources with the server
     register_tools(mcp)
+    register_resources(mcp)
+    # Serve model-typed tool results without the SDK's per-call conversion
+    install_structured_output(mcp)
     
     return mcp
 
@@ -159,13 +502,23 @@ def run_server(transport: str | None = None) -> FastMCP:
         sys.exit(1)
 
 
-@click.command()
+@click.group(invoke_without_command=True)
 @click.option(
     "--transport", "-t",
     type=click.Choice(["stdio", "sse", "http"], case_sensitive=False),
     help="Transport protocol to use (overrides .env file). stdio: for local CLI clients, sse: for web clients, http: for REST API clients"
 )
-def main(transport: str | None = None) -> None:
+@click.option(
+    "--profile", "profile_path",
+    type=click.Path(dir_okay=False, writable=True),
+    help="Sample the server's stacks while it runs and write them to this file on exit, in the folded format read by flamegraph.pl and speedscope"
+)
+@click.pass_context
+def main(
+    click_ctx: click.Context,
+    transport: str | None = None,
+    profile_path: str | None = None,
+) -> None:
     """Office Add-ins MCP Server
     
     A Model Context Protocol (MCP) server for discovering and managing Microsoft
@@ -177,11 +530,113 @@ def main(transport: str | None = None) -> None:
     uv run office-addins-mcp-server --transport stdio
     uv run office-addins-mcp-server --transport sse  
     uv run office-addins-mcp-server --transport http
+    uv run office-addins-mcp-server export addins.ndjson --field Id --field Title
     """
+    if click_ctx.invoked_subcommand is not None:
+        return
+
     logger.info("Initializing Office Add-ins MCP Server...")
-    
-    # Run server with transport argument from click
-    run_server(transport)
+
+    sampler = None
+    if profile_path:
+        sampler = StackSampler()
+        sampler.start()
+    try:
+        # Run server with transport argument from click
+        run_server(transport)
+    finally:
+        if sampler is not None:
+            sampler.stop()
+            with open(profile_path, "w") as f:
+                f.write(sampler.folded())
+            logger.info("Wrote stack profile to %s", profile_path)
+
+
+@main.command("export")
+@click.argument("output", type=click.Path(dir_okay=True, writable=True))
+@click.option("--format", "-f", "format_", type=click.Choice(EXPORT_FORMATS), default="ndjson",
+              show_default=True, help="ndjson: one JSON record per line, parquet: a directory of Parquet parts")
+@click.option("--query", "-q", help="Export only the results of this search query")
+@click.option("--category", multiple=True, help="Filter by category (repeatable)")
+@click.option("--client", "clients", multiple=True, help="Filter by client, e.g. Win32_Excel (repeatable)")
+@click.option("--free/--any-price", default=None, help="Only export free add-ins")
+@click.option("--locale", help="Market to export, e.g. de-DE")
+@click.option("--field", "fields", multiple=True, help="Field to keep, dotted paths allowed (repeatable)")
+@click.option("--min-rating", type=float, help="Skip add-ins rated below this")
+@click.option("--min-votes", type=int, help="Skip add-ins with fewer votes")
+@click.option("--updated-since", help="Skip add-ins last updated before this ISO date")
+@click.option("--max-records", type=int, help="Stop after this many records")
+@click.option("--page-size", type=int, default=None, help="Records per upstream request")
+@click.option("--no-resume", is_flag=True, help="Ignore an existing checkpoint and start over")
+def export_command(
+    output: str,
+    format_: str,
+    query: str | None,
+    category: tuple[str, ...],
+    clients: tuple[str, ...],
+    free: bool | None,
+    locale: str | None,
+    fields: tuple[str, ...],
+    min_rating: float | None,
+    min_votes: int | None,
+    updated_since: str | None,
+    max_records: int | None,
+    page_size: int | None,
+    no_resume: bool,
+) -> None:
+    """Export add-ins to an NDJSON file or Parquet directory.
+
+    Pages are streamed to OUTPUT as they arrive; rerun the same command to
+    resume an interrupted export.
+    """
+    search: SearchSpec = {}
+    if query:
+        search["query"] = query
+    if category:
+        search["category"] = list(category)
+    if clients:
+        search["clients"] = list(clients)
+    if free is not None:
+        search["free"] = free
+    if locale:
+        search["locale"] = locale
+    filters: ExportFilters = {}
+    if min_rating is not None:
+        filters["min_rating"] = min_rating
+    if min_votes is not None:
+        filters["min_votes"] = min_votes
+    if updated_since:
+        filters["updated_since"] = updated_since
+    options = {"page_size": page_size} if page_size else {}
+
+    async def progress(summary: dict) -> None:
+        click.echo(
+            f"page {summary['Pages']}: {summary['Records']} records written "
+            f"(of {summary['TotalCount']})",
+            err=True,
+        )
+
+    async def run() -> dict:
+        try:
+            return await export_addins(
+                output,
+                format=format_,
+                search=search,
+                fields=list(fields) or None,
+                filters=filters,
+                max_records=max_records,
+                resume=not no_resume,
+                on_page=progress,
+                **options,
+            )
+        finally:
+            await upstream.aclose()
+
+    try:
+        summary = asyncio.run(run())
+    except (ValueError, ImportError) as exc:
+        raise click.ClickException(str(exc)) from exc
+    click.echo(json.dumps(summary, indent=2))
 
 
 if __name__ == "__main__":
@@ -0,0 +1,157 @@
+"""
+Structured Tool Output
+======================
+
+Tools whose return annotation is one of the result models in
+:mod:`tools.models` are registered by FastMCP with that model's JSON schema
+as their ``outputSchema``; the schema is built once, when the tool is
+registered at startup.
+
+On each call the SDK would then convert the result into a model instance
+and back, and validate it once more against the JSON schema, which costs
+far more than the serialization itself for a page of search results (see
+benchmarks/bench_structured_output.py).
+:func:`install_structured_output` replaces that path for those tools: the
+returned dictionary is sent as the structured content as is, serialized
+once for the text content, and validated against the model according to
+:data:`OUTPUT_VALIDATION`:
+
+- ``strict``: every result is validated; a mismatch fails the call;
+- ``sample`` (default): a fraction (:data:`OUTPUT_VALIDATION_SAMPLE`) of
+  results is validated; a mismatch is logged and counted but the result is
+  returned, so drift in the upstream schema does not fail live calls;
+- ``off``: results are not validated.
+
+The test suite runs in ``strict`` mode.
+
+MCP clients may validate structured content themselves, so a mismatching
+result let through by the lenient modes can still be rejected client-side.
+Other tools keep the SDK's handling.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import random
+from typing import Callable, Optional
+
+import pydantic_core
+from mcp import types
+from mcp.server.fastmcp import FastMCP
+from pydantic import BaseModel, ValidationError
+
+from office_addins_mcp_server.metrics import registry
+
+
+logger = logging.getLogger("office-addins-mcp.output")
+
+VALIDATION_MODES = ("strict", "sample", "off")
+
+OUTPUT_VALIDATION = os.getenv("ADDINS_OUTPUT_VALIDATION", "sample").lower()
+
+# Fraction of results validated in "sample" mode.
+OUTPUT_VALIDATION_SAMPLE = float(os.getenv("ADDINS_OUTPUT_VALIDATION_SAMPLE", "0.01"))
+
+validation_failures_total = registry.counter(
+    "addins_output_validation_failures_total",
+    "Tool results that did not match their output schema, by tool.",
+    labelnames=("tool",),
+)
+
+
+class OutputValidator:
+    """Decide which results are validated and handle mismatches.
+
+    Parameters
+    ----------
+    mode : str, optional
+        One of :data:`VALIDATION_MODES`; defaults to :data:`OUTPUT_VALIDATION`.
+    sample_rate : float, optional
+        Fraction of results validated in ``"sample"`` mode; defaults to
+        :data:`OUTPUT_VALIDATION_SAMPLE`.
+    """
+
+    def __init__(
+        self,
+        mode: Optional[str] = None,
+        sample_rate: Optional[float] = None,
+        rng: Callable[[], float] = random.random,
+    ) -> None:
+        mode = OUTPUT_VALIDATION if mode is None else mode
+        sample_rate = OUTPUT_VALIDATION_SAMPLE if sample_rate is None else sample_rate
+        if mode not in VALIDATION_MODES:
+            raise ValueError(f"unknown output validation mode {mode!r}; expected one of {VALIDATION_MODES}")
+        self.mode = mode
+        self.sample_rate = sample_rate
+        self._rng = rng
+
+    def check(self, tool: str, model: type[BaseModel], result: object) -> None:
+        """Validate ``result`` against ``model`` if the mode asks for it.
+
+        Raises
+        ------
+        pydantic.ValidationError
+            In ``"strict"`` mode, if ``result`` does not match ``model``.
+        """
+        if self.mode == "off" or (self.mode == "sample" and self._rng() >= self.sample_rate):
+            return
+        try:
+            model.model_validate(result)
+        except ValidationError as exc:
+            validation_failures_total.inc(tool=tool)
+            if self.mode == "strict":
+                raise
+            logger.warning(
+                "Result of %s does not match its output schema: %s",
+                tool,
+                exc,
+                extra={"tool": tool},
+            )
+
+
+def _error(message: str) -> types.ServerResult:
+    return types.ServerResult(
+        types.CallToolResult(content=[types.TextContent(type="text", text=message)], isError=True)
+    )
+
+
+def install_structured_output(mcp: FastMCP, validator: Optional[OutputValidator] = None) -> None:
+    """Serve the results of ``mcp``'s model-typed tools through the fast path.
+
+    Call once, after every tool is registered.
+    """
+    validator = validator or OutputValidator()
+    server = mcp._mcp_server
+    fallback = server.request_handlers[types.CallToolRequest]
+    models = {
+        tool.name: tool.fn_metadata.output_model
+        for tool in mcp._tool_manager.list_tools()
+        if tool.fn_metadata.output_model is not None and not tool.fn_metadata.wrap_output
+    }
+
+    async def handler(request: types.CallToolRequest) -> types.ServerResult:
+        name = request.params.name
+        model = models.get(name)
+        if model is None:
+            return await fallback(request)
+        tool = mcp._tool_manager.get_tool(name)
+        try:
+            result = await tool.run(request.params.arguments or {}, context=mcp.get_context())
+        except Exception as exc:
+            return _error(str(exc))
+        try:
+            validator.check(name, model, result)
+        except ValidationError as exc:
+            return _error(f"Output validation error: {exc}")
+        # Same text as FastMCP produces for a dictionary result.
+        text = pydantic_core.to_json(result, fallback=str, indent=2).decode()
+        return types.ServerResult(
+            types.CallToolResult(
+                content=[types.TextContent(type="text", text=text)],
+                structuredContent=result,
+                isError=False,
+            )
+        )
+
+    server.request_handlers[types.CallToolRequest] = handler
@@ -5,6 +5,30 @@ Office Add‑ins MCP Tools Package
 This package contains tools for managing Microsoft Office Add‑ins.
 """
 
-from office_addins_mcp_server.tools.addin_tools import get_addin_details, search_addins
+from office_addins_mcp_server.tools.addin_tools import (
+    get_addin_details,
+    search_addins,
+    search_addins_multi,
+    suggest_addins,
+)
+from office_addins_mcp_server.tools.changelog import get_catalog_changes
+from office_addins_mcp_server.tools.expand import search_and_expand
+from office_addins_mcp_server.tools.export import export_addins
+from office_addins_mcp_server.tools.manifest import (
+    get_addin_manifest,
+    get_addin_manifests,
+)
+from office_addins_mcp_server.tools.stats import addin_stats
 
-__all__ = ["get_addin_details", "search_addins"]
\ No newline at end of file
+__all__ = [
+    "addin_stats",
+    "export_addins",
+    "get_addin_details",
+    "get_addin_manifest",
+    "get_addin_manifests",
+    "get_catalog_changes",
+    "search_addins",
+    "search_addins_multi",
+    "search_and_expand",
+    "suggest_addins",
+]
\ No newline at end of file
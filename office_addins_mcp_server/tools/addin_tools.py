@@ -9,9 +9,95 @@ the FastMCP server.
 
 from __future__ import annotations
 
-import httpx
+import asyncio
+import base64
+import json
+import os
+import secrets
 from typing import Optional, List, Union
 
+import httpx
+from typing_extensions import TypedDict
+
+from office_addins_mcp_server.memory_budget import memory_budget
+from office_addins_mcp_server.metrics import registry
+from office_addins_mcp_server.tools import upstream
+from office_addins_mcp_server.tools.asset_ids import check_asset_id, missing_ids, observe_ids
+from office_addins_mcp_server.tools.cache import TTLCache
+from office_addins_mcp_server.tools.cache_backends import shared_cache
+from office_addins_mcp_server.tools.catalog import catalog
+from office_addins_mcp_server.tools.fuzzy_index import title_index
+
+
+# Search responses are cached per canonical parameter set and locale, and
+# shared between instances when a shared cache backend is configured.
+SEARCH_CACHE_TTL = float(os.getenv("ADDINS_SEARCH_CACHE_TTL", "300"))
+search_cache = TTLCache(
+    maxsize=512, ttl=SEARCH_CACHE_TTL, shared=shared_cache, namespace="search"
+)
+
+# Details responses are cached per asset ID, so repeated lookups (and the
+# details fan-out of search_and_expand) are coalesced and shared likewise.
+DETAILS_CACHE_TTL = float(os.getenv("ADDINS_DETAILS_CACHE_TTL", "300"))
+details_cache = TTLCache(
+    maxsize=1024, ttl=DETAILS_CACHE_TTL, shared=shared_cache, namespace="details"
+)
+
+# Pagination snapshots (see search_addins' cursor): how long a snapshot and
+# its pages are kept after last use.
+SNAPSHOT_TTL = float(os.getenv("ADDINS_SNAPSHOT_TTL", "600"))
+snapshot_cache = TTLCache(maxsize=1024, ttl=SNAPSHOT_TTL)
+page_cache = TTLCache(maxsize=256, ttl=SNAPSHOT_TTL)
+# Largest page fetched for the pages after the first one of a snapshot.
+MAX_SNAPSHOT_PAGE_SIZE = 100
+
+# Losing a snapshot expires its cursors, while a prefetched page is only
+# fetched again, so snapshots are kept longer under memory pressure.
+memory_budget.register("search", search_cache)
+memory_budget.register("details", details_cache)
+memory_budget.register("snapshots", snapshot_cache, weight=2.0)
+memory_budget.register("pages", page_cache, weight=0.5)
+
+cursor_pages_total = registry.counter(
+    "addins_cursor_pages_total",
+    "Search pages requested with a cursor, by whether a prefetch had them ready.",
+    labelnames=("source",),
+)
+
+# Background next-page prefetches; referenced so they are not collected.
+_prefetch_tasks: set[asyncio.Task] = set()
+
+# Upper bound on the number of searches one search_addins_multi call may run.
+MAX_MULTI_QUERIES = 10
+
+# Rank constant of reciprocal rank fusion (Cormack et al., 2009).
+RRF_K = 60
+
+
+class SearchSpec(TypedDict, total=False):
+    """Arguments of one search in a :func:`search_addins_multi` batch.
+
+    The keys are the keyword arguments of :func:`search_addins`.
+    """
+
+    query: str
+    category: List[str]
+    free: bool
+    clients: List[str]
+    productgroup: List[str]
+    productids: List[str]
+    assetids: List[str]
+    providertype: str
+    orderfield: str
+    orderby: str
+    top: int
+    skiptoitem: int
+    date: str
+    getMetaOSApps: bool
+    locale: str
+    locales: List[str]
+    autocorrect: bool
+
 
 async def get_addin_details(asset_id: str) -> dict:
     """Retrieve metadata for an Office add‑in.
@@ -23,38 +109,371 @@ async def get_addin_details(asset_id: str) -> dict:
     Parameters
     ----------
     asset_id: str
-        The unique identifier of the Office add‑in to look up.  This ID is
-        typically a GUID assigned by the Office Store.
+        The Office Store asset ID of the add‑in to look up: ``WA`` followed
+        by digits, e.g. ``WA104381441``.  Surrounding whitespace and a
+        lower-case prefix are accepted.
 
     Returns
     -------
     dict
         A dictionary containing the add‑in details returned by the API.
+        Responses are cached for :data:`DETAILS_CACHE_TTL` seconds.
 
     Raises
     ------
     httpx.HTTPStatusError
-        If the API response status is not 200 OK.
+        If the API response status is not 200 OK.  Malformed IDs and IDs
+        the API recently reported missing are rejected with a ``404``
+        without a request (see :mod:`tools.asset_ids`).
     httpx.RequestError
         If there is a network failure while communicating with the API.
     """
-    # Construct the query URL.  The API expects the asset ID as a query
-    # parameter named "assetid".  No authentication is required for this
-    # endpoint at the time of writing.
-    url = (
-        "https://api.addins.omex.office.net/api/addins/details"
-        f"?assetid={asset_id}"
+    asset_id = check_asset_id(asset_id)
+    # The API expects the asset ID as a query parameter named "assetid".  No
+    # authentication is required for this endpoint at the time of writing.
+    # Errors are raised by the shared client and converted into MCP error
+    # responses by FastMCP【410474369011793†L400-L447】.
+    async def fetch() -> dict:
+        try:
+            result = await upstream.get_json("details", params={"assetid": asset_id})
+        except httpx.HTTPStatusError as exc:
+            if exc.response.status_code == 404:
+                # The add-in was withdrawn from the store (or never existed).
+                missing_ids.set(asset_id, True)
+                catalog.remove(asset_id)
+            raise
+        _observe_details(result)
+        return result
+
+    return dict(await details_cache.get_or_fetch(asset_id, fetch, on_shared=_observe_details))
+
+
+def _observe_details(result: dict) -> None:
+    if isinstance(result, dict) and isinstance(result.get("Value"), dict):
+        observe_ids([result["Value"]])
+        title_index.add_records([result["Value"]])
+        catalog.add_records([result["Value"]])
+
+
+def locale_params(locale: str) -> tuple[dict, dict]:
+    """Translate a locale such as ``"es-ES"`` into API parameters and headers.
+
+    The Office Store accepts the unofficial regional parameters documented in
+    Office-AddIns-Search-API-Guide.md (``lc``, ``ui``, ``omkt`` and ``rs``)
+    as well as the ``Accept-Language`` header; all of them are derived from
+    the one locale tag.
+
+    Returns
+    -------
+    tuple[dict, dict]
+        The query parameters and request headers for ``locale``.
+    """
+    language, _, region = locale.replace("_", "-").partition("-")
+    params = {"lc": locale, "ui": language.lower(), "omkt": locale.lower()}
+    if region:
+        params["rs"] = region.upper()
+    headers = {"Accept-Language": f"{locale},{language.lower()};q=0.9"}
+    return params, headers
+
+
+def _search_key(params: dict, headers: Optional[dict] = None) -> tuple:
+    return (
+        tuple(sorted(params.items())),
+        tuple(sorted((headers or {}).items())),
+    )
+
+
+def _observe_search(result: dict, headers: Optional[dict] = None) -> None:
+    # Feed every title we see into the local index used for suggestions.
+    values = result.get("Values") or []
+    observe_ids(values)
+    title_index.add_records(values)
+    if headers is None:
+        # Only default-market records go into the catalog; localized
+        # titles would otherwise register as changes to the record.
+        catalog.add_records(values)
+
+
+async def _fetch_search(params: dict, headers: Optional[dict] = None) -> dict:
+    """Run one search request through the cache and return a private copy.
+
+    The cached response is shared, so callers receive a shallow copy they can
+    annotate with extra top-level keys.
+    """
+
+    async def fetch() -> dict:
+        result = await upstream.get_json("search", params=params, headers=headers)
+        _observe_search(result, headers)
+        return result
+
+    def observe(result: dict) -> None:
+        _observe_search(result, headers)
+
+    return dict(
+        await search_cache.get_or_fetch(_search_key(params, headers), fetch, on_shared=observe)
+    )
+
+
+def _addin_key(addin: dict) -> Optional[str]:
+    return addin.get("Id") or addin.get("ProductId")
+
+
+async def _search_locales(params: dict, locales: List[str]) -> dict:
+    """Run the same search in every locale concurrently and merge the results.
+
+    Add-ins are deduplicated by ``Id`` (or ``ProductId``) and interleaved by
+    rank so that each market contributes its top results first.  Each merged
+    add-in lists the locales it appeared in under ``Locales``.
+    """
+    locales = list(dict.fromkeys(locales))
+    requests = {}
+    for locale in locales:
+        extra_params, headers = locale_params(locale)
+        requests[locale] = ({**params, **extra_params}, headers)
+    # One batched shared-cache lookup instead of one round trip per locale;
+    # localized results are kept out of the catalog, as in _observe_search.
+    await search_cache.preload(
+        [_search_key(*request) for request in requests.values()],
+        on_shared=lambda result: _observe_search(result, {}),
+    )
+
+    async def run(locale: str) -> dict:
+        return await _fetch_search(*requests[locale])
+
+    outcomes = await asyncio.gather(
+        *(run(locale) for locale in locales), return_exceptions=True
+    )
+    failures = {
+        locale: outcome
+        for locale, outcome in zip(locales, outcomes)
+        if isinstance(outcome, BaseException)
+    }
+    if len(failures) == len(locales):
+        raise next(iter(failures.values()))
+
+    pages = [
+        (locale, outcome.get("Values") or [])
+        for locale, outcome in zip(locales, outcomes)
+        if locale not in failures
+    ]
+    merged: dict[str, dict] = {}
+    unkeyed: list[dict] = []
+    for rank in range(max((len(values) for _, values in pages), default=0)):
+        for locale, values in pages:
+            if rank >= len(values):
+                continue
+            addin = values[rank]
+            key = _addin_key(addin)
+            if key is None:
+                unkeyed.append({**addin, "Locales": [locale]})
+            elif key in merged:
+                merged[key]["Locales"].append(locale)
+            else:
+                merged[key] = {**addin, "Locales": [locale]}
+
+    order = {locale: i for i, locale in enumerate(locales)}
+    for addin in merged.values():
+        addin["Locales"].sort(key=order.__getitem__)
+
+    values = list(merged.values()) + unkeyed
+    result = {
+        "TotalCount": len(values),
+        "Values": values,
+        "LocaleTotals": {
+            locale: outcome.get("TotalCount")
+            for locale, outcome in zip(locales, outcomes)
+            if locale not in failures
+        },
+    }
+    if failures:
+        result["LocaleErrors"] = {
+            locale: f"{type(exc).__name__}: {exc}" for locale, exc in failures.items()
+        }
+    return result
+
+
+def _encode_search_cursor(snapshot_id: str, offset: int) -> str:
+    payload = {"s": snapshot_id, "o": offset}
+    data = json.dumps(payload, sort_keys=True, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(data).decode().rstrip("=")
+
+
+def _decode_search_cursor(cursor: str) -> tuple[str, int]:
+    try:
+        data = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        state = json.loads(data)
+        snapshot_id, offset = state["s"], state["o"]
+        if not (isinstance(snapshot_id, str) and isinstance(offset, int) and offset >= 0):
+            raise TypeError
+    except (ValueError, KeyError, TypeError) as exc:
+        raise ValueError(f"invalid search cursor {cursor!r}") from exc
+    return snapshot_id, offset
+
+
+async def _fetch_snapshot_page(snapshot_id: str, snapshot: dict, offset: int) -> dict:
+    """Return a page of a snapshot, fetching it once and pinning it."""
+    page_params = {
+        **snapshot["Params"],
+        "top": str(snapshot["PageSize"]),
+        "skiptoitem": str(offset),
+    }
+    return await page_cache.get_or_fetch(
+        (snapshot_id, offset), lambda: _fetch_search(page_params, snapshot["Headers"])
     )
 
-    # Use an asynchronous HTTP client to avoid blocking the event loop.  A
-    # context manager ensures that network resources are cleaned up properly.
-    async with httpx.AsyncClient(timeout=30.0) as client:
-        response = await client.get(url)
-        # Raise an exception if the response status indicates an error.  FastMCP
-        # automatically converts exceptions into MCP error responses for the
-        # client.  See documentation for more details【410474369011793†L400-L447】.
-        response.raise_for_status()
-        return response.json()
+
+def _prefetch_done(task: asyncio.Task) -> None:
+    _prefetch_tasks.discard(task)
+    if not task.cancelled():
+        # A failed prefetch is simply fetched again on demand.
+        task.exception()
+
+
+def _prefetch_page(snapshot_id: str, snapshot: dict, offset: int) -> None:
+    """Start fetching the next page of a snapshot in the background.
+
+    Skipped when the page is already available or the upstream limiter is
+    saturated, so speculation never delays foreground requests.
+    """
+    key = (snapshot_id, offset)
+    if key in page_cache or page_cache.fetching(key) or upstream.get_limiter().locked():
+        return
+    task = asyncio.ensure_future(_fetch_snapshot_page(snapshot_id, snapshot, offset))
+    _prefetch_tasks.add(task)
+    task.add_done_callback(_prefetch_done)
+
+
+def _snapshot_result(snapshot_id: str, snapshot: dict, offset: int, page: dict) -> dict:
+    """Shape a snapshot page for the caller and prefetch the following page.
+
+    Add-ins already returned on an earlier page of the snapshot (because
+    the store shifted between page fetches) are dropped, and ``TotalCount``
+    stays the one reported for the first page.
+    """
+    seen = snapshot["Seen"]
+    raw_values = page.get("Values") or []
+    values = []
+    for addin in raw_values:
+        key = _addin_key(addin)
+        if key is not None and seen.setdefault(key, offset) < offset:
+            continue
+        values.append(addin)
+
+    total = snapshot["TotalCount"]
+    result = {**page, "TotalCount": total, "Values": values}
+    next_offset = offset + len(raw_values)
+    if raw_values and isinstance(total, int) and next_offset < total:
+        result["NextCursor"] = _encode_search_cursor(snapshot_id, next_offset)
+        _prefetch_page(snapshot_id, snapshot, next_offset)
+    return result
+
+
+def _start_snapshot(params: dict, headers: Optional[dict], first_page: dict) -> dict:
+    """Open a pagination snapshot for a search whose first page is ``first_page``.
+
+    The query parameters, headers and page size stay in the snapshot; the
+    cursor only carries the snapshot ID and the offset of the next page.
+    """
+    params = dict(params)
+    offset = int(params.pop("skiptoitem", 0) or 0)
+    size = int(params.pop("top", 0) or 0) or len(first_page.get("Values") or [])
+    if size <= 0:
+        return first_page
+    snapshot_id = secrets.token_urlsafe(9)
+    snapshot = {
+        "Params": params,
+        "Headers": headers,
+        "PageSize": min(size, MAX_SNAPSHOT_PAGE_SIZE),
+        "TotalCount": first_page.get("TotalCount"),
+        "Seen": {},
+    }
+    snapshot_cache.set(snapshot_id, snapshot)
+    page_cache.set((snapshot_id, offset), first_page)
+    return _snapshot_result(snapshot_id, snapshot, offset, first_page)
+
+
+async def _search_page(cursor: str) -> dict:
+    """Return the page a cursor points to, from the same snapshot."""
+    snapshot_id, offset = _decode_search_cursor(cursor)
+    snapshot = snapshot_cache.get(snapshot_id)
+    if snapshot is None:
+        raise ValueError("the search cursor has expired; repeat the search without a cursor")
+    # Reading a page keeps the snapshot alive.
+    snapshot_cache.set(snapshot_id, snapshot)
+
+    key = (snapshot_id, offset)
+    ready = key in page_cache or page_cache.fetching(key)
+    cursor_pages_total.inc(source="prefetched" if ready else "fetched")
+    page = await _fetch_snapshot_page(snapshot_id, snapshot, offset)
+    return _snapshot_result(snapshot_id, snapshot, offset, dict(page))
+
+
+def build_search_params(
+    query: Optional[str] = None,
+    category: Optional[List[str]] = None,
+    free: Optional[bool] = None,
+    clients: Optional[List[str]] = None,
+    productgroup: Optional[List[str]] = None,
+    productids: Optional[List[str]] = None,
+    assetids: Optional[List[str]] = None,
+    providertype: Optional[str] = None,
+    orderfield: Optional[str] = None,
+    orderby: Optional[str] = None,
+    top: Optional[int] = None,
+    skiptoitem: Optional[int] = None,
+    date: Optional[str] = None,
+    getMetaOSApps: Optional[bool] = None,
+) -> dict:
+    """Translate :func:`search_addins` arguments into API query parameters.
+
+    See :func:`search_addins` for the meaning of each argument.
+    """
+    # Build query parameters
+    params = {}
+
+    if query is not None:
+        params["qu"] = query
+    
+    if category is not None:
+        params["category"] = ",".join(category)
+    
+    if free is not None:
+        params["free"] = str(free).lower()
+    
+    if clients is not None:
+        params["clients"] = ",".join(clients)
+    
+    if productgroup is not None:
+        params["productgroup"] = ",".join(productgroup)
+    
+    if productids is not None:
+        params["productids"] = ",".join(productids)
+    
+    if assetids is not None:
+        params["assetids"] = ",".join(assetids)
+    
+    if providertype is not None:
+        params["providertype"] = providertype
+    
+    if orderfield is not None:
+        params["orderfield"] = orderfield
+    
+    if orderby is not None:
+        params["orderby"] = orderby
+    
+    if top is not None:
+        params["top"] = str(top)
+    
+    if skiptoitem is not None:
+        params["skiptoitem"] = str(skiptoitem)
+    
+    if date is not None:
+        params["date"] = date
+    
+    if getMetaOSApps is not None:
+        params["getMetaOSApps"] = str(getMetaOSApps).lower()
+
+    return params
 
 
 async def search_addins(
@@ -72,6 +491,11 @@ async def search_addins(
     skiptoitem: Optional[int] = None,
     date: Optional[str] = None,
     getMetaOSApps: Optional[bool] = None,
+    locale: Optional[str] = None,
+    locales: Optional[List[str]] = None,
+    autocorrect: bool = True,
+    cursor: Optional[str] = None,
+    paginate: bool = True,
 ) -> dict:
     """Search for Office Add-ins using the Office Store API.
 
@@ -113,6 +537,26 @@ async def search_addins(
         Date override for cache bypass (yyyy-MM-dd format).
     getMetaOSApps : bool, optional
         Include MetaOS applications in results.
+    locale : str, optional
+        Market/language to search in (e.g. "es-ES").  Sets the ``lc``, ``ui``,
+        ``omkt`` and ``rs`` parameters and the ``Accept-Language`` header.
+    locales : List[str], optional
+        Run the same search across several locales concurrently (e.g.
+        ["en-US", "de-DE", "ja-JP"]) and merge the results.  Takes precedence
+        over ``locale``.
+    autocorrect : bool, optional
+        When the query as typed matches nothing, rewrite its obviously
+        misspelled words using the local title index and search again
+        (default True).  Queries with results are never rewritten.
+    cursor : str, optional
+        The ``NextCursor`` of a previous result, to fetch the following
+        page.  All other arguments are ignored; the page comes from the same
+        snapshot as the first one, so add-ins are neither repeated nor
+        skipped because the store changed in between.
+    paginate : bool, optional
+        Open a pagination snapshot, return ``NextCursor`` and prefetch the
+        next page in the background (default True).  Pages after the first
+        hold at most ``MAX_SNAPSHOT_PAGE_SIZE`` (100) add-ins.
 
     Returns
     -------
@@ -120,9 +564,22 @@ async def search_addins(
         A dictionary containing search results with the following structure:
         - TotalCount: Total number of matching results
         - Values: Array of add-in objects for the current page
+        - QueryRewrite: Present only when the query matched nothing and was
+          autocorrected, with the Original and Rewritten query strings
+        - NextCursor: Opaque cursor for the next page, present while more
+          results remain (not for multi-locale searches)
+
+        When ``locales`` is given, ``Values`` holds the add-ins of every
+        locale deduplicated by ``Id`` (or ``ProductId``), each with a
+        ``Locales`` list, ``TotalCount`` is the number of merged add-ins,
+        ``LocaleTotals`` maps each locale to its own TotalCount and
+        ``LocaleErrors`` lists locales whose request failed (the call only
+        fails when every locale fails).
 
     Raises
     ------
+    ValueError
+        If ``cursor`` is malformed or its snapshot has expired.
     httpx.HTTPStatusError
         If the API response status is not 200 OK.
     httpx.RequestError
@@ -145,58 +602,169 @@ async def search_addins(
 
     Get specific add-ins by asset ID:
         await search_addins(assetids=["WA104381441", "WA102957665"])
+
+    Search German, French and Japanese markets at once:
+        await search_addins(query="calendar", locales=["de-DE", "fr-FR", "ja-JP"])
+
+    Page through results:
+        page = await search_addins(query="calendar", top=20)
+        while "NextCursor" in page:
+            page = await search_addins(cursor=page["NextCursor"])
     """
-    # Base URL for the search API
-    base_url = "https://api.addins.omex.office.net/api/addins/search"
-    
-    # Build query parameters
-    params = {}
-    
-    if query is not None:
-        params["qu"] = query
-    
-    if category is not None:
-        params["category"] = ",".join(category)
-    
-    if free is not None:
-        params["free"] = str(free).lower()
-    
-    if clients is not None:
-        params["clients"] = ",".join(clients)
-    
-    if productgroup is not None:
-        params["productgroup"] = ",".join(productgroup)
-    
-    if productids is not None:
-        params["productids"] = ",".join(productids)
-    
-    if assetids is not None:
-        params["assetids"] = ",".join(assetids)
-    
-    if providertype is not None:
-        params["providertype"] = providertype
-    
-    if orderfield is not None:
-        params["orderfield"] = orderfield
-    
-    if orderby is not None:
-        params["orderby"] = orderby
-    
-    if top is not None:
-        params["top"] = str(top)
-    
-    if skiptoitem is not None:
-        params["skiptoitem"] = str(skiptoitem)
-    
-    if date is not None:
-        params["date"] = date
-    
-    if getMetaOSApps is not None:
-        params["getMetaOSApps"] = str(getMetaOSApps).lower()
+    if cursor is not None:
+        return await _search_page(cursor)
+
+    async def run(text: Optional[str]) -> tuple[dict, dict, Optional[dict]]:
+        params = build_search_params(
+            query=text,
+            category=category,
+            free=free,
+            clients=clients,
+            productgroup=productgroup,
+            productids=productids,
+            assetids=assetids,
+            providertype=providertype,
+            orderfield=orderfield,
+            orderby=orderby,
+            top=top,
+            skiptoitem=skiptoitem,
+            date=date,
+            getMetaOSApps=getMetaOSApps,
+        )
+        if locales:
+            return await _search_locales(params, locales), params, None
+        headers = None
+        if locale:
+            extra_params, headers = locale_params(locale)
+            params = {**params, **extra_params}
+        return await _fetch_search(params, headers), params, headers
+
+    result, params, headers = await run(query)
+    rewritten = None
+    if query and autocorrect and not result.get("TotalCount"):
+        # Only a query that matches nothing is taken to be misspelled.
+        rewritten = title_index.correct_query(query)
+        if rewritten is not None:
+            result, params, headers = await run(rewritten)
+
+    if paginate and not locales:
+        result = _start_snapshot(params, headers, result)
+    if rewritten is not None:
+        result["QueryRewrite"] = {"Original": query, "Rewritten": rewritten}
+    return result
+
+
+async def suggest_addins(text: str, limit: int = 10) -> dict:
+    """Suggest add-ins whose title or provider matches a prefix or typo.
+
+    Lookups are served entirely from the local title index, which is built
+    from every search and details response the server has seen, so no API
+    request is made.
+
+    Parameters
+    ----------
+    text : str
+        A title prefix (e.g. "Zoo") or a possibly misspelled name
+        (e.g. "Zooom", "Docusing").
+    limit : int, optional
+        Maximum number of suggestions to return (default 10).
+
+    Returns
+    -------
+    dict
+        A dictionary with the following structure:
+        - TotalCount: Number of suggestions returned
+        - Values: Ranked candidates with Id, Title, MatchedOn and Score
+    """
+    values = title_index.suggest(text, limit=limit)
+    return {"TotalCount": len(values), "Values": values}
+
+
+async def search_addins_multi(
+    queries: List[SearchSpec],
+    fusion: Optional[str] = None,
+) -> dict:
+    """Run several searches concurrently and merge their results.
+
+    Each entry of ``queries`` takes the same arguments as
+    :func:`search_addins`.  The searches share the upstream concurrency limit
+    and response cache, and add-ins returned by more than one search are
+    reported once together with every search that matched them.
+
+    Parameters
+    ----------
+    queries : List[SearchSpec]
+        Search argument sets, e.g. ``[{"query": "calendar"},
+        {"query": "scheduling", "clients": ["Win32_Outlook"]}]``.  At most
+        :data:`MAX_MULTI_QUERIES` entries are accepted.
+    fusion : str, optional
+        ``"rrf"`` to order the merged add-ins by reciprocal rank fusion
+        score.  By default add-ins are listed in order of first appearance
+        (by query, then by rank).
+
+    Returns
+    -------
+    dict
+        A dictionary with the following structure:
+        - TotalCount: Number of distinct add-ins across all searches
+        - Values: Add-in objects, each with a Matches list of
+          {"Query": index, "Rank": 1-based rank} and, with fusion, a
+          FusedScore
+        - Queries: Per-search summary with Index, TotalCount and, for failed
+          searches, Error (the call only fails when every search fails)
+
+    Raises
+    ------
+    ValueError
+        If no queries, too many queries, unknown arguments or an unknown
+        fusion method are given.
+    """
+    if not queries:
+        raise ValueError("queries must contain at least one search")
+    if len(queries) > MAX_MULTI_QUERIES:
+        raise ValueError(f"at most {MAX_MULTI_QUERIES} queries are allowed per call")
+    if fusion not in (None, "rrf"):
+        raise ValueError(f"unknown fusion method {fusion!r}; expected 'rrf'")
+    allowed = SearchSpec.__annotations__.keys()
+    for index, spec in enumerate(queries):
+        unknown = set(spec) - allowed
+        if unknown:
+            raise ValueError(f"query {index} has unknown arguments: {sorted(unknown)}")
+
+    outcomes = await asyncio.gather(
+        *(search_addins(**spec, paginate=False) for spec in queries),
+        return_exceptions=True,
+    )
+    if all(isinstance(outcome, BaseException) for outcome in outcomes):
+        raise outcomes[0]
+
+    merged: dict[str, dict] = {}
+    unkeyed: list[dict] = []
+    summaries: list[dict] = []
+    for index, outcome in enumerate(outcomes):
+        if isinstance(outcome, BaseException):
+            summaries.append(
+                {"Index": index, "Error": f"{type(outcome).__name__}: {outcome}"}
+            )
+            continue
+        summaries.append({"Index": index, "TotalCount": outcome.get("TotalCount")})
+        for rank, addin in enumerate(outcome.get("Values") or [], start=1):
+            match = {"Query": index, "Rank": rank}
+            key = _addin_key(addin)
+            if key is None:
+                unkeyed.append({**addin, "Matches": [match]})
+            elif key in merged:
+                merged[key]["Matches"].append(match)
+            else:
+                merged[key] = {**addin, "Matches": [match]}
+
+    values = list(merged.values()) + unkeyed
+    if fusion == "rrf":
+        for addin in values:
+            addin["FusedScore"] = round(
+                sum(1.0 / (RRF_K + m["Rank"]) for m in addin["Matches"]), 6
+            )
+        # sorted() is stable, so ties keep their order of first appearance.
+        values = sorted(values, key=lambda addin: -addin["FusedScore"])
 
-    # Use an asynchronous HTTP client to make the request
-    async with httpx.AsyncClient(timeout=30.0) as client:
-        response = await client.get(base_url, params=params)
-        # Raise an exception if the response status indicates an error
-        response.raise_for_status()
-        return response.json()
\ No newline at end of file
+    return {"TotalCount": len(values), "Values": values, "Queries": summaries}
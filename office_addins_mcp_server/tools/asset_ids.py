@@ -0,0 +1,172 @@
+"""
+Asset ID Checks
+===============
+
+Cheap checks that let ``get_addin_details`` reject asset IDs that cannot
+exist without a round trip to the Office Add-ins API:
+
+- the format check: store asset IDs are ``WA`` followed by digits
+  (e.g. ``WA104381441``);
+- the negative cache: IDs the API answered ``404`` for are remembered for
+  :data:`MISSING_TTL` seconds, and forgotten as soon as a response returns
+  them;
+- optionally, a Bloom filter of every ID seen by the last complete catalog
+  scan (see :func:`tools.changelog.refresh_catalog`).  With
+  ``ADDINS_REJECT_UNKNOWN_IDS`` set, IDs the filter has definitely not seen
+  are rejected too; add-ins published after that scan are then reported
+  missing until the next one.
+
+Rejections raise :class:`AssetIdRejected`, an ``httpx.HTTPStatusError``
+carrying a ``404`` response, so callers handle them exactly like a ``404``
+from the API.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import math
+import os
+import re
+import time
+from typing import Iterable, Optional
+
+import httpx
+
+from office_addins_mcp_server.memory_budget import memory_budget
+from office_addins_mcp_server.metrics import registry
+from office_addins_mcp_server.tools.cache import TTLCache
+from office_addins_mcp_server.tools.upstream import API_BASE_URL
+
+
+ASSET_ID_PATTERN = re.compile(r"WA\d+")
+
+# Seconds an asset ID the API reported missing is answered from the cache.
+MISSING_TTL = float(os.getenv("ADDINS_MISSING_TTL", "300"))
+
+# Reject IDs absent from the Bloom filter of the last complete catalog scan.
+REJECT_UNKNOWN_IDS = os.getenv("ADDINS_REJECT_UNKNOWN_IDS", "").lower() in ("1", "true", "yes")
+
+# False positive rate of the known-ID filter.
+BLOOM_ERROR_RATE = 0.001
+
+missing_ids = TTLCache(maxsize=8192, ttl=MISSING_TTL)
+memory_budget.register("missing_ids", missing_ids)
+
+rejections_total = registry.counter(
+    "addins_asset_id_rejections_total",
+    "Asset ID lookups answered without an upstream request, by reason.",
+    labelnames=("reason",),
+)
+
+
+class AssetIdRejected(httpx.HTTPStatusError):
+    """An asset ID was rejected locally; behaves like a ``404`` from the API."""
+
+    def __init__(self, asset_id: str, reason: str) -> None:
+        request = httpx.Request("GET", f"{API_BASE_URL}/details", params={"assetid": asset_id})
+        super().__init__(
+            f"add-in {asset_id!r} not found: {reason}",
+            request=request,
+            response=httpx.Response(404, request=request),
+        )
+        self.asset_id = asset_id
+        self.reason = reason
+
+
+class BloomFilter:
+    """A Bloom filter over strings, sized when it is (re)built.
+
+    Membership tests may return false positives at about ``error_rate`` but
+    never false negatives.  An unbuilt filter contains nothing and reports
+    ``built_at`` as ``None``.
+    """
+
+    def __init__(self, error_rate: float = BLOOM_ERROR_RATE) -> None:
+        self.error_rate = error_rate
+        self.clear()
+
+    def __len__(self) -> int:
+        return self.count
+
+    def clear(self) -> None:
+        self._bits = bytearray(1)
+        self._size = 8
+        self._hashes = 1
+        self.count = 0
+        self.built_at: Optional[float] = None
+
+    def _positions(self, item: str) -> Iterable[int]:
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "little")
+        second = int.from_bytes(digest[8:], "little") | 1
+        # Double hashing: k positions from two independent hashes.
+        return ((first + i * second) % self._size for i in range(self._hashes))
+
+    def add(self, item: str) -> None:
+        for position in self._positions(item):
+            self._bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, item: str) -> bool:
+        return all(
+            self._bits[position >> 3] & (1 << (position & 7))
+            for position in self._positions(item)
+        )
+
+    def rebuild(self, items: Iterable[str]) -> None:
+        """Replace the contents with ``items``, sized for their number."""
+        items = list(items)
+        capacity = max(len(items), 1)
+        size = math.ceil(-capacity * math.log(self.error_rate) / math.log(2) ** 2)
+        self._size = max(8, size)
+        self._hashes = max(1, round(self._size / capacity * math.log(2)))
+        self._bits = bytearray((self._size + 7) // 8)
+        self.count = 0
+        for item in items:
+            self.add(item)
+        self.built_at = time.time()
+
+
+known_ids = BloomFilter()
+
+
+def check_asset_id(asset_id: str) -> str:
+    """Return ``asset_id`` normalized, or raise if it is known not to exist.
+
+    Raises
+    ------
+    AssetIdRejected
+        If the ID is malformed, recently reported missing by the API, or
+        (with ``ADDINS_REJECT_UNKNOWN_IDS``) absent from the last complete
+        catalog scan.
+    """
+    normalized = asset_id.strip().upper()
+    if not ASSET_ID_PATTERN.fullmatch(normalized):
+        rejections_total.inc(reason="format")
+        raise AssetIdRejected(
+            asset_id, "asset IDs are 'WA' followed by digits, e.g. WA104381441"
+        )
+    if normalized in missing_ids:
+        rejections_total.inc(reason="missing")
+        raise AssetIdRejected(normalized, "recently reported missing by the store")
+    if REJECT_UNKNOWN_IDS and known_ids.built_at is not None and normalized not in known_ids:
+        rejections_total.inc(reason="unknown")
+        raise AssetIdRejected(normalized, "not in the last catalog scan")
+    return normalized
+
+
+def observe_ids(records: Iterable[dict]) -> None:
+    """Note the IDs of ``records`` returned by the API as existing.
+
+    They are dropped from the negative cache and added to a built filter, so
+    add-ins published since the last scan are not rejected once seen.
+    """
+    track = known_ids.built_at is not None
+    if not track and not len(missing_ids):
+        return
+    for record in records:
+        asset_id = record.get("Id")
+        if asset_id:
+            missing_ids.pop(asset_id)
+            if track and asset_id not in known_ids:
+                known_ids.add(asset_id)
@@ -0,0 +1,247 @@
+"""
+Response Cache
+==============
+
+A small in-process TTL cache with LRU eviction used to avoid repeating
+identical Office Add-ins API requests.  Concurrent lookups of the same missing
+key are coalesced so that only one upstream request is in flight per key.
+
+A cache can be backed by a shared tier (see
+:mod:`office_addins_mcp_server.tools.cache_backends`) that local misses are
+looked up in, and fetched values written to, before going upstream.
+
+Caches registered with the process memory budget
+(:mod:`office_addins_mcp_server.memory_budget`) also track the approximate
+size and last use of each entry, and are evicted from by the budget under
+memory pressure.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import math
+import time
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Hashable, Iterable, Optional
+
+from office_addins_mcp_server.memory_budget import ENTRY_OVERHEAD, approximate_size
+
+if TYPE_CHECKING:
+    from office_addins_mcp_server.memory_budget import MemoryBudget
+    from office_addins_mcp_server.tools.cache_backends import SharedCache
+
+
+class TTLCache:
+    """Least-recently-used cache whose entries expire after ``ttl`` seconds.
+
+    Parameters
+    ----------
+    maxsize : int
+        Maximum number of entries kept before the least recently used entry
+        is evicted.
+    ttl : float
+        Lifetime of an entry in seconds.
+    clock : Callable[[], float], optional
+        Monotonic time source, replaceable in tests.
+    shared : SharedCache, optional
+        Shared tier consulted by :meth:`get_or_fetch` and :meth:`preload`.
+        Keys and values must then be JSON-serializable.
+    namespace : str
+        Distinguishes this cache's entries in the shared tier.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 1024,
+        ttl: float = 300.0,
+        clock: Callable[[], float] = time.monotonic,
+        shared: Optional["SharedCache"] = None,
+        namespace: str = "",
+    ) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.shared = shared
+        self.namespace = namespace
+        self._clock = clock
+        self._data: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._inflight: dict[Hashable, asyncio.Future] = {}
+        # Entry sizes and last uses, tracked once registered with a budget.
+        self.budget: Optional["MemoryBudget"] = None
+        self.nbytes = 0
+        self._sizes: dict[Hashable, int] = {}
+        self._used: dict[Hashable, float] = {}
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self.get(key) is not None
+
+    def fetching(self, key: Hashable) -> bool:
+        """Return whether a :meth:`get_or_fetch` for ``key`` is in flight."""
+        return key in self._inflight
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return the cached value for ``key`` or ``None`` if absent or expired."""
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        expires, value = entry
+        now = self._clock()
+        if expires <= now:
+            self._drop(key)
+            return None
+        self._data.move_to_end(key)
+        if self.budget is not None:
+            self._used[key] = now
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        """Store ``value`` under ``key`` for ``ttl`` (or the default) seconds."""
+        now = self._clock()
+        expires = now + (self.ttl if ttl is None else ttl)
+        self._data[key] = (expires, value)
+        self._data.move_to_end(key)
+        if self.budget is not None:
+            size = approximate_size(key) + approximate_size(value) + ENTRY_OVERHEAD
+            self.nbytes += size - self._sizes.get(key, 0)
+            self._sizes[key] = size
+            self._used[key] = now
+        while len(self._data) > self.maxsize:
+            self._drop(next(iter(self._data)))
+        if self.budget is not None:
+            self.budget.enforce()
+
+    def _drop(self, key: Hashable) -> Optional[tuple[float, Any]]:
+        entry = self._data.pop(key, None)
+        self._used.pop(key, None)
+        self.nbytes -= self._sizes.pop(key, 0)
+        return entry
+
+    def pop(self, key: Hashable) -> Optional[Any]:
+        """Remove ``key`` and return its value, if present."""
+        entry = self._drop(key)
+        return entry[1] if entry else None
+
+    def clear(self) -> None:
+        """Remove every entry and forget fetches in flight."""
+        self._data.clear()
+        self._inflight.clear()
+        self._sizes.clear()
+        self._used.clear()
+        self.nbytes = 0
+
+    def coldest(self) -> Optional[tuple[float, int]]:
+        """Return the idle seconds and size of the least recently used entry.
+
+        An expired entry counts as idle forever.
+        """
+        if not self._data:
+            return None
+        key = next(iter(self._data))
+        now = self._clock()
+        idle = math.inf if self._data[key][0] <= now else now - self._used.get(key, now)
+        return idle, self._sizes.get(key, 0)
+
+    def evict_coldest(self) -> int:
+        """Evict the least recently used entry and return the bytes freed."""
+        if not self._data:
+            return 0
+        before = self.nbytes
+        self._drop(next(iter(self._data)))
+        return before - self.nbytes
+
+    async def preload(
+        self, keys: Iterable[Hashable], on_shared: Optional[Callable[[Any], None]] = None
+    ) -> int:
+        """Copy the shared tier's entries for ``keys`` into this cache.
+
+        Keys already cached or being fetched are skipped and the rest are
+        looked up in one batch, so a following run of :meth:`get_or_fetch`
+        calls hits locally.  ``on_shared`` is called with each value found.
+        Returns the number of entries loaded.
+        """
+        if self.shared is None:
+            return 0
+        missing = [
+            key for key in dict.fromkeys(keys)
+            if key not in self._inflight and self.get(key) is None
+        ]
+        if not missing:
+            return 0
+        values = await self.shared.get_many(
+            [self.shared.key(self.namespace, key) for key in missing]
+        )
+        loaded = 0
+        for key, value in zip(missing, values):
+            if value is not None and self.get(key) is None:
+                if on_shared is not None:
+                    on_shared(value)
+                self.set(key, value)
+                loaded += 1
+        return loaded
+
+    async def _load(
+        self,
+        key: Hashable,
+        fetch: Callable[[], Awaitable[Any]],
+        on_shared: Optional[Callable[[Any], None]],
+    ) -> Any:
+        if self.shared is None:
+            return await fetch()
+        shared_key = self.shared.key(self.namespace, key)
+        value = await self.shared.get(shared_key)
+        if value is not None:
+            if on_shared is not None:
+                on_shared(value)
+            return value
+        value = await fetch()
+        await self.shared.set(shared_key, value, self.ttl)
+        return value
+
+    async def get_or_fetch(
+        self,
+        key: Hashable,
+        fetch: Callable[[], Awaitable[Any]],
+        on_shared: Optional[Callable[[Any], None]] = None,
+    ) -> Any:
+        """Return the cached value for ``key``, calling ``fetch`` on a miss.
+
+        Callers that miss on the same key while a fetch is already running
+        wait for that fetch instead of starting their own.  Exceptions are
+        propagated to every waiter and nothing is cached.  With a shared
+        tier, a local miss is looked up there first (calling ``on_shared``
+        with the value found, since ``fetch`` and its side effects are then
+        skipped) and fetched values are written back to it.
+        """
+        while True:
+            value = self.get(key)
+            if value is not None:
+                return value
+            pending = self._inflight.get(key)
+            if pending is None:
+                break
+            # asyncio.wait does not propagate the owner's cancellation; if
+            # the owning fetch was cancelled, retry and become the owner.
+            await asyncio.wait({pending})
+            if not pending.cancelled():
+                return pending.result()
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            value = await self._load(key, fetch, on_shared)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as exc:
+            future.set_exception(exc)
+            # Mark the exception as retrieved when nobody else was waiting.
+            future.exception()
+            raise
+        else:
+            self.set(key, value)
+            future.set_result(value)
+            return value
+        finally:
+            self._inflight.pop(key, None)
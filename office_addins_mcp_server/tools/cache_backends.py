@@ -0,0 +1,557 @@
+"""
+Shared Cache Backends
+=====================
+
+A second cache tier shared between server instances, so that scaling out
+does not multiply the request rate against the Office Add-ins API.  The
+in-process :class:`~office_addins_mcp_server.tools.cache.TTLCache` stays in
+front of it: local hits never leave the process, and only local misses are
+looked up in the shared tier before going upstream.
+
+Backends store opaque bytes with a TTL and implement :class:`CacheBackend`:
+
+- :class:`MemoryBackend`, in-process (useful in tests and single-instance
+  deployments);
+- :class:`DiskBackend`, one file per entry in a directory, which App Service
+  shares between the instances of a plan when it lives under ``/home``;
+- :class:`RedisBackend`, any server speaking the Redis protocol (Redis,
+  Azure Cache for Redis, Valkey, Garnet), with pipelined commands over a
+  small connection pool and no client library dependency.
+
+:class:`SharedCache` wraps a backend with JSON encoding, zlib compression of
+larger values, a per-operation timeout and a circuit breaker: when the
+backend fails, it is skipped for :data:`CACHE_RETRY_AFTER` seconds and the
+server keeps serving from its local cache alone.  Waiting for a free pooled
+connection is not a failure: such a lookup misses without tripping the
+breaker.
+
+The backend is chosen with ``ADDINS_CACHE_BACKEND``: ``memory``,
+``disk:/home/addins-cache`` or ``redis://[:password@]host:6379/0``
+(``rediss://`` for TLS).  When unset, caching is local only.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import ssl
+import struct
+import tempfile
+import time
+import zlib
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Any, Callable, Mapping, Optional, Sequence
+from urllib.parse import unquote, urlsplit
+
+from office_addins_mcp_server.memory_budget import memory_budget
+from office_addins_mcp_server.metrics import registry
+from office_addins_mcp_server.tools.cache import TTLCache
+
+
+# Seconds a single shared-cache operation may take before it counts as a
+# failure, and how long the backend is then bypassed.
+CACHE_BACKEND_TIMEOUT = float(os.getenv("ADDINS_CACHE_BACKEND_TIMEOUT", "0.25"))
+CACHE_RETRY_AFTER = float(os.getenv("ADDINS_CACHE_RETRY_AFTER", "30"))
+
+# Connections a Redis backend opens at most.
+CACHE_REDIS_POOL_SIZE = int(os.getenv("ADDINS_CACHE_REDIS_POOL_SIZE", "4"))
+
+# Encoded values at least this large are zlib-compressed.
+CACHE_COMPRESS_MIN_SIZE = int(os.getenv("ADDINS_CACHE_COMPRESS_MIN_SIZE", "1024"))
+
+# Prefix of every shared key; bump the version when cached shapes change.
+CACHE_KEY_PREFIX = "addins:v1"
+
+logger = logging.getLogger("office-addins-mcp")
+
+shared_lookups_total = registry.counter(
+    "addins_cache_shared_lookups_total",
+    "Shared cache lookups by result (hit, miss, error, busy or bypassed while down).",
+    labelnames=("result",),
+)
+
+
+class CacheBackendError(Exception):
+    """The shared cache backend rejected a command."""
+
+
+class CacheBackendBusy(CacheBackendError):
+    """Every connection to the backend stayed in use for the whole timeout."""
+
+
+class CacheBackend(ABC):
+    """Interface of a shared cache backend.
+
+    Keys are strings and values opaque bytes.  Implementations raise
+    :class:`CacheBackendError` or :class:`OSError` on failure;
+    :class:`SharedCache` turns those into misses.
+
+    Backends that bound each operation themselves set ``applies_timeout``,
+    so that :class:`SharedCache` does not time them out as a whole.
+    """
+
+    applies_timeout = False
+
+    @abstractmethod
+    async def get_many(self, keys: Sequence[str]) -> list[Optional[bytes]]:
+        """Return the value of each key, ``None`` where missing or expired."""
+
+    @abstractmethod
+    async def set_many(self, items: Mapping[str, bytes], ttl: float) -> None:
+        """Store every item for ``ttl`` seconds."""
+
+    @abstractmethod
+    async def delete(self, key: str) -> None:
+        """Remove ``key`` if present."""
+
+    async def close(self) -> None:
+        """Release connections or other resources."""
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return (await self.get_many([key]))[0]
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        await self.set_many({key: value}, ttl)
+
+
+class MemoryBackend(CacheBackend):
+    """Keep entries in an in-process LRU cache."""
+
+    def __init__(self, maxsize: int = 4096, clock: Callable[[], float] = time.monotonic) -> None:
+        self._data = TTLCache(maxsize=maxsize, clock=clock)
+
+    async def get_many(self, keys: Sequence[str]) -> list[Optional[bytes]]:
+        return [self._data.get(key) for key in keys]
+
+    async def set_many(self, items: Mapping[str, bytes], ttl: float) -> None:
+        for key, value in items.items():
+            self._data.set(key, value, ttl=ttl)
+
+    async def delete(self, key: str) -> None:
+        self._data.pop(key)
+
+
+class DiskBackend(CacheBackend):
+    """Keep one file per entry in ``directory``.
+
+    Each file holds the wall-clock expiry time followed by the value and is
+    replaced atomically, so several processes (or App Service instances
+    sharing ``/home``) can use the same directory.  Expired files are
+    removed when read and, once more than ``max_entries`` files exist, by a
+    sweep that also drops the least recently written ones.
+
+    Parameters
+    ----------
+    directory : str or Path
+        Cache directory, created if needed.
+    max_entries : int
+        Number of files kept after a sweep.
+    """
+
+    _HEADER = struct.Struct(">d")
+
+    def __init__(self, directory: str | Path, max_entries: int = 20_000) -> None:
+        self.directory = Path(directory)
+        self.max_entries = max_entries
+        self._writes = 0
+
+    def _path(self, key: str) -> Path:
+        return self.directory / hashlib.sha256(key.encode()).hexdigest()
+
+    def _read(self, key: str) -> Optional[bytes]:
+        path = self._path(key)
+        try:
+            data = path.read_bytes()
+        except FileNotFoundError:
+            return None
+        if len(data) < self._HEADER.size:
+            return None
+        (expires,) = self._HEADER.unpack_from(data)
+        if expires <= time.time():
+            path.unlink(missing_ok=True)
+            return None
+        return data[self._HEADER.size:]
+
+    def _write(self, items: Mapping[str, bytes], ttl: float) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        header = self._HEADER.pack(time.time() + ttl)
+        for key, value in items.items():
+            fd, tmp = tempfile.mkstemp(dir=self.directory, prefix=".tmp-")
+            try:
+                with os.fdopen(fd, "wb") as handle:
+                    handle.write(header + value)
+                os.replace(tmp, self._path(key))
+            except BaseException:
+                Path(tmp).unlink(missing_ok=True)
+                raise
+        self._writes += len(items)
+        if self._writes >= 256:
+            self._writes = 0
+            self.sweep()
+
+    def sweep(self) -> int:
+        """Remove expired entries and trim to ``max_entries``; return the count removed."""
+        now = time.time()
+        live = []
+        removed = 0
+        for path in self.directory.iterdir():
+            if path.name.startswith("."):
+                continue
+            try:
+                with path.open("rb") as handle:
+                    (expires,) = self._HEADER.unpack(handle.read(self._HEADER.size))
+                mtime = path.stat().st_mtime
+            except (OSError, struct.error):
+                continue
+            if expires <= now:
+                path.unlink(missing_ok=True)
+                removed += 1
+            else:
+                live.append((mtime, path))
+        live.sort()
+        for _, path in live[: max(0, len(live) - self.max_entries)]:
+            path.unlink(missing_ok=True)
+            removed += 1
+        return removed
+
+    async def get_many(self, keys: Sequence[str]) -> list[Optional[bytes]]:
+        return await asyncio.to_thread(lambda: [self._read(key) for key in keys])
+
+    async def set_many(self, items: Mapping[str, bytes], ttl: float) -> None:
+        await asyncio.to_thread(self._write, dict(items), ttl)
+
+    async def delete(self, key: str) -> None:
+        await asyncio.to_thread(self._path(key).unlink, missing_ok=True)
+
+
+class RedisBackend(CacheBackend):
+    """Talk to a Redis-protocol server over a small pool of pipelined connections.
+
+    Batch lookups are a single ``MGET`` and batch stores are written as one
+    pipeline of ``SET ... PX`` commands, so either costs one round trip.
+    Connections are opened on demand, up to ``pool_size``, and a connection
+    that fails is closed and replaced by a new one.
+
+    ``timeout`` bounds the wait for a free connection, which then raises
+    :class:`CacheBackendBusy`, and separately the connect and round trip
+    made with it.
+
+    Parameters
+    ----------
+    url : str
+        ``redis://[[user]:password@]host[:port][/db]``, or ``rediss://`` for
+        TLS (e.g. Azure Cache for Redis on port 6380).
+    pool_size : int
+        Connections opened at most.
+    timeout : float
+        Seconds each of the waits above may take.
+    """
+
+    applies_timeout = True
+
+    def __init__(
+        self,
+        url: str,
+        pool_size: int = CACHE_REDIS_POOL_SIZE,
+        timeout: float = CACHE_BACKEND_TIMEOUT,
+    ) -> None:
+        parts = urlsplit(url)
+        if parts.scheme not in ("redis", "rediss"):
+            raise ValueError(f"unsupported Redis URL scheme {parts.scheme!r}")
+        if pool_size < 1:
+            raise ValueError("pool_size must be at least 1")
+        self.host = parts.hostname or "localhost"
+        self.port = parts.port or 6379
+        self.username = unquote(parts.username) if parts.username else None
+        self.password = unquote(parts.password) if parts.password else None
+        self.db = int(parts.path.strip("/") or 0)
+        self.tls = parts.scheme == "rediss"
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self._idle: list[tuple[asyncio.StreamReader, asyncio.StreamWriter]] = []
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    @staticmethod
+    def _encode(*args: Any) -> bytes:
+        out = [b"*%d\r\n" % len(args)]
+        for arg in args:
+            if not isinstance(arg, bytes):
+                arg = str(arg).encode()
+            out.append(b"$%d\r\n%s\r\n" % (len(arg), arg))
+        return b"".join(out)
+
+    async def _read_reply(self, reader: asyncio.StreamReader) -> Any:
+        line = await reader.readuntil(b"\r\n")
+        kind, body = line[:1], line[1:-2]
+        if kind == b"+":
+            return body.decode()
+        if kind == b"-":
+            raise CacheBackendError(body.decode(errors="replace"))
+        if kind == b":":
+            return int(body)
+        if kind == b"$":
+            size = int(body)
+            if size < 0:
+                return None
+            return (await reader.readexactly(size + 2))[:-2]
+        if kind == b"*":
+            size = int(body)
+            if size < 0:
+                return None
+            return [await self._read_reply(reader) for _ in range(size)]
+        raise CacheBackendError(f"unexpected reply {line[:32]!r}")
+
+    async def _connect(self) -> tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+        context = ssl.create_default_context() if self.tls else None
+        connection = await asyncio.open_connection(self.host, self.port, ssl=context)
+        setup = []
+        if self.password is not None:
+            auth = (self.username, self.password) if self.username else (self.password,)
+            setup.append(("AUTH", *auth))
+        if self.db:
+            setup.append(("SELECT", self.db))
+        if setup:
+            try:
+                await self._pipeline(connection, setup)
+            except BaseException:
+                connection[1].close()
+                raise
+        return connection
+
+    async def _pipeline(
+        self,
+        connection: tuple[asyncio.StreamReader, asyncio.StreamWriter],
+        commands: Sequence[Sequence[Any]],
+    ) -> list[Any]:
+        reader, writer = connection
+        writer.write(b"".join(self._encode(*command) for command in commands))
+        await writer.drain()
+        replies = []
+        error = None
+        for _ in commands:
+            try:
+                replies.append(await self._read_reply(reader))
+            except CacheBackendError as exc:
+                # Keep reading so the connection stays in sync.
+                error = error or exc
+        if error is not None:
+            raise error
+        return replies
+
+    async def execute(self, *commands: Sequence[Any]) -> list[Any]:
+        """Send ``commands`` in one pipeline and return their replies."""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # Connections and semaphores cannot move between event loops.
+            self._close_idle()
+            self._slots = asyncio.Semaphore(self.pool_size)
+            self._loop = loop
+        try:
+            await asyncio.wait_for(self._slots.acquire(), self.timeout)
+        except asyncio.TimeoutError:
+            raise CacheBackendBusy(
+                f"no free connection within {self.timeout:g}s"
+            ) from None
+        try:
+            connection = self._idle.pop() if self._idle else None
+            try:
+                if connection is None:
+                    connection = await asyncio.wait_for(self._connect(), self.timeout)
+                replies = await asyncio.wait_for(
+                    self._pipeline(connection, commands), self.timeout
+                )
+            except BaseException:
+                # The connection may be out of sync with the server.
+                if connection is not None:
+                    connection[1].close()
+                raise
+            self._idle.append(connection)
+            return replies
+        finally:
+            self._slots.release()
+
+    def _close_idle(self) -> list[asyncio.StreamWriter]:
+        writers = [writer for _, writer in self._idle]
+        for writer in writers:
+            writer.close()
+        self._idle.clear()
+        return writers
+
+    async def ping(self) -> bool:
+        return (await self.execute(("PING",)))[0] == "PONG"
+
+    async def get_many(self, keys: Sequence[str]) -> list[Optional[bytes]]:
+        if not keys:
+            return []
+        (values,) = await self.execute(("MGET", *keys))
+        return values
+
+    async def set_many(self, items: Mapping[str, bytes], ttl: float) -> None:
+        milliseconds = max(1, int(ttl * 1000))
+        await self.execute(*(("SET", key, value, "PX", milliseconds) for key, value in items.items()))
+
+    async def delete(self, key: str) -> None:
+        await self.execute(("DEL", key))
+
+    async def close(self) -> None:
+        for writer in self._close_idle():
+            try:
+                await writer.wait_closed()
+            except OSError:
+                pass
+
+
+def backend_from_url(url: str) -> CacheBackend:
+    """Create the backend described by ``url`` (see the module docstring)."""
+    if url == "memory":
+        backend = MemoryBackend()
+        # In process, the shared tier competes with the local caches it backs.
+        memory_budget.register("shared", backend._data, weight=0.5)
+        return backend
+    if url.startswith("disk:"):
+        return DiskBackend(url[len("disk:"):])
+    if url.startswith(("redis://", "rediss://")):
+        return RedisBackend(url)
+    raise ValueError(f"unknown cache backend {url!r}; expected memory, disk:PATH or redis://")
+
+
+def encode_value(value: Any, compress_min_size: int = CACHE_COMPRESS_MIN_SIZE) -> bytes:
+    """Serialize ``value`` as JSON, zlib-compressed when large."""
+    data = json.dumps(value, separators=(",", ":"), ensure_ascii=False).encode()
+    if len(data) >= compress_min_size:
+        return b"z" + zlib.compress(data, 6)
+    return b"j" + data
+
+
+def decode_value(data: bytes) -> Any:
+    """Inverse of :func:`encode_value`."""
+    kind, payload = data[:1], data[1:]
+    if kind == b"z":
+        payload = zlib.decompress(payload)
+    elif kind != b"j":
+        raise ValueError(f"unknown cache value encoding {kind!r}")
+    return json.loads(payload)
+
+
+class SharedCache:
+    """JSON values in a :class:`CacheBackend`, failing soft.
+
+    Every operation is bounded by ``timeout``, unless the backend bounds
+    its operations itself.  If one fails, the backend is bypassed for
+    ``retry_after`` seconds (lookups miss and stores are skipped) and then
+    tried again, so an unreachable backend degrades the server to
+    local-only caching instead of slowing every call down.  A
+    :class:`CacheBackendBusy` backend only fails the operation at hand.
+
+    Parameters
+    ----------
+    backend : CacheBackend
+        Where entries are stored.
+    prefix : str
+        Prepended to every key.
+    """
+
+    def __init__(
+        self,
+        backend: CacheBackend,
+        prefix: str = CACHE_KEY_PREFIX,
+        timeout: float = CACHE_BACKEND_TIMEOUT,
+        retry_after: float = CACHE_RETRY_AFTER,
+        compress_min_size: int = CACHE_COMPRESS_MIN_SIZE,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.backend = backend
+        self.prefix = prefix
+        self.timeout = timeout
+        self.retry_after = retry_after
+        self.compress_min_size = compress_min_size
+        self._clock = clock
+        self._down_until = 0.0
+
+    @property
+    def available(self) -> bool:
+        return self._clock() >= self._down_until
+
+    def key(self, namespace: str, key: Any) -> str:
+        """Return the backend key for a local cache ``key`` in ``namespace``."""
+        if not isinstance(key, str):
+            key = json.dumps(key, separators=(",", ":"), sort_keys=True, default=str)
+        digest = hashlib.sha256(key.encode()).hexdigest()[:32]
+        return f"{self.prefix}:{namespace}:{digest}"
+
+    async def _call(self, operation: str, coro) -> Any:
+        try:
+            if self.backend.applies_timeout:
+                return await coro
+            return await asyncio.wait_for(coro, self.timeout)
+        except CacheBackendBusy:
+            logger.debug("Shared cache %s skipped: no free connection", operation)
+            raise
+        except (OSError, EOFError, asyncio.TimeoutError, CacheBackendError) as exc:
+            if self.available:
+                logger.warning(
+                    "Shared cache %s failed (%s: %s); using the local cache only for %gs",
+                    operation, type(exc).__name__, exc, self.retry_after,
+                )
+            self._down_until = self._clock() + self.retry_after
+            raise CacheBackendError(str(exc)) from exc
+
+    async def get_many(self, keys: Sequence[str]) -> list[Any]:
+        """Return the decoded value of each backend key, ``None`` on a miss."""
+        if not keys:
+            return []
+        if not self.available:
+            shared_lookups_total.inc(len(keys), result="bypassed")
+            return [None] * len(keys)
+        try:
+            raw = await self._call("lookup", self.backend.get_many(list(keys)))
+        except CacheBackendBusy:
+            shared_lookups_total.inc(len(keys), result="busy")
+            return [None] * len(keys)
+        except CacheBackendError:
+            shared_lookups_total.inc(len(keys), result="error")
+            return [None] * len(keys)
+        values = []
+        for data in raw:
+            value = None
+            if data is not None:
+                try:
+                    value = decode_value(data)
+                except (ValueError, zlib.error):
+                    value = None
+            shared_lookups_total.inc(result="miss" if value is None else "hit")
+            values.append(value)
+        return values
+
+    async def get(self, key: str) -> Any:
+        return (await self.get_many([key]))[0]
+
+    async def set_many(self, items: Mapping[str, Any], ttl: float) -> None:
+        """Store the encoded values; failures are logged, never raised."""
+        if not items or not self.available:
+            return
+        encoded = {key: encode_value(value, self.compress_min_size) for key, value in items.items()}
+        try:
+            await self._call("store", self.backend.set_many(encoded, ttl))
+        except CacheBackendError:
+            pass
+
+    async def set(self, key: str, value: Any, ttl: float) -> None:
+        await self.set_many({key: value}, ttl)
+
+    async def close(self) -> None:
+        await self.backend.close()
+
+
+def _from_env() -> Optional[SharedCache]:
+    url = os.getenv("ADDINS_CACHE_BACKEND")
+    return SharedCache(backend_from_url(url)) if url else None
+
+
+# The process-wide shared tier, or None for local-only caching.
+shared_cache: Optional[SharedCache] = _from_env()
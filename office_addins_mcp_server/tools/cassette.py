@@ -0,0 +1,283 @@
+"""
+Upstream Record and Replay
+==========================
+
+Cassettes capture real upstream traffic so that performance work (caching,
+pooling, concurrency) can be measured offline against realistic payloads
+and timing.  The mode is chosen with ``ADDINS_UPSTREAM_MODE``:
+
+- ``live`` (default): requests go to the network;
+- ``record``: requests go to the network, and every request/response pair
+  is appended to the cassette at ``ADDINS_UPSTREAM_CASSETTE`` with the
+  latency observed until its body was read;
+- ``replay``: no request leaves the process; responses are served from the
+  cassette after sleeping for their recorded latency multiplied by
+  ``ADDINS_REPLAY_LATENCY_SCALE`` (``0`` serves them at once).
+
+Both modes are implemented as httpx transports under the pooled client of
+:mod:`tools.upstream`, so the limiter, deadlines and retries above them run
+unchanged.  Replay matches requests on method, URL (with the query in any
+order) and ``Accept-Language``; repeated requests cycle through the
+responses recorded for them, and requests the cassette does not hold fail
+with a connection error.
+
+A cassette is a gzip-compressed JSON Lines file: a header line, then one
+line per exchange with text bodies stored as text and others in base64.
+Each line is flushed as it is written, so a recording cut short by a
+crash still replays up to its last complete exchange.  Record with a
+single worker process; several processes cannot share one cassette.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import atexit
+import base64
+import gzip
+import json
+import logging
+import os
+import threading
+import time
+import zlib
+from collections import defaultdict
+from pathlib import Path
+from typing import Awaitable, Callable, Iterable, Optional
+
+import httpx
+
+from office_addins_mcp_server.metrics import registry
+
+
+logger = logging.getLogger("office-addins-mcp.cassette")
+
+CASSETTE_MODES = ("live", "record", "replay")
+
+CASSETTE_MODE = os.getenv("ADDINS_UPSTREAM_MODE", "live").lower()
+CASSETTE_PATH = os.getenv("ADDINS_UPSTREAM_CASSETTE")
+
+# Multiplier applied to recorded latencies when replaying.
+REPLAY_LATENCY_SCALE = float(os.getenv("ADDINS_REPLAY_LATENCY_SCALE", "1"))
+
+CASSETTE_VERSION = 1
+
+# Request headers that select a different response.
+MATCHED_HEADERS = ("accept-language",)
+
+# Response headers kept in the cassette.  Content codings are not: bodies
+# are stored decoded.
+KEPT_HEADERS = ("content-type", "cache-control", "etag", "last-modified", "retry-after")
+
+replay_misses_total = registry.counter(
+    "addins_upstream_replay_misses_total",
+    "Requests in replay mode that the cassette holds no response for.",
+)
+
+
+def request_key(method: str, url: httpx.URL | str, headers: Optional[dict] = None) -> str:
+    """Return the key replay matches ``method``, ``url`` and ``headers`` on."""
+    url = httpx.URL(url)
+    query = sorted(url.params.multi_items())
+    key = f"{method.upper()} {url.copy_with(query=None)}"
+    if query:
+        key += "?" + str(httpx.QueryParams(query))
+    matched = {name: (headers or {}).get(name) for name in MATCHED_HEADERS}
+    extra = ";".join(f"{name}={value}" for name, value in matched.items() if value)
+    return f"{key} [{extra}]" if extra else key
+
+
+def _is_text(content_type: str) -> bool:
+    return content_type.startswith("text/") or "json" in content_type or "xml" in content_type
+
+
+class CassetteWriter:
+    """Append exchanges to a new cassette file, one flushed line each."""
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = gzip.open(self.path, "wt", encoding="utf-8")
+        self._lock = threading.Lock()
+        self.count = 0
+        self._write({"cassette": CASSETTE_VERSION, "recorded_at": time.time()})
+
+    def _write(self, line: dict) -> None:
+        with self._lock:
+            if self._file.closed:
+                return
+            self._file.write(json.dumps(line, separators=(",", ":")) + "\n")
+            # A sync flush makes everything written so far readable even if
+            # the process dies before close().
+            self._file.flush()
+
+    def write(
+        self,
+        request: httpx.Request,
+        status: int,
+        headers: dict,
+        body: bytes,
+        latency: float,
+    ) -> None:
+        entry = {
+            "method": request.method,
+            "url": str(request.url),
+            "headers": {
+                name: request.headers[name] for name in MATCHED_HEADERS if name in request.headers
+            },
+            "status": status,
+            "response_headers": headers,
+            "latency_ms": round(latency * 1000, 2),
+        }
+        if _is_text(headers.get("content-type", "")):
+            try:
+                entry["text"] = body.decode("utf-8")
+            except UnicodeDecodeError:
+                entry["base64"] = base64.b64encode(body).decode("ascii")
+        else:
+            entry["base64"] = base64.b64encode(body).decode("ascii")
+        self._write(entry)
+        self.count += 1
+
+    def close(self) -> None:
+        with self._lock:
+            if not self._file.closed:
+                self._file.close()
+
+
+def load_cassette(path: str | Path) -> list[dict]:
+    """Return the exchanges recorded in the cassette at ``path``.
+
+    Raises
+    ------
+    ValueError
+        If the file is not a cassette of a supported version.
+    """
+    entries: list[dict] = []
+    with gzip.open(path, "rt", encoding="utf-8") as handle:
+        try:
+            header = json.loads(handle.readline() or "null")
+            if not isinstance(header, dict) or header.get("cassette") != CASSETTE_VERSION:
+                raise ValueError(f"{path} is not a version {CASSETTE_VERSION} cassette")
+            for line in handle:
+                if line.endswith("\n"):
+                    entries.append(json.loads(line))
+        except (EOFError, zlib.error):
+            # Recording interrupted: keep the complete lines.
+            logger.warning("Cassette %s is truncated after %d exchanges", path, len(entries))
+    return entries
+
+
+def _body(entry: dict) -> bytes:
+    if "text" in entry:
+        return entry["text"].encode("utf-8")
+    return base64.b64decode(entry.get("base64", ""))
+
+
+class RecordingTransport(httpx.AsyncBaseTransport):
+    """Forward requests to ``transport`` and record every exchange."""
+
+    def __init__(self, writer: CassetteWriter, transport: httpx.AsyncBaseTransport) -> None:
+        self.writer = writer
+        self._transport = transport
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        started = time.monotonic()
+        response = await self._transport.handle_async_request(request)
+        try:
+            # Decodes any content coding; the stored body is the decoded one.
+            body = await response.aread()
+        finally:
+            await response.aclose()
+        headers = {name: response.headers[name] for name in KEPT_HEADERS if name in response.headers}
+        self.writer.write(request, response.status_code, headers, body, time.monotonic() - started)
+        return httpx.Response(response.status_code, headers=headers, content=body, request=request)
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
+
+
+class ReplayTransport(httpx.AsyncBaseTransport):
+    """Serve requests from recorded exchanges, with their scaled latency."""
+
+    def __init__(
+        self,
+        entries: Iterable[dict],
+        latency_scale: float = REPLAY_LATENCY_SCALE,
+        sleep: Callable[[float], Awaitable[None]] = asyncio.sleep,
+    ) -> None:
+        self.latency_scale = latency_scale
+        self._sleep = sleep
+        self._entries: dict[str, list[dict]] = defaultdict(list)
+        for entry in entries:
+            key = request_key(entry["method"], entry["url"], entry.get("headers"))
+            self._entries[key].append(entry)
+        self._served: dict[str, int] = defaultdict(int)
+
+    def __len__(self) -> int:
+        return sum(len(entries) for entries in self._entries.values())
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        key = request_key(request.method, request.url, request.headers)
+        recorded = self._entries.get(key)
+        if not recorded:
+            replay_misses_total.inc()
+            raise httpx.ConnectError(f"no recorded response for {key}", request=request)
+        entry = recorded[self._served[key] % len(recorded)]
+        self._served[key] += 1
+        delay = entry.get("latency_ms", 0) / 1000 * self.latency_scale
+        if delay > 0:
+            await self._sleep(delay)
+        return httpx.Response(
+            entry["status"],
+            headers=entry.get("response_headers") or {},
+            content=_body(entry),
+            request=request,
+        )
+
+
+_writer: Optional[CassetteWriter] = None
+_replay_entries: Optional[list[dict]] = None
+
+
+def close() -> None:
+    """Finish the recording, if one is in progress."""
+    global _writer
+    if _writer is not None:
+        _writer.close()
+        logger.info("Recorded %d upstream exchanges to %s", _writer.count, _writer.path)
+        _writer = None
+
+
+def transport(limits: httpx.Limits) -> Optional[httpx.AsyncBaseTransport]:
+    """Return the transport for the configured mode, or ``None`` when live.
+
+    The recording file and the replayed exchanges are shared by every client
+    created in the process.
+
+    Raises
+    ------
+    ValueError
+        If the mode is unknown or no cassette path is configured.
+    """
+    global _writer, _replay_entries
+    if CASSETTE_MODE not in CASSETTE_MODES:
+        raise ValueError(f"unknown ADDINS_UPSTREAM_MODE {CASSETTE_MODE!r}; expected one of {CASSETTE_MODES}")
+    if CASSETTE_MODE == "live":
+        return None
+    if not CASSETTE_PATH:
+        raise ValueError(f"ADDINS_UPSTREAM_MODE={CASSETTE_MODE} needs ADDINS_UPSTREAM_CASSETTE")
+    if CASSETTE_MODE == "record":
+        if _writer is None:
+            _writer = CassetteWriter(CASSETTE_PATH)
+            atexit.register(close)
+            logger.info("Recording upstream exchanges to %s", CASSETTE_PATH)
+        return RecordingTransport(_writer, httpx.AsyncHTTPTransport(limits=limits))
+    if _replay_entries is None:
+        _replay_entries = load_cassette(CASSETTE_PATH)
+        logger.info(
+            "Replaying %d upstream exchanges from %s (latency x%g)",
+            len(_replay_entries),
+            CASSETTE_PATH,
+            REPLAY_LATENCY_SCALE,
+        )
+    return ReplayTransport(_replay_entries, REPLAY_LATENCY_SCALE)
@@ -0,0 +1,334 @@
+"""
+Local Add-in Catalog
+====================
+
+An in-process store of the add-in records the server has seen, fed by every
+search and details response in the default market.  The catalog backs the
+``addin://`` and ``addins://category/`` MCP resources, so clients can read
+records and browse categories without further Office Add-ins API calls.
+
+Records are keyed by asset ID.  A record is reported as changed when its
+content hash differs from the stored one; fields that only appear in
+details responses are kept when a later search response omits them, so
+search and details results for an unchanged add-in do not flap.  Content
+changes and removals are also recorded in the change log
+(:mod:`tools.changelog`).
+
+Category listings are paginated by asset ID with opaque cursors.  Because
+a cursor records the last asset ID returned rather than an offset, pages
+stay consistent while new records are added to the catalog.
+
+Besides :data:`MAX_CATALOG_RECORDS`, the catalog is bounded by the process
+memory budget (:mod:`office_addins_mcp_server.memory_budget`), which evicts
+the least recently updated records first.
+"""
+
+from __future__ import annotations
+
+import base64
+import bisect
+import hashlib
+import json
+import math
+import os
+import time
+from typing import TYPE_CHECKING, Callable, Iterable, Iterator, Optional
+
+from office_addins_mcp_server.memory_budget import ENTRY_OVERHEAD, approximate_size, memory_budget
+from office_addins_mcp_server.tools.changelog import ChangeLog, changelog
+
+if TYPE_CHECKING:
+    from office_addins_mcp_server.memory_budget import MemoryBudget
+
+
+# Upper bound on the number of records kept; the least recently updated
+# records are evicted first.
+MAX_CATALOG_RECORDS = int(os.getenv("ADDINS_CATALOG_MAX_RECORDS", "50000"))
+
+# Called with the asset IDs whose records changed and the category IDs whose
+# listings changed as a result.
+ChangeListener = Callable[[list, set], None]
+
+
+def record_hash(record: dict) -> str:
+    """Return a stable SHA-256 of a record's JSON content."""
+    canonical = json.dumps(record, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+def record_categories(record: dict) -> set[str]:
+    """Return the category IDs of an add-in record."""
+    categories = set()
+    for category in record.get("Categories") or ():
+        if isinstance(category, dict):
+            category_id = category.get("Id") or category.get("Title")
+        else:
+            category_id = category
+        if category_id:
+            categories.add(str(category_id))
+    return categories
+
+
+def encode_cursor(last_id: str) -> str:
+    """Encode the position after ``last_id`` as an opaque cursor."""
+    payload = json.dumps({"after": last_id}, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> str:
+    """Return the asset ID encoded in ``cursor``.
+
+    Raises
+    ------
+    ValueError
+        If the cursor was not produced by :func:`encode_cursor`.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        after = json.loads(base64.urlsafe_b64decode(padded))["after"]
+    except (ValueError, KeyError, TypeError) as exc:
+        raise ValueError(f"invalid cursor {cursor!r}") from exc
+    if not isinstance(after, str):
+        raise ValueError(f"invalid cursor {cursor!r}")
+    return after
+
+
+class Catalog:
+    """Add-in records by asset ID, indexed by category.
+
+    Parameters
+    ----------
+    maxsize : int
+        Maximum number of records kept.
+    changes : ChangeLog, optional
+        Log receiving every content change and removal.
+    clock : Callable[[], float], optional
+        Monotonic time source for update times, replaceable in tests.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = MAX_CATALOG_RECORDS,
+        changes: Optional[ChangeLog] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.maxsize = maxsize
+        self.changes = changes
+        self._clock = clock
+        # Insertion order doubles as update order for eviction.
+        self._records: dict[str, dict] = {}
+        self._hashes: dict[str, str] = {}
+        self._categories: dict[str, list[str]] = {}
+        self._listeners: list[ChangeListener] = []
+        # Incremented whenever the set of records or their content changes.
+        self.version = 0
+        # Record sizes and update times, tracked once registered with a budget.
+        self.budget: Optional["MemoryBudget"] = None
+        self.nbytes = 0
+        self._sizes: dict[str, int] = {}
+        self._updated: dict[str, float] = {}
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def __contains__(self, asset_id: str) -> bool:
+        return asset_id in self._records
+
+    def clear(self) -> None:
+        """Forget every record (listeners stay registered)."""
+        self.version += 1
+        self._records.clear()
+        self._hashes.clear()
+        self._categories.clear()
+        self._sizes.clear()
+        self._updated.clear()
+        self.nbytes = 0
+
+    def add_listener(self, listener: ChangeListener) -> None:
+        """Call ``listener`` after every :meth:`add_records` that changed records."""
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener: ChangeListener) -> None:
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def get(self, asset_id: str) -> Optional[dict]:
+        """Return the stored record for ``asset_id``, if any."""
+        return self._records.get(asset_id)
+
+    def get_hash(self, asset_id: str) -> Optional[str]:
+        """Return the content hash of the stored record, if any."""
+        return self._hashes.get(asset_id)
+
+    def add_records(self, records: Iterable[dict]) -> list[str]:
+        """Store or update records and notify listeners of the changes.
+
+        Returns
+        -------
+        list[str]
+            Asset IDs whose stored record changed, in input order.
+        """
+        changed: list[str] = []
+        touched_categories: set[str] = set()
+        now = self._clock() if self.budget is not None else 0.0
+        for record in records:
+            asset_id = record.get("Id") if isinstance(record, dict) else None
+            if not asset_id:
+                continue
+            previous = self._records.pop(asset_id, None)
+            merged = {**previous, **record} if previous is not None else dict(record)
+            digest = record_hash(merged)
+            self._records[asset_id] = merged
+            if self.budget is not None:
+                self._updated[asset_id] = now
+            if digest == self._hashes.get(asset_id):
+                continue
+            self._hashes[asset_id] = digest
+            if self.budget is not None:
+                size = approximate_size(merged) + ENTRY_OVERHEAD
+                self.nbytes += size - self._sizes.get(asset_id, 0)
+                self._sizes[asset_id] = size
+            if self.changes is not None:
+                self.changes.observe(asset_id, merged)
+            old_categories = record_categories(previous) if previous is not None else set()
+            new_categories = record_categories(merged)
+            for category_id in old_categories - new_categories:
+                self._unindex(category_id, asset_id)
+            for category_id in new_categories - old_categories:
+                members = self._categories.setdefault(category_id, [])
+                position = bisect.bisect_left(members, asset_id)
+                if position == len(members) or members[position] != asset_id:
+                    members.insert(position, asset_id)
+            if previous is None:
+                # A new record changes the listings it joins.
+                touched_categories |= new_categories
+            else:
+                touched_categories |= old_categories | new_categories
+            changed.append(asset_id)
+
+        if changed or len(self._records) > self.maxsize:
+            self.version += 1
+        while len(self._records) > self.maxsize:
+            self._evict(next(iter(self._records)))
+
+        if changed:
+            for listener in list(self._listeners):
+                listener(changed, touched_categories)
+        if self.budget is not None:
+            self.budget.enforce()
+        return changed
+
+    def _evict(self, asset_id: str) -> dict:
+        record = self._records.pop(asset_id)
+        for category_id in record_categories(record):
+            self._unindex(category_id, asset_id)
+        self._hashes.pop(asset_id, None)
+        self._updated.pop(asset_id, None)
+        self.nbytes -= self._sizes.pop(asset_id, 0)
+        return record
+
+    def coldest(self) -> Optional[tuple[float, int]]:
+        """Return the idle seconds and size of the least recently updated record."""
+        if not self._records:
+            return None
+        asset_id = next(iter(self._records))
+        updated = self._updated.get(asset_id)
+        idle = math.inf if updated is None else self._clock() - updated
+        return idle, self._sizes.get(asset_id, 0)
+
+    def evict_coldest(self) -> int:
+        """Evict the least recently updated record and return the bytes freed.
+
+        Like eviction past ``maxsize``, this is not recorded in the change log.
+        """
+        if not self._records:
+            return 0
+        before = self.nbytes
+        self._evict(next(iter(self._records)))
+        self.version += 1
+        return before - self.nbytes
+
+    def remove(self, asset_id: str) -> bool:
+        """Remove an add-in that no longer exists upstream and notify listeners.
+
+        Unlike eviction, removal is recorded in the change log.
+        """
+        if asset_id not in self._records:
+            return False
+        self.version += 1
+        record = self._evict(asset_id)
+        categories = record_categories(record)
+        if self.changes is not None:
+            self.changes.observe_removal(asset_id, record)
+        for listener in list(self._listeners):
+            listener([asset_id], categories)
+        return True
+
+    def ids(self) -> Iterator[str]:
+        """Iterate over the stored asset IDs."""
+        return iter(list(self._records))
+
+    def records(self) -> list[dict]:
+        """Return the stored records."""
+        return list(self._records.values())
+
+    def _unindex(self, category_id: str, asset_id: str) -> None:
+        members = self._categories.get(category_id)
+        if not members:
+            return
+        position = bisect.bisect_left(members, asset_id)
+        if position < len(members) and members[position] == asset_id:
+            del members[position]
+        if not members:
+            del self._categories[category_id]
+
+    def categories(self) -> dict[str, int]:
+        """Return every known category ID with its number of add-ins."""
+        return {
+            category_id: len(members)
+            for category_id, members in sorted(self._categories.items())
+        }
+
+    def list_category(
+        self,
+        category_id: str,
+        cursor: Optional[str] = None,
+        limit: int = 50,
+    ) -> tuple[list[dict], Optional[str]]:
+        """Return one page of a category listing, ordered by asset ID.
+
+        Parameters
+        ----------
+        category_id : str
+            The category to list (e.g. "Productivity").
+        cursor : str, optional
+            The ``next_cursor`` of the previous page.
+        limit : int
+            Maximum number of records per page.
+
+        Returns
+        -------
+        tuple[list[dict], Optional[str]]
+            The records of the page and the cursor of the next page, which
+            is ``None`` on the last page.
+
+        Raises
+        ------
+        ValueError
+            If ``cursor`` is malformed.
+        """
+        members = self._categories.get(category_id, [])
+        start = 0
+        if cursor:
+            start = bisect.bisect_right(members, decode_cursor(cursor))
+        page_ids = members[start:start + limit]
+        next_cursor = None
+        if start + limit < len(members) and page_ids:
+            next_cursor = encode_cursor(page_ids[-1])
+        return [self._records[asset_id] for asset_id in page_ids], next_cursor
+
+
+# Process-wide catalog shared by the tools and the MCP resources.
+catalog = Catalog(changes=changelog)
+# Records cannot be fetched again on demand, so they outweigh cached responses.
+memory_budget.register("catalog", catalog, weight=4.0)
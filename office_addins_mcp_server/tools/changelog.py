@@ -0,0 +1,376 @@
+"""
+Catalog Change Log
+==================
+
+A bounded, in-process log of how add-in records changed over time, used to
+answer "what was added, updated or removed since T" without re-downloading
+the catalog.
+
+Every record stored in the catalog is reduced to its normalized governance
+content (:data:`TRACKED_FIELDS`, with lists sorted and strings trimmed) and
+hashed.  When the hash of a known record changes, an ``updated`` entry with
+the changed fields and their old and new values is appended to the log.
+Volatile fields such as ``Rating`` and ``NumberOfVotes`` are not tracked, so
+they do not produce entries.
+
+Additions and removals can only be told apart from first sightings once
+the whole catalog has been scanned: :func:`refresh_catalog` walks every
+search page, logs records that disappeared as ``removed``, and establishes
+the baseline after which newly seen records are logged as ``added``.  The
+Starlette deployment runs it periodically when
+``ADDINS_CATALOG_REFRESH_INTERVAL`` is set.
+
+The log lives in memory and starts empty with each process.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import bisect
+import hashlib
+import json
+import logging
+import os
+import time
+from datetime import datetime, timezone
+from typing import List, Optional
+
+from office_addins_mcp_server.tools.asset_ids import known_ids
+
+logger = logging.getLogger("office-addins-mcp")
+
+# Record fields whose changes are logged.
+TRACKED_FIELDS = (
+    "Title",
+    "ShortDescription",
+    "ProviderName",
+    "Version",
+    "State",
+    "Pricing",
+    "Permissions",
+    "ExtendedPermissions",
+    "SupportedClients",
+    "Categories",
+    "ManifestUrl",
+    "PrivacyPolicyUrl",
+    "LicenseTermsUrl",
+    "ActiveDirectoryAppId",
+    "ActiveDirectoryScopes",
+)
+
+# Fields whose change counts as a permission change.
+PERMISSION_FIELDS = frozenset(
+    {"Permissions", "ExtendedPermissions", "ActiveDirectoryAppId", "ActiveDirectoryScopes"}
+)
+
+CHANGE_TYPES = ("added", "updated", "removed")
+
+# Entries kept before the oldest are dropped.
+MAX_CHANGELOG_ENTRIES = int(os.getenv("ADDINS_CHANGELOG_MAX_ENTRIES", "20000"))
+
+# Seconds between full catalog refreshes in the Starlette deployment; 0
+# disables them.
+CATALOG_REFRESH_INTERVAL = float(os.getenv("ADDINS_CATALOG_REFRESH_INTERVAL", "0"))
+
+
+def _normalize_value(value):
+    if isinstance(value, str):
+        return value.strip()
+    if isinstance(value, dict):
+        return {key: _normalize_value(item) for key, item in sorted(value.items())}
+    if isinstance(value, list):
+        items = [_normalize_value(item) for item in value]
+        return sorted(items, key=lambda item: json.dumps(item, sort_keys=True, default=str))
+    return value
+
+
+def normalize_record(record: dict) -> dict:
+    """Return the tracked fields of ``record`` in a canonical form."""
+    return {field: _normalize_value(record.get(field)) for field in TRACKED_FIELDS}
+
+
+def content_hash(normalized: dict) -> str:
+    canonical = json.dumps(normalized, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+def format_time(timestamp: float) -> str:
+    return datetime.fromtimestamp(timestamp, timezone.utc).isoformat().replace("+00:00", "Z")
+
+
+def parse_time(value: str) -> float:
+    """Parse an ISO 8601 timestamp; naive values are taken as UTC.
+
+    Raises
+    ------
+    ValueError
+        If ``value`` is not an ISO 8601 timestamp.
+    """
+    if value.endswith(("Z", "z")):
+        value = value[:-1] + "+00:00"
+    parsed = datetime.fromisoformat(value)
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+
+class ChangeLog:
+    """Time-ordered add-in change entries.
+
+    Parameters
+    ----------
+    maxlen : int
+        Maximum number of entries kept.
+    clock : Callable[[], float], optional
+        Wall-clock time source, replaceable in tests.
+    """
+
+    def __init__(self, maxlen: int = MAX_CHANGELOG_ENTRIES, clock=time.time) -> None:
+        self.maxlen = maxlen
+        self._clock = clock
+        self._times: list[float] = []
+        self._entries: list[dict] = []
+        self._normalized: dict[str, dict] = {}
+        self._hashes: dict[str, str] = {}
+        self._dropped_before: Optional[float] = None
+        self.baseline_at: Optional[float] = None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def clear(self) -> None:
+        self._times.clear()
+        self._entries.clear()
+        self._normalized.clear()
+        self._hashes.clear()
+        self._dropped_before = None
+        self.baseline_at = None
+
+    def mark_baseline(self) -> None:
+        """Record that every current add-in has been seen at least once."""
+        if self.baseline_at is None:
+            self.baseline_at = self._clock()
+
+    def observe(self, asset_id: str, record: dict) -> Optional[dict]:
+        """Compare a stored record with its previous content and log changes.
+
+        Returns the appended entry, if any.
+        """
+        normalized = normalize_record(record)
+        digest = content_hash(normalized)
+        previous_hash = self._hashes.get(asset_id)
+        if digest == previous_hash:
+            return None
+        previous = self._normalized.get(asset_id)
+        self._normalized[asset_id] = normalized
+        self._hashes[asset_id] = digest
+        if previous is None:
+            if self.baseline_at is None:
+                # First sighting before a full scan: not known to be new.
+                return None
+            return self._append(asset_id, record, "added", normalized, None)
+        return self._append(asset_id, record, "updated", normalized, previous)
+
+    def ids(self) -> list[str]:
+        """Return the asset IDs whose current content is known to the log.
+
+        This includes add-ins the catalog has since evicted.
+        """
+        return list(self._normalized)
+
+    def observe_removal(self, asset_id: str, record: Optional[dict] = None) -> Optional[dict]:
+        """Log that ``asset_id`` is no longer in the store."""
+        previous = self._normalized.pop(asset_id, None)
+        self._hashes.pop(asset_id, None)
+        if previous is None and record is None:
+            return None
+        return self._append(asset_id, record or {}, "removed", None, previous)
+
+    def _append(
+        self,
+        asset_id: str,
+        record: dict,
+        change: str,
+        new: Optional[dict],
+        old: Optional[dict],
+    ) -> dict:
+        if change == "updated":
+            fields = [f for f in TRACKED_FIELDS if old.get(f) != new.get(f)]
+            diff = {f: {"Old": old.get(f), "New": new.get(f)} for f in fields}
+        else:
+            fields, diff = [], {}
+        now = max(self._clock(), self._times[-1] if self._times else 0.0)
+        entry = {
+            "AssetId": asset_id,
+            "Title": record.get("Title") or (old or {}).get("Title"),
+            "Change": change,
+            "At": now,
+            "Fields": fields,
+            "PermissionsChanged": any(f in PERMISSION_FIELDS for f in fields),
+            "Diff": diff,
+        }
+        self._times.append(now)
+        self._entries.append(entry)
+        excess = len(self._entries) - self.maxlen
+        if excess > 0:
+            self._dropped_before = self._times[excess - 1]
+            del self._times[:excess]
+            del self._entries[:excess]
+        return entry
+
+    def since(self, timestamp: float) -> tuple[list[dict], bool]:
+        """Return the entries logged after ``timestamp``, oldest first, and
+        whether older entries that would have matched were already dropped."""
+        start = bisect.bisect_right(self._times, timestamp)
+        truncated = self._dropped_before is not None and self._dropped_before > timestamp
+        return self._entries[start:], truncated
+
+
+# Process-wide change log, fed by the catalog.
+changelog = ChangeLog()
+
+
+async def get_catalog_changes(
+    since: str,
+    change_types: Optional[List[str]] = None,
+    permissions_only: bool = False,
+    include_diffs: bool = False,
+) -> dict:
+    """List add-ins added, updated or removed after a point in time.
+
+    Answered from the local change log without calling the Office Add-ins
+    API.
+
+    Parameters
+    ----------
+    since : str
+        ISO 8601 timestamp (e.g. "2025-06-01T00:00:00Z"); pass the ``Until``
+        of the previous answer to continue from it.
+    change_types : List[str], optional
+        Restrict to some of "added", "updated" and "removed".
+    permissions_only : bool, optional
+        Only report updates that changed permissions or app registrations.
+    include_diffs : bool, optional
+        Include the old and new value of every changed field.
+
+    Returns
+    -------
+    dict
+        A dictionary with the following structure:
+        - Since, Until: The covered interval; Until is the time of the
+          newest entry, or ``since`` when there are none
+        - TotalCount: Number of entries returned
+        - Values: Entries with AssetId, Title, Change, At, Fields,
+          PermissionsChanged and, with include_diffs, Diff
+        - Summary: Number of entries per change type and with permission
+          changes
+        - BaselineAt: When the catalog was first fully scanned; before that
+          new add-ins cannot be told apart from first sightings, so no
+          "added" or "removed" entries exist
+        - Truncated: True when older entries in the interval were dropped
+
+    Raises
+    ------
+    ValueError
+        If ``since`` is not an ISO 8601 timestamp or a change type is unknown.
+    """
+    timestamp = parse_time(since)
+    if change_types is not None:
+        unknown = set(change_types) - set(CHANGE_TYPES)
+        if unknown:
+            raise ValueError(f"unknown change types {sorted(unknown)}; expected {CHANGE_TYPES}")
+    entries, truncated = changelog.since(timestamp)
+
+    values = []
+    summary = {change: 0 for change in CHANGE_TYPES}
+    summary["permissions"] = 0
+    for entry in entries:
+        if change_types is not None and entry["Change"] not in change_types:
+            continue
+        if permissions_only and not entry["PermissionsChanged"]:
+            continue
+        value = {**entry, "At": format_time(entry["At"])}
+        if not include_diffs:
+            del value["Diff"]
+        values.append(value)
+        summary[entry["Change"]] += 1
+        summary["permissions"] += entry["PermissionsChanged"]
+
+    return {
+        "Since": format_time(timestamp),
+        "Until": format_time(entries[-1]["At"]) if entries else format_time(timestamp),
+        "TotalCount": len(values),
+        "Values": values,
+        "Summary": summary,
+        "BaselineAt": format_time(changelog.baseline_at) if changelog.baseline_at else None,
+        "Truncated": truncated,
+    }
+
+
+# The catalog scan in progress, shared by concurrent refresh_catalog() calls.
+_refresh_task: Optional[asyncio.Task] = None
+
+
+async def refresh_catalog(page_size: Optional[int] = None) -> dict:
+    """Scan the whole catalog, logging changes and removals.
+
+    Removals are only logged when the scan reached the ``TotalCount``
+    reported by the API, so a truncated scan never reports add-ins as
+    removed.  Every add-in known to the change log is checked, including
+    those the catalog evicted (past its size limit or under the memory
+    budget), which are not in the catalog any more.
+
+    A call made while a scan is running waits for that scan and returns
+    its result (whatever its ``page_size``) instead of starting another.
+    Cancelling a waiting call does not cancel the scan.
+
+    Returns
+    -------
+    dict
+        ``{"Records", "Removed", "Complete"}``.
+    """
+    global _refresh_task
+    task = _refresh_task
+    if task is None or task.done() or task.get_loop() is not asyncio.get_running_loop():
+        task = _refresh_task = asyncio.ensure_future(_scan_catalog(page_size))
+    return await asyncio.shield(task)
+
+
+async def _scan_catalog(page_size: Optional[int]) -> dict:
+    # Imported here: the exporter depends on addin_tools, which depends on
+    # the catalog and therefore on this module.
+    from office_addins_mcp_server.tools.catalog import catalog
+    from office_addins_mcp_server.tools.export import EXPORT_PAGE_SIZE, iter_search_pages
+
+    seen: set[str] = set()
+    scanned, total = 0, None
+    async for offset, values, total in iter_search_pages(
+        {}, page_size=page_size or EXPORT_PAGE_SIZE
+    ):
+        catalog.add_records(values)
+        seen.update(v["Id"] for v in values if v.get("Id"))
+        scanned = offset + len(values)
+
+    complete = total is not None and scanned >= total
+    removed = 0
+    if complete:
+        known = dict.fromkeys([*changelog.ids(), *catalog.ids()])
+        for asset_id in [a for a in known if a not in seen]:
+            # The catalog logs the removal of records it still holds.
+            if not catalog.remove(asset_id):
+                changelog.observe_removal(asset_id)
+            removed += 1
+        changelog.mark_baseline()
+        known_ids.rebuild(seen)
+    return {"Records": len(seen), "Removed": removed, "Complete": complete}
+
+
+async def run_periodic_refresh(interval: float) -> None:
+    """Call :func:`refresh_catalog` every ``interval`` seconds until cancelled."""
+    while True:
+        try:
+            result = await refresh_catalog()
+            logger.info("Catalog refresh: %s", result)
+        except Exception as exc:
+            logger.warning("Catalog refresh failed: %s: %s", type(exc).__name__, exc)
+        await asyncio.sleep(interval)
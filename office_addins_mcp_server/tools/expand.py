@@ -0,0 +1,112 @@
+"""
+Search and Expand
+=================
+
+One call for the common "search, then look up the details of the top hits"
+pattern.  The search runs first; details for its top ``top_k`` hits are then
+fetched concurrently through the same response cache and request coalescing
+as :func:`get_addin_details`, and merged into the search records.
+
+Each expanded record is handed to an optional callback as soon as its
+details arrive, in completion order, so the MCP tool can stream them to the
+client as progress notifications before the whole call returns.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from typing import Awaitable, Callable, List, Optional
+
+from office_addins_mcp_server.tools.addin_tools import (
+    SearchSpec,
+    get_addin_details,
+    search_addins,
+)
+from office_addins_mcp_server.tools.export import project_records
+
+
+# Upper bound on the number of hits expanded per call.
+MAX_EXPAND = 25
+
+# Called with (records done, records to expand, expanded record).
+ExpandCallback = Callable[[int, int, dict], Awaitable[None]]
+
+
+async def _expand(index: int, hit: dict) -> tuple[int, dict]:
+    try:
+        details = await get_addin_details(hit["Id"])
+    except Exception as exc:
+        return index, {**hit, "DetailsError": f"{type(exc).__name__}: {exc}"}
+    return index, {**hit, **(details.get("Value") or {})}
+
+
+async def search_and_expand(
+    search: Optional[SearchSpec] = None,
+    top_k: int = 5,
+    fields: Optional[List[str]] = None,
+    on_record: Optional[ExpandCallback] = None,
+) -> dict:
+    """Search for add-ins and fetch the details of the top hits concurrently.
+
+    Parameters
+    ----------
+    search : SearchSpec, optional
+        :func:`search_addins` arguments, e.g. ``{"query": "calendar",
+        "clients": ["Win32_Outlook"]}``.
+    top_k : int, optional
+        Number of leading hits to expand with their details (default 5, at
+        most :data:`MAX_EXPAND`).  Later hits are returned as the search
+        produced them.
+    fields : List[str], optional
+        Dotted paths (e.g. ``"Pricing.Category"``) each record is reduced
+        to; all fields by default.
+    on_record : ExpandCallback, optional
+        Awaited with ``(done, total, record)`` as each expanded (and
+        projected) record becomes available.
+
+    Returns
+    -------
+    dict
+        A dictionary with the following structure:
+        - TotalCount: The search's TotalCount
+        - Values: The search results in rank order, the first ``top_k``
+          merged with their details; a hit whose details could not be
+          fetched keeps its search fields and gains DetailsError
+        - Expanded: Number of hits expanded with details
+
+    Raises
+    ------
+    ValueError
+        If ``top_k`` is out of range or ``search`` has unknown arguments.
+    """
+    if not 0 <= top_k <= MAX_EXPAND:
+        raise ValueError(f"top_k must be between 0 and {MAX_EXPAND}")
+    search = dict(search or {})
+    unknown = set(search) - SearchSpec.__annotations__.keys()
+    if unknown:
+        raise ValueError(f"unknown search arguments: {sorted(unknown)}")
+
+    result = await search_addins(**search, paginate=False)
+    hits = result.get("Values") or []
+    targets = [index for index, hit in enumerate(hits[:top_k]) if hit.get("Id")]
+
+    values = list(hits)
+    tasks = [asyncio.ensure_future(_expand(index, hits[index])) for index in targets]
+    try:
+        for done, finished in enumerate(asyncio.as_completed(tasks), start=1):
+            index, record = await finished
+            values[index] = record
+            if on_record is not None:
+                await on_record(done, len(tasks), next(project_records([record], fields)))
+    finally:
+        # Only left running if the callback failed or the call was cancelled.
+        for task in tasks:
+            task.cancel()
+
+    summary = {key: value for key, value in result.items() if key not in ("Values", "NextCursor")}
+    return {
+        **summary,
+        "TotalCount": result.get("TotalCount", len(values)),
+        "Values": list(project_records(values, fields)),
+        "Expanded": len(targets),
+    }
@@ -0,0 +1,431 @@
+"""
+Bulk Export
+===========
+
+Stream the results of an Office Add-ins search, or of the whole catalog, to
+NDJSON or Parquet files with bounded memory.
+
+The export is a pipeline of generators: search pages are fetched one ahead
+of the page being written, records are filtered and projected one at a time,
+and each page is appended to the output as soon as it arrives.  At no point
+does more than a couple of pages of records live in memory.
+
+Progress is checkpointed next to the output (``<output>.checkpoint.json``)
+after every durable write, so an interrupted export resumes from the last
+checkpoint instead of starting over.  The checkpoint is removed once the
+export completes.
+
+Parquet output requires the optional ``pyarrow`` package and is written as
+a directory of ``part-NNNNN.parquet`` files, each closed (and checkpointed)
+once it holds at least :data:`PARQUET_ROWS_PER_PART` rows.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import AsyncIterator, Awaitable, Callable, Iterable, Iterator, List, Optional
+
+from typing_extensions import TypedDict
+
+from office_addins_mcp_server.tools import upstream
+from office_addins_mcp_server.tools.addin_tools import (
+    SearchSpec,
+    build_search_params,
+    locale_params,
+)
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:  # pragma: no cover - depends on the environment
+    pyarrow = None
+
+
+EXPORT_FORMATS = ("ndjson", "parquet")
+
+# Records requested per search page.
+EXPORT_PAGE_SIZE = int(os.getenv("ADDINS_EXPORT_PAGE_SIZE", "100"))
+
+# Directory the export_addins MCP tool writes to; tool callers can only name
+# files inside it.
+EXPORT_DIR = os.getenv("ADDINS_EXPORT_DIR", "exports")
+
+# Minimum rows per Parquet part file.
+PARQUET_ROWS_PER_PART = 10_000
+
+# search_addins arguments that describe what to export; paging arguments
+# are controlled by the exporter itself.
+EXPORT_SEARCH_KEYS = frozenset(SearchSpec.__annotations__) - {
+    "top",
+    "skiptoitem",
+    "locales",
+    "autocorrect",
+}
+
+
+class ExportFilters(TypedDict, total=False):
+    """Record filters applied locally, after the API-side search filters."""
+
+    min_rating: float
+    min_votes: int
+    updated_since: str
+
+
+ProgressCallback = Callable[[dict], Awaitable[None]]
+
+
+def export_path(name: str) -> Path:
+    """Resolve an output name inside :data:`EXPORT_DIR`.
+
+    Raises
+    ------
+    ValueError
+        If ``name`` points outside the export directory.
+    """
+    root = Path(EXPORT_DIR).resolve()
+    path = (root / name).resolve()
+    if path == root or root not in path.parents:
+        raise ValueError(f"export output must be a file name inside {EXPORT_DIR!r}")
+    return path
+
+
+async def iter_search_pages(
+    params: dict,
+    headers: Optional[dict] = None,
+    page_size: int = EXPORT_PAGE_SIZE,
+    start: int = 0,
+) -> AsyncIterator[tuple[int, list[dict], Optional[int]]]:
+    """Yield ``(offset, values, total_count)`` for consecutive search pages.
+
+    The next page is requested while the caller processes the current one.
+    Pages bypass the search cache, which is sized for interactive queries.
+
+    Pages shorter than ``page_size`` do not end the scan, since the API may
+    cap ``top`` below it: pages are requested until one comes back empty or
+    the reported ``TotalCount`` is reached.
+    """
+
+    async def fetch(offset: int) -> dict:
+        page_params = {**params, "top": str(page_size), "skiptoitem": str(offset)}
+        return await upstream.get_json("search", params=page_params, headers=headers)
+
+    offset = start
+    pending: Optional[asyncio.Task] = asyncio.ensure_future(fetch(offset))
+    try:
+        while pending is not None:
+            result = await pending
+            pending = None
+            values = result.get("Values") or []
+            total = result.get("TotalCount")
+            next_offset = offset + len(values)
+            if values and (total is None or next_offset < total):
+                pending = asyncio.ensure_future(fetch(next_offset))
+            yield offset, values, total
+            offset = next_offset
+    finally:
+        if pending is not None:
+            pending.cancel()
+
+
+def _lookup(record: dict, path: str):
+    value = record
+    for part in path.split("."):
+        if not isinstance(value, dict):
+            return None
+        value = value.get(part)
+    return value
+
+
+def filter_records(records: Iterable[dict], filters: Optional[ExportFilters]) -> Iterator[dict]:
+    """Yield the records that pass ``filters``."""
+    filters = filters or {}
+    min_rating = filters.get("min_rating")
+    min_votes = filters.get("min_votes")
+    updated_since = filters.get("updated_since")
+    for record in records:
+        if min_rating is not None and (record.get("Rating") or 0) < min_rating:
+            continue
+        if min_votes is not None and (record.get("NumberOfVotes") or 0) < min_votes:
+            continue
+        # ISO 8601 timestamps compare correctly as strings.
+        if updated_since is not None and (record.get("LastUpdatedDate") or "") < updated_since:
+            continue
+        yield record
+
+
+def project_records(records: Iterable[dict], fields: Optional[List[str]]) -> Iterator[dict]:
+    """Yield each record reduced to ``fields`` (dotted paths such as
+    ``"Pricing.Category"``), or unchanged when no fields are given."""
+    for record in records:
+        if fields:
+            yield {field: _lookup(record, field) for field in fields}
+        else:
+            yield record
+
+
+class NDJSONWriter:
+    """Append records to a newline-delimited JSON file."""
+
+    def __init__(self, path: Path, state: Optional[dict] = None) -> None:
+        self.path = path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        if state is not None and path.exists():
+            # Drop anything written after the last checkpoint.
+            self._file = open(path, "r+b")
+            self._file.truncate(state["Bytes"])
+            self._file.seek(state["Bytes"])
+        else:
+            self._file = open(path, "wb")
+
+    def write(self, rows: List[dict]) -> None:
+        self._file.write(
+            b"".join(
+                json.dumps(row, ensure_ascii=False, default=str).encode() + b"\n"
+                for row in rows
+            )
+        )
+
+    def commit(self) -> Optional[dict]:
+        """Make the rows written so far durable and return the writer state."""
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        return {"Bytes": self._file.tell()}
+
+    def close(self) -> dict:
+        state = self.commit()
+        self._file.close()
+        return state
+
+    def abort(self) -> None:
+        self._file.close()
+
+
+class ParquetWriter:
+    """Write records to a directory of Parquet part files.
+
+    Nested values (lists and objects) are stored as JSON strings so that
+    every part has a flat, predictable schema.
+    """
+
+    def __init__(self, path: Path, state: Optional[dict] = None) -> None:
+        if pyarrow is None:
+            raise ImportError(
+                "Parquet export requires pyarrow; install it with `pip install pyarrow`"
+            )
+        self.path = path
+        path.mkdir(parents=True, exist_ok=True)
+        self.parts = state["Parts"] if state is not None else 0
+        for stale in path.glob("part-*.parquet*"):
+            # Unfinished parts, or parts from a previous run being restarted.
+            index = stale.name.split(".")[0].split("-")[-1]
+            if stale.name.endswith(".tmp") or not index.isdigit() or int(index) >= self.parts:
+                stale.unlink()
+        self._rows: list[dict] = []
+
+    def write(self, rows: List[dict]) -> None:
+        for row in rows:
+            self._rows.append(
+                {
+                    key: json.dumps(value, ensure_ascii=False, default=str)
+                    if isinstance(value, (dict, list))
+                    else value
+                    for key, value in row.items()
+                }
+            )
+
+    def _flush(self) -> None:
+        if not self._rows:
+            return
+        table = pyarrow.Table.from_pylist(self._rows)
+        final = self.path / f"part-{self.parts:05d}.parquet"
+        temporary = final.with_name(final.name + ".tmp")
+        pyarrow.parquet.write_table(table, temporary)
+        os.replace(temporary, final)
+        self.parts += 1
+        self._rows = []
+
+    def commit(self) -> Optional[dict]:
+        """Close a part once it is large enough; ``None`` while rows are pending."""
+        if len(self._rows) >= PARQUET_ROWS_PER_PART:
+            self._flush()
+        return None if self._rows else {"Parts": self.parts}
+
+    def close(self) -> dict:
+        self._flush()
+        return {"Parts": self.parts}
+
+    def abort(self) -> None:
+        self._rows = []
+
+
+WRITERS = {"ndjson": NDJSONWriter, "parquet": ParquetWriter}
+
+
+def _checkpoint_path(output: Path) -> Path:
+    return output.with_name(output.name + ".checkpoint.json")
+
+
+def _save_checkpoint(path: Path, checkpoint: dict) -> None:
+    temporary = path.with_name(path.name + ".tmp")
+    temporary.write_text(json.dumps(checkpoint))
+    os.replace(temporary, path)
+
+
+async def export_addins(
+    output: str,
+    format: str = "ndjson",
+    search: Optional[SearchSpec] = None,
+    fields: Optional[List[str]] = None,
+    filters: Optional[ExportFilters] = None,
+    max_records: Optional[int] = None,
+    page_size: int = EXPORT_PAGE_SIZE,
+    resume: bool = True,
+    on_page: Optional[ProgressCallback] = None,
+) -> dict:
+    """Stream search results to an NDJSON file or a Parquet directory.
+
+    Parameters
+    ----------
+    output : str
+        Output file (NDJSON) or directory (Parquet).
+    format : str
+        ``"ndjson"`` (default) or ``"parquet"``.
+    search : SearchSpec, optional
+        :func:`search_addins` arguments selecting the add-ins to export
+        (without ``top``, ``skiptoitem``, ``locales`` or ``autocorrect``).
+        By default the whole catalog is exported.
+    fields : List[str], optional
+        Fields to keep, as dotted paths (e.g. ``["Id", "Title",
+        "Pricing.Category"]``).  By default whole records are written.
+    filters : ExportFilters, optional
+        Local filters: ``min_rating``, ``min_votes`` and ``updated_since``
+        (an ISO 8601 date compared with ``LastUpdatedDate``).
+    max_records : int, optional
+        Stop after writing this many records.
+    page_size : int
+        Records requested per search page.
+    resume : bool
+        Continue from an existing checkpoint for the same export (default
+        True).  With False the export starts over.
+    on_page : callable, optional
+        Awaited with the running summary after every page.
+
+    Returns
+    -------
+    dict
+        A dictionary with the following structure:
+        - Output, Format: Where and how the records were written
+        - Records: Records written, including those of resumed runs
+        - Pages: Search pages read, including those of resumed runs
+        - Skipped: Records dropped by filters or as duplicates in this run
+        - TotalCount: The search's TotalCount as reported by the API
+        - Resumed: Whether the export continued from a checkpoint
+
+    Raises
+    ------
+    ValueError
+        If the format or search arguments are invalid, or the checkpoint
+        belongs to a different export.
+    ImportError
+        If Parquet output is requested without pyarrow installed.
+    """
+    if format not in EXPORT_FORMATS:
+        raise ValueError(f"unknown export format {format!r}; expected one of {EXPORT_FORMATS}")
+    search = dict(search or {})
+    unknown = set(search) - EXPORT_SEARCH_KEYS
+    if unknown:
+        raise ValueError(f"unsupported search arguments for export: {sorted(unknown)}")
+
+    headers = None
+    locale = search.pop("locale", None)
+    params = build_search_params(**search)
+    if locale:
+        extra_params, headers = locale_params(locale)
+        params.update(extra_params)
+
+    output_path = Path(output)
+    checkpoint_path = _checkpoint_path(output_path)
+    fingerprint = hashlib.sha256(
+        json.dumps(
+            {"params": params, "headers": headers, "format": format, "fields": fields,
+             "filters": filters, "page_size": page_size},
+            sort_keys=True,
+        ).encode()
+    ).hexdigest()
+
+    checkpoint = None
+    if resume and checkpoint_path.exists():
+        checkpoint = json.loads(checkpoint_path.read_text())
+        if not output_path.exists():
+            checkpoint = None
+        elif checkpoint.get("Fingerprint") != fingerprint:
+            raise ValueError(
+                f"{checkpoint_path} belongs to a different export; "
+                "pass resume=False to start over"
+            )
+
+    summary = {
+        "Output": str(output_path),
+        "Format": format,
+        "Records": checkpoint["Records"] if checkpoint else 0,
+        "Pages": checkpoint["Pages"] if checkpoint else 0,
+        "Skipped": 0,
+        "TotalCount": checkpoint.get("TotalCount") if checkpoint else None,
+        "Resumed": checkpoint is not None,
+    }
+    writer = WRITERS[format](output_path, checkpoint["Writer"] if checkpoint else None)
+    start = checkpoint["Offset"] if checkpoint else 0
+    seen: set[str] = set()
+
+    def unique(records: Iterable[dict]) -> Iterator[dict]:
+        # Pages can overlap when the catalog changes during the export.
+        for record in records:
+            asset_id = record.get("Id")
+            if asset_id is not None:
+                if asset_id in seen:
+                    continue
+                seen.add(asset_id)
+            yield record
+
+    try:
+        pages = iter_search_pages(params, headers, page_size=page_size, start=start)
+        async for offset, values, total in pages:
+            summary["Pages"] += 1
+            summary["TotalCount"] = total
+            rows = list(project_records(filter_records(unique(values), filters), fields))
+            summary["Skipped"] += len(values) - len(rows)
+            if max_records is not None:
+                rows = rows[: max(0, max_records - summary["Records"])]
+            if rows:
+                await asyncio.to_thread(writer.write, rows)
+            summary["Records"] += len(rows)
+            state = await asyncio.to_thread(writer.commit)
+            if state is not None:
+                _save_checkpoint(
+                    checkpoint_path,
+                    {
+                        "Fingerprint": fingerprint,
+                        "Offset": offset + len(values),
+                        "Records": summary["Records"],
+                        "Pages": summary["Pages"],
+                        "TotalCount": total,
+                        "Writer": state,
+                    },
+                )
+            if on_page is not None:
+                await on_page(dict(summary))
+            if max_records is not None and summary["Records"] >= max_records:
+                await pages.aclose()
+                break
+        await asyncio.to_thread(writer.close)
+    except BaseException:
+        # Keep the checkpoint so the next run resumes from it.
+        writer.abort()
+        raise
+
+    checkpoint_path.unlink(missing_ok=True)
+    return summary
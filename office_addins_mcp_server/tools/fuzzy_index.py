@@ -0,0 +1,322 @@
+"""
+Fuzzy Title Index
+=================
+
+This module keeps a small in-process lookup structure over every add-in title
+and provider name the server has seen.  It combines a trigram inverted index
+(for typo-tolerant matching) with a prefix trie (for autocomplete) so that
+suggestions can be answered locally without an upstream round trip.
+
+The index is fed from the records returned by the Office Add-ins API and is
+also used to rewrite obviously misspelled search queries before they are sent
+upstream.
+"""
+
+from __future__ import annotations
+
+import re
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Iterable, Optional
+
+
+_TOKEN_RE = re.compile(r"[^\w]+", re.UNICODE)
+
+# A whitespace-separated query piece: punctuation around one word.
+_PIECE_RE = re.compile(r"^(\W*)(\w+)(\W*)$", re.UNICODE)
+
+# A query token is only rewritten when it is at least this long; shorter
+# tokens are too ambiguous to correct reliably.
+MIN_CORRECTABLE_TOKEN = 4
+
+
+def normalize(text: str) -> str:
+    """Lower-case ``text`` and collapse punctuation and whitespace runs."""
+    return " ".join(_TOKEN_RE.sub(" ", text.lower()).split())
+
+
+def trigrams(text: str) -> set[str]:
+    """Return the padded word trigrams of ``text``.
+
+    Each word is padded with two leading blanks and one trailing blank, in the
+    same way as PostgreSQL's ``pg_trgm``, so that short words and word starts
+    still produce useful trigrams.
+    """
+    grams: set[str] = set()
+    for word in normalize(text).split():
+        padded = f"  {word} "
+        for i in range(len(padded) - 2):
+            grams.add(padded[i:i + 3])
+    return grams
+
+
+def edit_distance(a: str, b: str, limit: int = 2) -> int:
+    """Optimal string alignment distance between ``a`` and ``b``.
+
+    Adjacent transpositions count as a single edit ("docusing" is one edit
+    away from "docusign").  The computation stops early and returns
+    ``limit + 1`` once the distance is known to exceed ``limit``.
+    """
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    prev_prev: list[int] = []
+    prev = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        cur = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            cur[j] = min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + cost)
+            if (
+                i > 1 and j > 1
+                and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]
+            ):
+                cur[j] = min(cur[j], prev_prev[j - 2] + 1)
+        if min(cur) > limit:
+            return limit + 1
+        prev_prev, prev = prev, cur
+    return prev[-1]
+
+
+@dataclass
+class _Name:
+    """An indexed title or provider name and the add-ins it belongs to."""
+
+    text: str
+    kind: str
+    asset_ids: dict[str, str] = field(default_factory=dict)
+    grams: frozenset[str] = frozenset()
+
+
+class _TrieNode:
+    __slots__ = ("children", "names")
+
+    def __init__(self) -> None:
+        self.children: dict[str, _TrieNode] = {}
+        self.names: set[int] = set()
+
+
+class TitleIndex:
+    """Trigram inverted index and prefix trie over add-in titles and providers.
+
+    Records are added with :meth:`add_records` using the field names of the
+    Office Add-ins API (``Id``/``AssetId``, ``Title`` and ``ProviderName``).
+    Lookups are pure in-memory operations.
+    """
+
+    def __init__(self) -> None:
+        self._names: list[_Name] = []
+        self._name_ids: dict[tuple[str, str], int] = {}
+        self._grams: dict[str, set[int]] = {}
+        self._trie = _TrieNode()
+        self._titles: dict[str, str] = {}
+        self._vocab: dict[str, int] = {}
+        self._vocab_grams: dict[str, set[str]] = {}
+        self._vocab_gram_counts: dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._titles)
+
+    def clear(self) -> None:
+        """Remove every indexed name."""
+        self.__init__()
+
+    def add_records(self, records: Iterable[dict]) -> None:
+        """Index the titles and provider names of ``records``."""
+        for record in records:
+            if not isinstance(record, dict):
+                continue
+            asset_id = record.get("Id") or record.get("AssetId")
+            title = record.get("Title")
+            if not asset_id or not title:
+                continue
+            self._titles[asset_id] = title
+            self._add_name(title, "Title", asset_id, title)
+            provider = record.get("ProviderName")
+            if provider:
+                self._add_name(provider, "ProviderName", asset_id, title)
+
+    def _add_name(self, text: str, kind: str, asset_id: str, title: str) -> None:
+        norm = normalize(text)
+        if not norm:
+            return
+        key = (kind, norm)
+        name_id = self._name_ids.get(key)
+        if name_id is None:
+            name_id = len(self._names)
+            self._name_ids[key] = name_id
+            name = _Name(text=text, kind=kind, grams=frozenset(trigrams(norm)))
+            self._names.append(name)
+            for gram in name.grams:
+                self._grams.setdefault(gram, set()).add(name_id)
+            # Insert every word start so that "outl" completes "Zoom for Outlook".
+            words = norm.split()
+            for start in range(len(words)):
+                self._trie_insert(" ".join(words[start:]), name_id)
+            for word in words:
+                if word not in self._vocab:
+                    word_grams = trigrams(word)
+                    self._vocab_gram_counts[word] = len(word_grams)
+                    for gram in word_grams:
+                        self._vocab_grams.setdefault(gram, set()).add(word)
+                self._vocab[word] = self._vocab.get(word, 0) + 1
+        self._names[name_id].asset_ids[asset_id] = title
+
+    def _trie_insert(self, text: str, name_id: int) -> None:
+        node = self._trie
+        for char in text:
+            node = node.children.setdefault(char, _TrieNode())
+        node.names.add(name_id)
+
+    def _prefix_names(self, prefix: str, limit: int) -> list[int]:
+        node = self._trie
+        for char in prefix:
+            node = node.children.get(char)
+            if node is None:
+                return []
+        found: list[int] = []
+        seen: set[int] = set()
+        # Breadth-first so that shorter completions are found first.
+        queue = deque([node])
+        while queue and len(found) < limit:
+            current = queue.popleft()
+            for name_id in current.names:
+                if name_id not in seen:
+                    seen.add(name_id)
+                    found.append(name_id)
+            queue.extend(current.children.values())
+        return found
+
+    def suggest(self, text: str, limit: int = 10) -> list[dict]:
+        """Return ranked add-in candidates for a prefix or misspelled name.
+
+        Parameters
+        ----------
+        text : str
+            A title prefix ("zoo"), a word prefix ("outl") or a fuzzy name
+            ("Zooom", "Docusing").
+        limit : int
+            Maximum number of candidates to return.
+
+        Returns
+        -------
+        list[dict]
+            Candidates ordered by descending ``Score`` with ``Id``, ``Title``,
+            ``ProviderName`` (when the match was on the provider),
+            ``MatchedOn`` and ``Score`` keys.
+        """
+        query = normalize(text)
+        if not query or limit <= 0:
+            return []
+
+        scores: dict[int, float] = {}
+        for name_id in self._prefix_names(query, limit * 4):
+            name = self._names[name_id]
+            whole = normalize(name.text).startswith(query)
+            scores[name_id] = 1.0 if whole else 0.9
+
+        query_grams = trigrams(query)
+        shared: dict[int, int] = {}
+        for gram in query_grams:
+            for name_id in self._grams.get(gram, ()):
+                shared[name_id] = shared.get(name_id, 0) + 1
+        for name_id, count in shared.items():
+            name_grams = self._names[name_id].grams
+            containment = count / len(query_grams)
+            jaccard = count / (len(query_grams) + len(name_grams) - count)
+            score = 0.6 * containment + 0.2 * jaccard
+            if containment >= 0.5 and score > scores.get(name_id, 0.0):
+                scores[name_id] = score
+
+        ranked = sorted(
+            scores.items(),
+            key=lambda item: (-item[1], len(self._names[item[0]].text)),
+        )
+        results: list[dict] = []
+        seen: set[str] = set()
+        for name_id, score in ranked:
+            name = self._names[name_id]
+            for asset_id, title in name.asset_ids.items():
+                if asset_id in seen:
+                    continue
+                seen.add(asset_id)
+                candidate = {
+                    "Id": asset_id,
+                    "Title": title,
+                    "MatchedOn": name.kind,
+                    "Score": round(score, 3),
+                }
+                if name.kind == "ProviderName":
+                    candidate["ProviderName"] = name.text
+                results.append(candidate)
+                if len(results) >= limit:
+                    return results
+        return results
+
+    def _correct_token(self, token: str) -> Optional[str]:
+        if (
+            len(token) < MIN_CORRECTABLE_TOKEN
+            or token in self._vocab
+            or any(ch.isdigit() for ch in token)
+        ):
+            return None
+        token_grams = trigrams(token)
+        shared: dict[str, int] = {}
+        for gram in token_grams:
+            for word in self._vocab_grams.get(gram, ()):
+                shared[word] = shared.get(word, 0) + 1
+        max_edits = 1 if len(token) <= 5 else 2
+        best: Optional[tuple[int, float, int, str]] = None
+        for word, count in shared.items():
+            if abs(len(word) - len(token)) > max_edits:
+                continue
+            jaccard = count / (
+                len(token_grams) + self._vocab_gram_counts[word] - count
+            )
+            if jaccard < 0.3:
+                continue
+            # Inflections ("chart"/"charts") are not misspellings.
+            if word.startswith(token) or token.startswith(word):
+                continue
+            distance = edit_distance(token, word, max_edits)
+            if distance > max_edits:
+                continue
+            rank = (distance, -jaccard, -self._vocab[word], word)
+            if best is None or rank < best:
+                best = rank
+        return best[3] if best else None
+
+    def correct_query(self, query: str) -> Optional[str]:
+        """Rewrite obviously misspelled words of ``query``.
+
+        Each word that is unknown to the index is replaced by the closest
+        known title or provider word, provided it is within one edit (two for
+        words longer than five characters).  A word unknown to the index may
+        still be spelled correctly, so callers should only rewrite queries
+        that found nothing.  The rest of the query, including the case and
+        punctuation of words left alone, is kept as written; a replacement
+        takes the case of the word it replaces.  Returns ``None`` when
+        nothing was rewritten.
+        """
+        if not self._vocab:
+            return None
+        pieces = re.split(r"(\s+)", query)
+        changed = False
+        for i, piece in enumerate(pieces):
+            match = _PIECE_RE.match(piece)
+            if match is None:
+                continue
+            before, word, after = match.groups()
+            correction = self._correct_token(word.lower())
+            if correction is None:
+                continue
+            if word.isupper():
+                correction = correction.upper()
+            elif word[0].isupper():
+                correction = correction.capitalize()
+            pieces[i] = before + correction + after
+            changed = True
+        return "".join(pieces) if changed else None
+
+
+# Process-wide index shared by the MCP tools.
+title_index = TitleIndex()
@@ -0,0 +1,316 @@
+"""
+Add-in Manifests
+================
+
+Download and summarize Office Add-in XML manifests.  Each add-in record
+returned by the Office Add-ins API carries a ``ManifestUrl``; the manifest
+behind it declares the Office hosts, permissions, requirement sets and
+extension points of the add-in.
+
+Manifests are hashed and parsed incrementally with
+:class:`xml.etree.ElementTree.XMLPullParser` while they download, clearing
+elements as soon as they have been read, and the compact summaries are
+cached by the SHA-256 of the manifest content so that identical manifests
+share one summary.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import os
+from typing import Iterable, List, Optional
+from xml.etree.ElementTree import ParseError, XMLPullParser
+
+from office_addins_mcp_server.memory_budget import memory_budget
+from office_addins_mcp_server.tools import upstream
+from office_addins_mcp_server.tools.addin_tools import get_addin_details
+from office_addins_mcp_server.tools.cache import TTLCache
+from office_addins_mcp_server.tools.cache_backends import shared_cache
+
+
+# Manifests larger than this are rejected rather than parsed.
+MAX_MANIFEST_BYTES = 1024 * 1024
+
+# Number of manifests downloaded concurrently by get_addin_manifests.
+MANIFEST_CONCURRENCY = int(os.getenv("ADDINS_MANIFEST_CONCURRENCY", "4"))
+
+# Upper bound on the number of asset IDs per get_addin_manifests call.
+MAX_MANIFEST_BATCH = 25
+
+# Bytes handed to the XML parser per feed() call.
+_FEED_SIZE = 16 * 1024
+
+_XSI_TYPE = "{http://www.w3.org/2001/XMLSchema-instance}type"
+
+# Summaries keyed by manifest URL (how long before re-downloading) and by
+# content hash (so identical content is never parsed twice).
+manifest_url_cache = TTLCache(
+    maxsize=512, ttl=3600.0, shared=shared_cache, namespace="manifest"
+)
+manifest_parse_cache = TTLCache(maxsize=1024, ttl=7 * 24 * 3600.0)
+memory_budget.register("manifest_urls", manifest_url_cache)
+# A summary costs a download and a parse to rebuild.
+memory_budget.register("manifest_summaries", manifest_parse_cache, weight=2.0)
+
+
+def _local(tag: str) -> str:
+    """Strip the XML namespace from ``tag``."""
+    return tag.rsplit("}", 1)[-1]
+
+
+class ManifestParser:
+    """Summarize an Office Add-in XML manifest fed chunk by chunk.
+
+    Elements are cleared as soon as they have been read, so memory stays
+    bounded by the summary rather than by the manifest size.  See
+    :func:`parse_manifest` for the summary produced by :meth:`close`.
+
+    Raises
+    ------
+    ValueError
+        From :meth:`feed` or :meth:`close`, as soon as the content is known
+        not to be a well-formed OfficeApp manifest.
+    """
+
+    _TEXT_FIELDS = {"Id", "Version", "ProviderName", "DefaultLocale", "Permissions"}
+
+    def __init__(self) -> None:
+        self.summary: dict = {
+            "Id": None,
+            "Version": None,
+            "ProviderName": None,
+            "DisplayName": None,
+            "DefaultLocale": None,
+            "Type": None,
+            "Hosts": [],
+            "Permissions": None,
+            "Requirements": {"Sets": [], "Methods": []},
+            "ExtensionPoints": [],
+            "AppDomains": [],
+        }
+        self._parser = XMLPullParser(events=("start", "end"))
+        self._path: list[str] = []
+        self._default_min_version: Optional[str] = None
+        self._override_host: Optional[str] = None
+
+    def feed(self, data: bytes) -> None:
+        """Parse the next chunk of the manifest."""
+        view = memoryview(data)
+        try:
+            for start in range(0, len(view), _FEED_SIZE):
+                self._parser.feed(view[start:start + _FEED_SIZE].tobytes())
+                self._handle(self._parser.read_events())
+        except ParseError as exc:
+            raise ValueError(f"malformed manifest XML: {exc}") from exc
+
+    def close(self) -> dict:
+        """Finish parsing and return the summary."""
+        try:
+            self._parser.close()
+            self._handle(self._parser.read_events())
+        except ParseError as exc:
+            raise ValueError(f"malformed manifest XML: {exc}") from exc
+        return self.summary
+
+    def _handle(self, events) -> None:
+        summary, path = self.summary, self._path
+        for event, elem in events:
+            tag = _local(elem.tag)
+            if event == "start":
+                path.append(tag)
+                depth = len(path)
+                if depth == 1:
+                    if tag != "OfficeApp":
+                        raise ValueError(f"not an Office Add-in manifest (root <{tag}>)")
+                    summary["Type"] = elem.get(_XSI_TYPE)
+                elif depth == 2 and tag == "DisplayName":
+                    summary["DisplayName"] = elem.get("DefaultValue")
+                elif tag == "Host":
+                    name = elem.get("Name") or elem.get(_XSI_TYPE)
+                    if "VersionOverrides" in path:
+                        self._override_host = name
+                    if name and name not in summary["Hosts"]:
+                        summary["Hosts"].append(name)
+                elif tag == "Sets" and "Requirements" in path:
+                    self._default_min_version = elem.get("DefaultMinVersion")
+                elif tag == "Set" and "Requirements" in path:
+                    requirement = {
+                        "Name": elem.get("Name"),
+                        "MinVersion": elem.get("MinVersion") or self._default_min_version,
+                    }
+                    if requirement not in summary["Requirements"]["Sets"]:
+                        summary["Requirements"]["Sets"].append(requirement)
+                elif tag == "Method" and "Requirements" in path:
+                    method = elem.get("Name")
+                    if method and method not in summary["Requirements"]["Methods"]:
+                        summary["Requirements"]["Methods"].append(method)
+                elif tag == "ExtensionPoint":
+                    summary["ExtensionPoints"].append(
+                        {"Host": self._override_host, "Type": elem.get(_XSI_TYPE)}
+                    )
+            else:
+                if len(path) == 2 and tag in self._TEXT_FIELDS:
+                    summary[tag] = (elem.text or "").strip() or None
+                elif tag == "AppDomain" and elem.text:
+                    summary["AppDomains"].append(elem.text.strip())
+                elif tag == "Host" and "VersionOverrides" in path:
+                    self._override_host = None
+                path.pop()
+                # Free the subtree once it has been read; the summary only
+                # keeps the fields extracted above.
+                elem.clear()
+
+
+def parse_manifest(chunks: Iterable[bytes]) -> dict:
+    """Summarize an Office Add-in XML manifest fed as a sequence of chunks.
+
+    Parameters
+    ----------
+    chunks : Iterable[bytes]
+        The manifest content, in order.
+
+    Returns
+    -------
+    dict
+        A compact summary with the following keys:
+        - Id, Version, ProviderName, DisplayName, DefaultLocale
+        - Type: The OfficeApp type (TaskPaneApp, ContentApp or MailApp)
+        - Hosts: Host names from <Hosts> and <VersionOverrides>
+        - Permissions: The requested permission level
+        - Requirements: {"Sets": [{"Name", "MinVersion"}], "Methods": [...]}
+        - ExtensionPoints: [{"Host", "Type"}] from <VersionOverrides>
+        - AppDomains: Additional domains the add-in may navigate to
+
+    Raises
+    ------
+    ValueError
+        If the content is not a well-formed OfficeApp manifest.
+    """
+    parser = ManifestParser()
+    for chunk in chunks:
+        parser.feed(chunk)
+    return parser.close()
+
+
+class _ManifestDownload:
+    """Hash and parse a manifest while it is downloaded."""
+
+    def __init__(self) -> None:
+        self.sha256 = hashlib.sha256()
+        self.size = 0
+        self.parser = ManifestParser()
+
+    def feed(self, chunk: bytes) -> None:
+        self.sha256.update(chunk)
+        self.size += len(chunk)
+        self.parser.feed(chunk)
+
+    def close(self) -> tuple[str, int, dict]:
+        return self.sha256.hexdigest(), self.size, self.parser.close()
+
+
+async def fetch_manifest(manifest_url: str) -> dict:
+    """Download and summarize the manifest at ``manifest_url``.
+
+    The manifest is hashed and parsed as it streams in, so it is never held
+    in memory whole, and a download that is not a manifest stops at the
+    first element that gives it away.  Results are cached per URL for an
+    hour, and summaries by content hash, so that identical manifests share
+    one summary.
+
+    Returns
+    -------
+    dict
+        ``{"ManifestUrl", "Sha256", "Size", "Manifest"}`` where ``Manifest``
+        is the summary produced by :func:`parse_manifest`.
+    """
+
+    async def download() -> dict:
+        digest, size, summary = await upstream.get_stream(
+            manifest_url, _ManifestDownload, max_bytes=MAX_MANIFEST_BYTES
+        )
+        cached = manifest_parse_cache.get(digest)
+        if cached is None:
+            manifest_parse_cache.set(digest, summary)
+        else:
+            summary = cached
+        return {
+            "ManifestUrl": manifest_url,
+            "Sha256": digest,
+            "Size": size,
+            "Manifest": summary,
+        }
+
+    return dict(await manifest_url_cache.get_or_fetch(manifest_url, download))
+
+
+async def get_addin_manifest(asset_id: str) -> dict:
+    """Fetch and summarize the manifest of an Office add-in.
+
+    The manifest location is taken from the ``ManifestUrl`` of the add-in
+    details.
+
+    Parameters
+    ----------
+    asset_id : str
+        The asset ID of the add-in (e.g. "WA104381441").
+
+    Returns
+    -------
+    dict
+        ``{"AssetId", "ManifestUrl", "Sha256", "Size", "Manifest"}``; see
+        :func:`parse_manifest` for the ``Manifest`` structure.
+
+    Raises
+    ------
+    ValueError
+        If the add-in has no manifest URL or the manifest cannot be parsed.
+    httpx.HTTPStatusError
+        If the details or manifest request fails.
+    """
+    details = await get_addin_details(asset_id)
+    manifest_url = (details.get("Value") or {}).get("ManifestUrl")
+    if not manifest_url:
+        raise ValueError(f"add-in {asset_id} has no ManifestUrl")
+    return {"AssetId": asset_id, **await fetch_manifest(manifest_url)}
+
+
+async def get_addin_manifests(asset_ids: List[str]) -> dict:
+    """Fetch and summarize the manifests of several add-ins concurrently.
+
+    At most :data:`MANIFEST_CONCURRENCY` manifests are downloaded at a time,
+    in addition to the process-wide upstream limit.
+
+    Parameters
+    ----------
+    asset_ids : List[str]
+        Asset IDs to look up; at most :data:`MAX_MANIFEST_BATCH`.
+
+    Returns
+    -------
+    dict
+        A dictionary with the following structure:
+        - TotalCount: Number of manifests retrieved
+        - Values: Results of :func:`get_addin_manifest`, in request order
+        - Errors: Asset IDs that failed, mapped to an error message
+    """
+    asset_ids = list(dict.fromkeys(asset_ids))
+    if len(asset_ids) > MAX_MANIFEST_BATCH:
+        raise ValueError(f"at most {MAX_MANIFEST_BATCH} asset IDs are allowed per call")
+    semaphore = asyncio.Semaphore(MANIFEST_CONCURRENCY)
+
+    async def fetch_one(asset_id: str) -> dict:
+        async with semaphore:
+            return await get_addin_manifest(asset_id)
+
+    outcomes = await asyncio.gather(
+        *(fetch_one(asset_id) for asset_id in asset_ids), return_exceptions=True
+    )
+    values = [o for o in outcomes if not isinstance(o, BaseException)]
+    errors = {
+        asset_id: f"{type(o).__name__}: {o}"
+        for asset_id, o in zip(asset_ids, outcomes)
+        if isinstance(o, BaseException)
+    }
+    return {"TotalCount": len(values), "Values": values, "Errors": errors}
@@ -0,0 +1,122 @@
+"""
+Tool Result Models
+==================
+
+Typed descriptions of the results returned by the add-in tools, following
+the response format documented in docs/Office-AddIns-Search-API-Guide.md.
+The MCP server registers them as the tools' structured output, so clients
+receive an ``outputSchema`` with every tool listing.
+
+The tools keep returning plain dictionaries; these models only describe
+them.  Every field the documentation lists is typed, and fields it does not
+list are allowed, since the store adds fields over time.
+"""
+
+from __future__ import annotations
+
+from typing import Dict, List, Optional
+
+from pydantic import BaseModel, ConfigDict, Field
+
+
+class _Result(BaseModel):
+    model_config = ConfigDict(extra="allow")
+
+
+class AddinPricing(_Result):
+    Category: Optional[str] = Field(None, description="Free, Paid or Freemium")
+    FreeType: Optional[str] = None
+    SiteLicenseAvailable: Optional[bool] = None
+    Price: Optional[str] = None
+    Currency: Optional[str] = None
+    SupportsTrial: Optional[bool] = None
+    IsUnlimitedTrial: Optional[bool] = None
+    TrialLength: Optional[int] = None
+
+
+class AddinCategory(_Result):
+    Id: Optional[str] = None
+    Title: Optional[str] = None
+    LongTitle: Optional[str] = None
+
+
+class AddinClient(_Result):
+    Client: Optional[str] = Field(None, description="Client ID, e.g. Win32_Excel")
+    MinVersion: Optional[str] = None
+    DisplayName: Optional[str] = None
+
+
+class AddinPermission(_Result):
+    Id: Optional[str] = None
+    Description: Optional[str] = None
+    LongDescription: Optional[str] = None
+
+
+class AddinCertification(_Result):
+    State: Optional[str] = None
+    Id: Optional[str] = None
+    Uri: Optional[str] = None
+    Description: Optional[str] = None
+
+
+class AddinRecord(_Result):
+    """An add-in as returned by the search and details endpoints."""
+
+    Id: Optional[str] = Field(None, description="Asset ID, e.g. WA104381441")
+    Title: Optional[str] = None
+    ShortDescription: Optional[str] = None
+    IconUrl: Optional[str] = None
+    Rating: Optional[float] = None
+    NumberOfVotes: Optional[int] = None
+    DateReleased: Optional[str] = None
+    LastUpdatedDate: Optional[str] = None
+    ProductId: Optional[str] = None
+    ManifestUrl: Optional[str] = None
+    Culture: Optional[str] = None
+    State: Optional[str] = None
+    Version: Optional[str] = None
+    Shape: Optional[int] = None
+    Width: Optional[int] = None
+    Height: Optional[int] = None
+    Pricing: Optional[AddinPricing] = None
+    Categories: Optional[List[AddinCategory]] = None
+    SupportedClients: Optional[List[AddinClient]] = None
+    Permissions: Optional[List[AddinPermission]] = None
+    Certification: Optional[AddinCertification] = None
+    ProviderName: Optional[str] = None
+    LicenseTermsUrl: Optional[str] = None
+    PrivacyPolicyUrl: Optional[str] = None
+    SupportUrl: Optional[str] = None
+    Locales: Optional[List[str]] = Field(
+        None, description="Locales returning the add-in (multi-locale searches only)"
+    )
+
+
+class QueryRewriteInfo(_Result):
+    Original: str
+    Rewritten: str
+
+
+class SearchResult(_Result):
+    """Result of the ``search_addins`` tool."""
+
+    TotalCount: int = Field(description="Total number of matching add-ins")
+    Values: List[AddinRecord] = Field(description="Add-ins of the current page")
+    QueryRewrite: Optional[QueryRewriteInfo] = Field(
+        None, description="Present only when the query was autocorrected"
+    )
+    NextCursor: Optional[str] = Field(
+        None, description="Cursor for the next page, present while more results remain"
+    )
+    LocaleTotals: Optional[Dict[str, Optional[int]]] = Field(
+        None, description="TotalCount of each locale (multi-locale searches only)"
+    )
+    LocaleErrors: Optional[Dict[str, str]] = Field(
+        None, description="Locales whose request failed (multi-locale searches only)"
+    )
+
+
+class AddinDetailsResult(_Result):
+    """Result of the ``get_addin_details`` tool."""
+
+    Value: Optional[AddinRecord] = None
@@ -0,0 +1,456 @@
+"""
+Catalog Statistics
+==================
+
+Group-by aggregations over the local add-in catalog (see
+:mod:`tools.catalog`), so questions such as "average rating of free Outlook
+add-ins by category" are answered on the server instead of by pulling
+hundreds of raw records into the model's context.
+
+The catalog is copied into columns (ratings, votes, release years, and the
+category, provider, client and pricing keys dictionary-exploded per record);
+queries then only filter and aggregate those columns.  Search and details
+responses change the catalog all the time, so the columns are rebuilt at
+most once per ``ADDINS_STATS_MAX_STALENESS`` seconds and the previous ones
+are served in between; a call with ``refresh`` that scans the catalog
+rebuilds them at once.  When the optional ``pyarrow`` package is installed the filters and
+aggregations run as vectorized Arrow compute kernels; otherwise a plain
+Python pass over the same columns produces identical results.
+
+The statistics cover whatever the catalog holds: every add-in after a
+complete scan (``ADDINS_CATALOG_REFRESH_INTERVAL``), otherwise only those
+seen in search and details responses.  Results report the catalog size and
+the time of the last complete scan so callers can judge coverage.
+"""
+
+from __future__ import annotations
+
+import os
+import statistics
+import time
+from typing import Callable, Iterable, List, Optional
+
+from office_addins_mcp_server.metrics import registry
+from office_addins_mcp_server.tools.catalog import catalog
+from office_addins_mcp_server.tools.changelog import changelog, format_time, refresh_catalog
+
+try:
+    import pyarrow
+    import pyarrow.compute as pc
+except ImportError:  # pragma: no cover - depends on the environment
+    pyarrow = None
+
+
+STATS_GROUPS = ("category", "provider", "client", "pricing")
+STATS_METRICS = (
+    "count",
+    "mean_rating",
+    "median_rating",
+    "weighted_rating",
+    "votes",
+    "released",
+)
+STATS_ORDER = ("count", "mean_rating", "median_rating", "weighted_rating", "votes", "key")
+
+# Upper bound on the number of groups returned per call.
+MAX_STATS_GROUPS = 500
+
+# Seconds the columns may lag behind the catalog before they are rebuilt.
+STATS_MAX_STALENESS = float(os.getenv("ADDINS_STATS_MAX_STALENESS", "30"))
+
+column_rebuilds_total = registry.counter(
+    "addins_stats_column_rebuilds_total",
+    "Rebuilds of the catalog columns behind addin_stats.",
+)
+
+# Output key of each metric.
+_METRIC_KEYS = {
+    "count": "Count",
+    "mean_rating": "MeanRating",
+    "median_rating": "MedianRating",
+    "weighted_rating": "WeightedRating",
+    "votes": "Votes",
+    "released": "Released",
+}
+
+
+def _group_keys(record: dict, group: str) -> list[str]:
+    if group == "category":
+        keys = [c.get("Id") for c in record.get("Categories") or [] if isinstance(c, dict)]
+    elif group == "client":
+        keys = [c.get("Client") for c in record.get("SupportedClients") or [] if isinstance(c, dict)]
+    elif group == "provider":
+        keys = [record.get("ProviderName")]
+    else:
+        keys = [(record.get("Pricing") or {}).get("Category")]
+    return list(dict.fromkeys(key for key in keys if key))
+
+
+class CatalogColumns:
+    """The catalog records as columns, one entry per record.
+
+    A record is *rated* when it has a ``Rating`` and at least one vote;
+    unrated records have ``None`` ratings and count towards ``Count`` only.
+    For each group dimension, ``exploded[group]`` lists ``(rows, keys)``
+    with one entry per record and key, so a record in two categories is
+    counted in both.
+    """
+
+    def __init__(self, records: Iterable[dict]) -> None:
+        self.rating: list[Optional[float]] = []
+        self.votes: list[int] = []
+        self.year: list[Optional[int]] = []
+        self.pricing: list[Optional[str]] = []
+        # "|key|key|" strings, lower-cased, for substring filters.
+        self.clients_text: list[str] = []
+        self.categories_text: list[str] = []
+        self.exploded: dict[str, tuple[list[int], list[str]]] = {
+            group: ([], []) for group in STATS_GROUPS
+        }
+        for row, record in enumerate(records):
+            votes = record.get("NumberOfVotes") or 0
+            rating = record.get("Rating")
+            rated = isinstance(rating, (int, float)) and votes > 0
+            released = str(record.get("DateReleased") or "")[:4]
+            self.rating.append(float(rating) if rated else None)
+            self.votes.append(int(votes))
+            self.year.append(int(released) if released.isdigit() else None)
+            self.pricing.append((record.get("Pricing") or {}).get("Category"))
+            for group in STATS_GROUPS:
+                keys = _group_keys(record, group)
+                rows, labels = self.exploded[group]
+                rows.extend([row] * len(keys))
+                labels.extend(keys)
+                if group == "client":
+                    self.clients_text.append("|" + "|".join(keys).lower() + "|")
+                elif group == "category":
+                    self.categories_text.append("|" + "|".join(keys).lower() + "|")
+        self.size = len(self.votes)
+        self._arrow: Optional[dict] = None
+
+    def arrow(self) -> dict:
+        """Return the columns as Arrow arrays, converted on first use."""
+        if self._arrow is None:
+            rating = pyarrow.array(self.rating, pyarrow.float64())
+            votes = pyarrow.array(self.votes, pyarrow.int64())
+            rated_votes = pc.if_else(pc.is_valid(rating), votes, 0)
+            self._arrow = {
+                "rating": rating,
+                "votes": votes,
+                "rated_votes": rated_votes,
+                "weighted": pc.multiply(rating, votes.cast(pyarrow.float64())),
+                "year": pyarrow.array(self.year, pyarrow.int32()),
+                "pricing": pyarrow.array(self.pricing, pyarrow.string()),
+                "clients_text": pyarrow.array(self.clients_text, pyarrow.string()),
+                "categories_text": pyarrow.array(self.categories_text, pyarrow.string()),
+                "exploded": {
+                    group: (pyarrow.array(rows, pyarrow.int64()), pyarrow.array(keys, pyarrow.string()))
+                    for group, (rows, keys) in self.exploded.items()
+                },
+            }
+        return self._arrow
+
+
+class ColumnsCache:
+    """The columns of the catalog, rebuilt at most once per ``max_staleness`` seconds.
+
+    Parameters
+    ----------
+    max_staleness : float
+        Seconds the columns of a changed catalog are still served.
+    clock : Callable[[], float], optional
+        Monotonic time source, replaceable in tests.
+    """
+
+    def __init__(
+        self,
+        max_staleness: float = STATS_MAX_STALENESS,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.max_staleness = max_staleness
+        self._clock = clock
+        self._columns: Optional[CatalogColumns] = None
+        self._version = -1
+        self._built_at = 0.0
+
+    def clear(self) -> None:
+        self._columns = None
+        self._version = -1
+
+    def get(self, fresh: bool = False) -> CatalogColumns:
+        """Return the columns, rebuilt if the catalog changed and they are too old.
+
+        With ``fresh``, any change of the catalog triggers a rebuild.
+        """
+        columns = self._columns
+        if columns is not None and (
+            self._version == catalog.version
+            or (not fresh and self._clock() - self._built_at < self.max_staleness)
+        ):
+            return columns
+        self._version = catalog.version
+        self._columns = CatalogColumns(catalog.records())
+        self._built_at = self._clock()
+        column_rebuilds_total.inc()
+        return self._columns
+
+
+columns_cache = ColumnsCache()
+
+
+def catalog_columns(fresh: bool = False) -> CatalogColumns:
+    """Return the columns of the catalog (see :class:`ColumnsCache`)."""
+    return columns_cache.get(fresh)
+
+
+def _python_mask(columns: CatalogColumns, filters: dict) -> list[bool]:
+    mask = [True] * columns.size
+    for row in range(columns.size):
+        if filters["free"] is not None and (columns.pricing[row] == "Free") != filters["free"]:
+            mask[row] = False
+        elif filters["min_votes"] is not None and columns.votes[row] < filters["min_votes"]:
+            mask[row] = False
+        elif filters["clients"] and not any(
+            token in columns.clients_text[row] for token in filters["clients"]
+        ):
+            mask[row] = False
+        elif filters["categories"] and not any(
+            f"|{category}|" in columns.categories_text[row] for category in filters["categories"]
+        ):
+            mask[row] = False
+    return mask
+
+
+def _python_aggregate(columns: CatalogColumns, group: str, filters: dict) -> dict:
+    mask = _python_mask(columns, filters)
+    groups: dict[str, dict] = {}
+    for row, key in zip(*columns.exploded[group]):
+        if not mask[row]:
+            continue
+        entry = groups.setdefault(
+            key, {"Count": 0, "Votes": 0, "ratings": [], "weighted": 0.0, "rated_votes": 0, "Released": {}}
+        )
+        entry["Count"] += 1
+        entry["Votes"] += columns.votes[row]
+        rating = columns.rating[row]
+        if rating is not None:
+            entry["ratings"].append(rating)
+            entry["weighted"] += rating * columns.votes[row]
+            entry["rated_votes"] += columns.votes[row]
+        year = columns.year[row]
+        if year is not None:
+            entry["Released"][str(year)] = entry["Released"].get(str(year), 0) + 1
+    for entry in groups.values():
+        ratings = entry.pop("ratings")
+        weighted, rated_votes = entry.pop("weighted"), entry.pop("rated_votes")
+        entry["MeanRating"] = sum(ratings) / len(ratings) if ratings else None
+        entry["MedianRating"] = statistics.median(ratings) if ratings else None
+        entry["WeightedRating"] = weighted / rated_votes if rated_votes else None
+    return groups
+
+
+def _arrow_mask(columns: CatalogColumns, filters: dict):
+    """Return the rows matching ``filters`` as a boolean array, or None for all rows."""
+    data = columns.arrow()
+    conditions = []
+    if filters["free"] is not None:
+        free = pc.fill_null(pc.equal(data["pricing"], "Free"), False)
+        conditions.append(free if filters["free"] else pc.invert(free))
+    if filters["min_votes"] is not None:
+        conditions.append(pc.greater_equal(data["votes"], filters["min_votes"]))
+    for column, patterns in (
+        ("clients_text", filters["clients"]),
+        ("categories_text", [f"|{c}|" for c in filters["categories"] or []]),
+    ):
+        if patterns:
+            matches = [pc.match_substring(data[column], pattern) for pattern in patterns]
+            any_match = matches[0]
+            for match in matches[1:]:
+                any_match = pc.or_(any_match, match)
+            conditions.append(any_match)
+    if not conditions:
+        return None
+    mask = conditions[0]
+    for condition in conditions[1:]:
+        mask = pc.and_(mask, condition)
+    return mask
+
+
+def _arrow_aggregate(columns: CatalogColumns, group: str, filters: dict) -> dict:
+    data = columns.arrow()
+    rows, keys = data["exploded"][group]
+    table = pyarrow.table(
+        {
+            "key": keys,
+            "rating": pc.take(data["rating"], rows),
+            "votes": pc.take(data["votes"], rows),
+            "rated_votes": pc.take(data["rated_votes"], rows),
+            "weighted": pc.take(data["weighted"], rows),
+            "year": pc.take(data["year"], rows),
+        }
+    )
+    mask = _arrow_mask(columns, filters)
+    if mask is not None:
+        table = table.filter(pc.take(mask, rows))
+
+    totals = table.group_by("key").aggregate(
+        [
+            ("key", "count"),
+            ("votes", "sum"),
+            ("rating", "mean"),
+            ("weighted", "sum"),
+            ("rated_votes", "sum"),
+        ]
+    )
+    groups: dict[str, dict] = {}
+    for entry in totals.to_pylist():
+        rated_votes = entry["rated_votes_sum"]
+        groups[entry["key"]] = {
+            "Count": entry["key_count"],
+            "Votes": entry["votes_sum"],
+            "MeanRating": entry["rating_mean"],
+            "MedianRating": None,
+            "WeightedRating": entry["weighted_sum"] / rated_votes if rated_votes else None,
+            "Released": {},
+        }
+
+    # Exact medians: sort by (key, rating) and pick the middle of each run.
+    rated = table.filter(pc.is_valid(table["rating"])).sort_by(
+        [("key", "ascending"), ("rating", "ascending")]
+    )
+    if rated.num_rows:
+        counts = rated.group_by("key").aggregate([("key", "count")])
+        # Arrow sorts strings by code point, like Python, so the runs follow
+        # the sorted keys.
+        runs = sorted(zip(counts["key"].to_pylist(), counts["key_count"].to_pylist()))
+        lows, highs, offset = [], [], 0
+        for _, count in runs:
+            lows.append(offset + (count - 1) // 2)
+            highs.append(offset + count // 2)
+            offset += count
+        ratings = rated["rating"]
+        medians = pc.divide(pc.add(pc.take(ratings, lows), pc.take(ratings, highs)), 2.0)
+        for (key, _), median in zip(runs, medians.to_pylist()):
+            groups[key]["MedianRating"] = median
+
+    released = table.filter(pc.is_valid(table["year"])).group_by(["key", "year"]).aggregate(
+        [("key", "count")]
+    )
+    for entry in released.to_pylist():
+        groups[entry["key"]]["Released"][str(entry["year"])] = entry["key_count"]
+    return groups
+
+
+async def addin_stats(
+    group_by: str = "category",
+    metrics: Optional[List[str]] = None,
+    free: Optional[bool] = None,
+    clients: Optional[List[str]] = None,
+    categories: Optional[List[str]] = None,
+    min_votes: Optional[int] = None,
+    order_by: str = "count",
+    top: int = 20,
+    refresh: bool = False,
+) -> dict:
+    """Aggregate the local catalog by category, provider, client or pricing.
+
+    Parameters
+    ----------
+    group_by : str, optional
+        One of :data:`STATS_GROUPS`.  Add-ins with several categories or
+        clients are counted in each of them.
+    metrics : List[str], optional
+        Subset of :data:`STATS_METRICS` to report (all by default).
+        Ratings only consider add-ins with at least one vote;
+        ``weighted_rating`` weights each rating by its number of votes and
+        ``released`` is a histogram of release years.
+    free : bool, optional
+        Only free (``True``) or only non-free (``False``) add-ins.
+    clients : List[str], optional
+        Only add-ins supporting a client containing one of these strings,
+        case-insensitively (e.g. ``["Outlook"]`` matches ``Win32_Outlook``).
+    categories : List[str], optional
+        Only add-ins in one of these category IDs.
+    min_votes : int, optional
+        Only add-ins with at least this many votes.
+    order_by : str, optional
+        One of :data:`STATS_ORDER`; groups are sorted by decreasing value,
+        or alphabetically for ``"key"``.
+    top : int, optional
+        Number of groups returned (default 20, at most
+        :data:`MAX_STATS_GROUPS`).
+    refresh : bool, optional
+        Scan the whole catalog first if no complete scan has been made yet.
+        Otherwise the statistics may lag behind the catalog by up to
+        :data:`STATS_MAX_STALENESS` seconds.
+
+    Returns
+    -------
+    dict
+        A dictionary with the following structure:
+        - GroupBy: The grouping dimension
+        - TotalCount: Number of groups before ``top`` is applied
+        - Values: Groups with Key and the requested metrics (Count,
+          MeanRating, MedianRating, WeightedRating, Votes, Released)
+        - CatalogRecords: Number of add-ins in the local catalog
+        - BaselineAt: Time of the last complete catalog scan, or None
+
+    Raises
+    ------
+    ValueError
+        If a grouping, metric, ordering or ``top`` is invalid.
+    """
+    if group_by not in STATS_GROUPS:
+        raise ValueError(f"unknown group_by {group_by!r}; expected one of {STATS_GROUPS}")
+    metrics = list(metrics or STATS_METRICS)
+    unknown = set(metrics) - set(STATS_METRICS)
+    if unknown:
+        raise ValueError(f"unknown metrics {sorted(unknown)}; expected some of {STATS_METRICS}")
+    if order_by not in STATS_ORDER:
+        raise ValueError(f"unknown order_by {order_by!r}; expected one of {STATS_ORDER}")
+    if not 1 <= top <= MAX_STATS_GROUPS:
+        raise ValueError(f"top must be between 1 and {MAX_STATS_GROUPS}")
+
+    scanned = refresh and changelog.baseline_at is None
+    if scanned:
+        await refresh_catalog()
+
+    filters = {
+        "free": free,
+        "min_votes": min_votes,
+        "clients": [client.lower() for client in clients or []],
+        "categories": [category.lower() for category in categories or []],
+    }
+    columns = catalog_columns(fresh=scanned)
+    aggregate = _arrow_aggregate if pyarrow is not None else _python_aggregate
+    groups = aggregate(columns, group_by, filters) if columns.size else {}
+
+    if order_by == "key":
+        ordered = sorted(groups.items())
+    else:
+        field = _METRIC_KEYS[order_by]
+        ordered = sorted(
+            groups.items(),
+            key=lambda item: (item[1][field] is None, -(item[1][field] or 0), item[0]),
+        )
+
+    selected = ["Count"] + [_METRIC_KEYS[m] for m in metrics if m != "count"]
+    values = []
+    for key, entry in ordered[:top]:
+        value = {"Key": key}
+        for field in selected:
+            result = entry[field]
+            if isinstance(result, float):
+                result = round(result, 4)
+            elif field == "Released":
+                result = dict(sorted(result.items()))
+            value[field] = result
+        values.append(value)
+
+    return {
+        "GroupBy": group_by,
+        "TotalCount": len(groups),
+        "Values": values,
+        "CatalogRecords": columns.size,
+        "BaselineAt": format_time(changelog.baseline_at) if changelog.baseline_at else None,
+    }
@@ -0,0 +1,327 @@
+"""
+Office Add-ins API Client
+=========================
+
+Shared access to the Office Add-ins API for all MCP tools.  A single pooled
+``httpx.AsyncClient`` is reused across requests so that connections (and
+their TLS sessions) are kept alive, and every request passes through a
+process-wide limiter that caps the number of concurrent upstream calls.
+
+Requests honour the deadline of the tool call that issued them (see
+:func:`deadline`): time spent waiting for the limiter, each attempt and the
+back-off between retries all come out of the same budget.  Cancelling the
+calling task aborts the in-flight request and releases its connection and
+limiter slot immediately.
+
+Traffic can be recorded to, or replayed from, a cassette file for offline
+benchmarks (see :mod:`tools.cassette`).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import random
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Iterator, Optional, TypeVar
+
+import anyio
+import httpx
+
+from office_addins_mcp_server.tools import cassette
+
+try:
+    import brotli  # noqa: F401  (enables brotli decoding in httpx)
+except ImportError:  # pragma: no cover - depends on the environment
+    brotli = None
+
+
+API_BASE_URL = "https://api.addins.omex.office.net/api/addins"
+
+# Per-attempt timeout in seconds when no shorter deadline applies.
+DEFAULT_TIMEOUT = 30.0
+
+# Retries after a transport error or a transient status code, and the base of
+# the exponential back-off between them.
+MAX_RETRIES = int(os.getenv("ADDINS_UPSTREAM_RETRIES", "2"))
+RETRY_BACKOFF = 0.2
+RETRY_STATUSES = frozenset({429, 502, 503, 504})
+
+# Content codings advertised to the API; httpx decodes them transparently.
+ACCEPT_ENCODING = "br, gzip, deflate" if brotli is not None else "gzip, deflate"
+
+# Maximum number of requests in flight against the Office Add-ins API.
+MAX_CONCURRENCY = int(os.getenv("ADDINS_UPSTREAM_CONCURRENCY", "8"))
+
+_client: Optional[httpx.AsyncClient] = None
+_limiter: Optional[asyncio.Semaphore] = None
+_loop: Optional[asyncio.AbstractEventLoop] = None
+
+# Absolute time.monotonic() deadline of the current tool call, if any.
+_deadline: ContextVar[Optional[float]] = ContextVar("addins_deadline", default=None)
+
+T = TypeVar("T")
+
+# One DEBUG record per attempt; the tool call's correlation fields are added
+# by the logging pipeline (see office_addins_mcp_server.logs).
+logger = logging.getLogger("office-addins-mcp.upstream")
+
+
+class DeadlineExceeded(TimeoutError):
+    """Raised when a tool call's deadline expires before the API answered."""
+
+
+@contextmanager
+def deadline(timeout: Optional[float]) -> Iterator[None]:
+    """Bound every upstream request made in this context to ``timeout`` seconds.
+
+    The deadline is carried in a context variable, so it also applies to
+    tasks spawned from this context (e.g. by ``asyncio.gather``).  Nested
+    deadlines can only shorten the enclosing one.  ``None`` leaves the
+    current deadline unchanged.
+    """
+    if timeout is None:
+        yield
+        return
+    expires = time.monotonic() + timeout
+    current = _deadline.get()
+    if current is not None:
+        expires = min(expires, current)
+    token = _deadline.set(expires)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def remaining() -> Optional[float]:
+    """Seconds left before the current deadline, or ``None`` without one."""
+    expires = _deadline.get()
+    return None if expires is None else expires - time.monotonic()
+
+
+def _bind_to_running_loop() -> None:
+    """(Re)create the pooled client and limiter for the running event loop.
+
+    Connection pools and semaphores belong to the event loop they were first
+    used on.  Tests and CLI helpers may run several loops in one process, so
+    a fresh client is created whenever the loop changes.
+    """
+    global _client, _limiter, _loop
+    loop = asyncio.get_running_loop()
+    if _loop is loop and _client is not None and not _client.is_closed:
+        return
+    limits = httpx.Limits(
+        max_connections=MAX_CONCURRENCY,
+        max_keepalive_connections=MAX_CONCURRENCY,
+    )
+    _client = httpx.AsyncClient(
+        timeout=DEFAULT_TIMEOUT,
+        headers={"Accept-Encoding": ACCEPT_ENCODING},
+        limits=limits,
+        # Recording or replaying a cassette, if configured (see tools.cassette)
+        transport=cassette.transport(limits),
+    )
+    _limiter = asyncio.Semaphore(MAX_CONCURRENCY)
+    _loop = loop
+
+
+def get_client() -> httpx.AsyncClient:
+    """Return the pooled client for the running event loop."""
+    _bind_to_running_loop()
+    return _client
+
+
+def get_limiter() -> asyncio.Semaphore:
+    """Return the shared upstream concurrency limiter."""
+    _bind_to_running_loop()
+    return _limiter
+
+
+async def aclose() -> None:
+    """Close the pooled client, e.g. from an application lifespan handler."""
+    global _client, _loop
+    if _client is not None and _loop is asyncio.get_running_loop():
+        await _client.aclose()
+    _client = None
+    _loop = None
+
+
+def _attempt_timeout() -> float:
+    left = remaining()
+    if left is None:
+        return DEFAULT_TIMEOUT
+    if left <= 0:
+        raise DeadlineExceeded("tool call deadline exceeded before the request was sent")
+    return min(DEFAULT_TIMEOUT, left)
+
+
+def _is_retryable(exc: BaseException) -> bool:
+    if isinstance(exc, httpx.HTTPStatusError):
+        return exc.response.status_code in RETRY_STATUSES
+    return isinstance(exc, (httpx.TransportError, TimeoutError))
+
+
+def _log_attempt(url: str, retries: int, started: float, outcome: Any) -> None:
+    if not logger.isEnabledFor(logging.DEBUG):
+        return
+    if isinstance(outcome, httpx.HTTPStatusError):
+        outcome = outcome.response.status_code
+    elif isinstance(outcome, BaseException):
+        outcome = type(outcome).__name__
+    logger.debug(
+        "upstream GET %s -> %s",
+        url,
+        outcome,
+        extra={
+            "upstream_url": url,
+            "outcome": outcome,
+            "attempt": retries + 1,
+            "elapsed_ms": round((time.monotonic() - started) * 1000, 1),
+        },
+    )
+
+
+async def _send(attempt: Callable[[float], Awaitable[T]], url: str) -> T:
+    """Run ``attempt`` under the limiter, retrying transient failures.
+
+    ``attempt`` receives the timeout for that attempt, which is the smaller
+    of :data:`DEFAULT_TIMEOUT` and the time left before the deadline.  Each
+    attempt on ``url`` is logged at DEBUG.
+    """
+    retries = 0
+    while True:
+        timeout = _attempt_timeout()
+        started = time.monotonic()
+        try:
+            # fail_after bounds the limiter wait plus the whole exchange;
+            # when it fires the request is cancelled and its connection
+            # discarded, returning the pool and limiter slots at once.
+            with anyio.fail_after(timeout):
+                async with get_limiter():
+                    result = await attempt(timeout)
+            _log_attempt(url, retries, started, "ok")
+            return result
+        except Exception as exc:
+            _log_attempt(url, retries, started, exc)
+            left = remaining()
+            if isinstance(exc, TimeoutError) and left is not None and left <= 0:
+                raise DeadlineExceeded("tool call deadline exceeded") from exc
+            if retries >= MAX_RETRIES or not _is_retryable(exc):
+                raise
+            backoff = RETRY_BACKOFF * 2 ** retries * (1 + random.random())
+            if left is not None and backoff >= left:
+                raise
+            retries += 1
+            await asyncio.sleep(backoff)
+
+
+async def get_json(
+    path: str,
+    params: Optional[dict] = None,
+    headers: Optional[dict] = None,
+) -> Any:
+    """Issue a GET request to the Office Add-ins API and decode the JSON body.
+
+    Parameters
+    ----------
+    path : str
+        Endpoint path below :data:`API_BASE_URL` (e.g. ``"search"``).
+    params : dict, optional
+        Query string parameters.
+    headers : dict, optional
+        Extra request headers such as ``Accept-Language``.
+
+    Raises
+    ------
+    httpx.HTTPStatusError
+        If the API response status is not 2xx.
+    httpx.RequestError
+        If there is a network failure while communicating with the API.
+    DeadlineExceeded
+        If the tool call's deadline expires first.
+    """
+    client = get_client()
+
+    async def attempt(timeout: float) -> Any:
+        response = await client.get(
+            f"{API_BASE_URL}/{path}", params=params, headers=headers, timeout=timeout
+        )
+        # FastMCP automatically converts exceptions into MCP error responses.
+        response.raise_for_status()
+        return response.json()
+
+    return await _send(attempt, f"{API_BASE_URL}/{path}")
+
+
+class _Collector:
+    """Stream sink that keeps the whole body."""
+
+    def __init__(self) -> None:
+        self.chunks: list[bytes] = []
+
+    def feed(self, chunk: bytes) -> None:
+        self.chunks.append(chunk)
+
+    def close(self) -> bytes:
+        return b"".join(self.chunks)
+
+
+async def get_stream(
+    url: str,
+    sink: Callable[[], Any],
+    max_bytes: Optional[int] = None,
+    follow_redirects: bool = True,
+) -> Any:
+    """Stream the body of an absolute URL into a sink as it arrives.
+
+    ``sink()`` creates an object with ``feed(chunk)``, called for each body
+    chunk, and ``close()``, whose result is returned once the body is
+    complete.  Every attempt starts over with a new sink, and an exception
+    raised by ``feed`` abandons the download.  Oversized responses are
+    abandoned as soon as they exceed ``max_bytes``.  Callers that only
+    trust ``url``'s host pass ``follow_redirects=False``, which makes a
+    redirect an error.
+
+    Raises
+    ------
+    ValueError
+        If the body is larger than ``max_bytes``.
+    httpx.HTTPStatusError
+        If the response status is not 2xx (after redirects, when followed).
+    httpx.RequestError
+        If there is a network failure.
+    DeadlineExceeded
+        If the tool call's deadline expires first.
+    """
+    client = get_client()
+
+    async def attempt(timeout: float) -> Any:
+        consumer = sink()
+        async with client.stream(
+            "GET", url, follow_redirects=follow_redirects, timeout=timeout
+        ) as response:
+            response.raise_for_status()
+            size = 0
+            async for chunk in response.aiter_bytes():
+                size += len(chunk)
+                if max_bytes is not None and size > max_bytes:
+                    raise ValueError(f"response from {url} exceeds {max_bytes} bytes")
+                consumer.feed(chunk)
+        return consumer.close()
+
+    return await _send(attempt, url)
+
+
+async def get_bytes(
+    url: str, max_bytes: Optional[int] = None, follow_redirects: bool = True
+) -> bytes:
+    """Download an absolute URL through the pooled client.
+
+    Used for resources that live outside the API, such as add-in icons.
+    See :func:`get_stream` for the arguments and exceptions.
+    """
+    return await get_stream(url, _Collector, max_bytes, follow_redirects)
@@ -0,0 +1,25 @@
+"""
+Office Add‑ins MCP Web Package
+==============================
+
+This package contains the ASGI components used by the Starlette deployment
+in app.py.
+"""
+
+from office_addins_mcp_server.web.admin import admin_routes
+from office_addins_mcp_server.web.admission import (
+    AdmissionController,
+    AdmissionMiddleware,
+)
+from office_addins_mcp_server.web.compression import CompressionMiddleware
+from office_addins_mcp_server.web.endpoints import metrics_endpoint
+from office_addins_mcp_server.web.icons import icon_endpoint
+
+__all__ = [
+    "AdmissionController",
+    "AdmissionMiddleware",
+    "CompressionMiddleware",
+    "admin_routes",
+    "icon_endpoint",
+    "metrics_endpoint",
+]
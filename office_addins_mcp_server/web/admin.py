@@ -0,0 +1,110 @@
+"""
+Admin Diagnostics Endpoints
+===========================
+
+Token-protected diagnostics for the Starlette deployment, mounted at
+``/admin``:
+
+- ``GET /admin/profile?seconds=10&interval=0.005``: sample the event loop
+  for a window and return folded stacks (``text/plain``) ready for
+  flamegraph.pl, speedscope or inferno;
+- ``GET /admin/tasks``: the asyncio task dump as JSON;
+- ``GET /admin/memory?seconds=10&top=25&frames=1``: the top allocation sites
+  over a window as JSON;
+- ``GET /admin/budget``: the memory budget, with the approximate usage and
+  evictions of each cache and the process resident set size, as JSON.
+
+The routes only exist when an admin token is configured, and every request
+must send it as ``Authorization: Bearer <token>``.  Only one profiling
+window runs at a time; a concurrent request gets ``409``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hmac
+from typing import Awaitable, Callable
+
+from starlette.requests import Request
+from starlette.responses import JSONResponse, PlainTextResponse, Response
+from starlette.routing import Route
+
+from office_addins_mcp_server.memory_budget import memory_budget
+from office_addins_mcp_server.profiling import (
+    DEFAULT_SAMPLE_INTERVAL,
+    dump_tasks,
+    profile_event_loop,
+    trace_allocations,
+)
+
+
+# Longest profiling window a request may ask for, in seconds.
+MAX_PROFILE_SECONDS = 120.0
+
+Endpoint = Callable[[Request], Awaitable[Response]]
+
+
+def _float_param(request: Request, name: str, default: float, low: float, high: float) -> float:
+    raw = request.query_params.get(name)
+    if raw is None:
+        return default
+    value = float(raw)
+    if not low <= value <= high:
+        raise ValueError(f"{name} must be between {low:g} and {high:g}")
+    return value
+
+
+def admin_routes(token: str) -> list[Route]:
+    """Return the diagnostics routes, guarded by ``token``."""
+    window = asyncio.Lock()
+
+    def guarded(endpoint: Endpoint, exclusive: bool = False) -> Endpoint:
+        async def handler(request: Request) -> Response:
+            scheme, _, supplied = request.headers.get("authorization", "").partition(" ")
+            if scheme.lower() != "bearer" or not hmac.compare_digest(
+                supplied.encode(), token.encode()
+            ):
+                return JSONResponse({"error": "unauthorized"}, status_code=401)
+            if exclusive and window.locked():
+                return JSONResponse({"error": "a profiling window is already running"}, status_code=409)
+            try:
+                if exclusive:
+                    async with window:
+                        return await endpoint(request)
+                return await endpoint(request)
+            except ValueError as exc:
+                return JSONResponse({"error": str(exc)}, status_code=400)
+
+        return handler
+
+    async def profile(request: Request) -> Response:
+        seconds = _float_param(request, "seconds", 10.0, 0.1, MAX_PROFILE_SECONDS)
+        interval = _float_param(request, "interval", DEFAULT_SAMPLE_INTERVAL, 0.001, 1.0)
+        sampler = await profile_event_loop(seconds, interval)
+        return PlainTextResponse(
+            sampler.folded(),
+            headers={
+                "X-Profile-Samples": str(sum(sampler.samples.values())),
+                "X-Profile-Seconds": f"{sampler.duration:.3f}",
+            },
+        )
+
+    async def tasks(request: Request) -> Response:
+        values = dump_tasks()
+        return JSONResponse({"TotalCount": len(values), "Values": values})
+
+    async def memory(request: Request) -> Response:
+        seconds = _float_param(request, "seconds", 10.0, 0.1, MAX_PROFILE_SECONDS)
+        top = int(_float_param(request, "top", 25, 1, 500))
+        frames = int(_float_param(request, "frames", 1, 1, 32))
+        return JSONResponse(await trace_allocations(seconds, top=top, frames=frames))
+
+    async def budget(request: Request) -> Response:
+        return JSONResponse(memory_budget.snapshot())
+
+    return [
+        Route("/profile", guarded(profile, exclusive=True)),
+        Route("/tasks", guarded(tasks)),
+        Route("/memory", guarded(memory, exclusive=True)),
+        Route("/budget", guarded(budget)),
+    ]
@@ -0,0 +1,333 @@
+"""
+Admission Control
+=================
+
+ASGI middleware that bounds the number of MCP tool calls executing at once.
+
+Only JSON-RPC ``tools/call`` requests are subject to admission; session
+setup, listings and notifications always pass so that clients can keep
+their sessions alive under load.  A tool call is admitted when
+
+- its MCP session and its client IP are below their own concurrency
+  limits (checked without waiting), and
+- a global execution slot is free, or becomes free within the queue
+  timeout while the bounded wait queue has room.
+
+Otherwise it fails fast with a JSON-RPC error marked as retryable, plus a
+``Retry-After`` header.  Time spent queued, by admitted calls and by those
+that timed out in the queue, is recorded in the
+``addins_admission_queue_seconds`` histogram.
+
+The JSON-RPC method is read from the request body, which is buffered for
+that purpose; bodies larger than :data:`MAX_INSPECTED_BODY` are rejected
+with ``413`` before they are read in full.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import time
+from typing import Optional
+
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from office_addins_mcp_server.metrics import registry
+
+
+# JSON-RPC error code returned when a tool call is shed (implementation
+# defined server error range).
+OVERLOADED_ERROR_CODE = -32001
+
+# Largest POST body buffered to find the JSON-RPC method.  MCP requests are
+# small; anything larger is rejected.
+MAX_INSPECTED_BODY = 64 * 1024
+
+queue_seconds = registry.histogram(
+    "addins_admission_queue_seconds",
+    "Time tool calls spent waiting for an execution slot.",
+)
+rejected_total = registry.counter(
+    "addins_admission_rejected_total",
+    "Tool calls rejected by admission control.",
+    labelnames=("reason",),
+)
+executing = registry.gauge(
+    "addins_admission_executing", "Tool calls currently executing."
+)
+queued = registry.gauge(
+    "addins_admission_queued", "Tool calls currently waiting for a slot."
+)
+
+
+class Overloaded(Exception):
+    """A tool call could not be admitted."""
+
+    def __init__(self, reason: str, retry_after: float) -> None:
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """Concurrency limits and a bounded wait queue for tool executions.
+
+    Parameters
+    ----------
+    max_concurrent : int
+        Tool calls executing at once across the process.
+    max_queue : int
+        Tool calls allowed to wait for a slot; further calls are rejected.
+    queue_timeout : float
+        Seconds a call may wait for a slot before it is rejected.
+    per_session : int
+        Tool calls executing or queued per MCP session.
+    per_client : int
+        Tool calls executing or queued per client IP.
+    """
+
+    def __init__(
+        self,
+        max_concurrent: int = 16,
+        max_queue: int = 64,
+        queue_timeout: float = 5.0,
+        per_session: int = 4,
+        per_client: int = 8,
+    ) -> None:
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.per_session = per_session
+        self.per_client = per_client
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._executing = 0
+        self._waiting = 0
+        self._sessions: dict[str, int] = {}
+        self._clients: dict[str, int] = {}
+
+    @property
+    def executing(self) -> int:
+        return self._executing
+
+    @property
+    def waiting(self) -> int:
+        return self._waiting
+
+    async def acquire(self, session_id: Optional[str], client_ip: Optional[str]) -> None:
+        """Wait for admission or raise :class:`Overloaded`."""
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_concurrent)
+        if session_id and self._sessions.get(session_id, 0) >= self.per_session:
+            raise Overloaded("session_limit", 1.0)
+        if client_ip and self._clients.get(client_ip, 0) >= self.per_client:
+            raise Overloaded("client_limit", 1.0)
+
+        started = time.monotonic()
+        if self._slots.locked():
+            if self._waiting >= self.max_queue:
+                raise Overloaded("queue_full", self.queue_timeout)
+            self._waiting += 1
+            queued.inc()
+            self._track(session_id, client_ip, 1)
+            try:
+                await asyncio.wait_for(self._slots.acquire(), self.queue_timeout)
+            except asyncio.TimeoutError:
+                self._track(session_id, client_ip, -1)
+                queue_seconds.observe(time.monotonic() - started)
+                raise Overloaded("queue_timeout", self.queue_timeout) from None
+            except BaseException:
+                self._track(session_id, client_ip, -1)
+                raise
+            finally:
+                self._waiting -= 1
+                queued.dec()
+        else:
+            await self._slots.acquire()
+            self._track(session_id, client_ip, 1)
+        queue_seconds.observe(time.monotonic() - started)
+        self._executing += 1
+        executing.inc()
+
+    def release(self, session_id: Optional[str], client_ip: Optional[str]) -> None:
+        """Return the slot taken by a successful :meth:`acquire`."""
+        self._executing -= 1
+        executing.dec()
+        self._track(session_id, client_ip, -1)
+        self._slots.release()
+
+    def _track(self, session_id: Optional[str], client_ip: Optional[str], delta: int) -> None:
+        for key, counts in ((session_id, self._sessions), (client_ip, self._clients)):
+            if not key:
+                continue
+            value = counts.get(key, 0) + delta
+            if value > 0:
+                counts[key] = value
+            else:
+                counts.pop(key, None)
+
+
+class AdmissionMiddleware:
+    """Apply an :class:`AdmissionController` to MCP ``tools/call`` requests.
+
+    Parameters
+    ----------
+    app : ASGIApp
+        The MCP streamable HTTP application.
+    controller : AdmissionController
+        The limits to enforce.
+    trusted_proxies : int
+        Number of reverse proxies in front of the application that append
+        the address they received the request from to ``X-Forwarded-For``
+        (``1`` behind the Azure App Service front ends).  The client IP is
+        then the entry that many positions from the right; entries further
+        left are written by the client and ignored.  With ``0`` the header
+        is ignored and the socket peer is used.
+    max_body_size : int
+        Largest POST body accepted, in bytes.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        controller: AdmissionController,
+        trusted_proxies: int = 0,
+        max_body_size: int = MAX_INSPECTED_BODY,
+    ) -> None:
+        if trusted_proxies < 0:
+            raise ValueError("trusted_proxies must not be negative")
+        self.app = app
+        self.controller = controller
+        self.trusted_proxies = trusted_proxies
+        self.max_body_size = max_body_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope.get("method") != "POST":
+            await self.app(scope, receive, send)
+            return
+
+        headers = Headers(scope=scope)
+        declared = headers.get("content-length", "")
+        if declared.isdigit() and int(declared) > self.max_body_size:
+            await _send_too_large(send)
+            return
+
+        # Buffer the (small) JSON-RPC body to see which method is called,
+        # then replay it to the application.
+        messages: list[Message] = []
+        chunks: list[bytes] = []
+        size = 0
+        while True:
+            message = await receive()
+            messages.append(message)
+            if message["type"] != "http.request":
+                break
+            chunk = message.get("body", b"")
+            size += len(chunk)
+            if size > self.max_body_size:
+                await _send_too_large(send)
+                return
+            chunks.append(chunk)
+            if not message.get("more_body", False):
+                break
+        body = b"".join(chunks)
+
+        async def replay() -> Message:
+            if messages:
+                return messages.pop(0)
+            return await receive()
+
+        request = _parse_jsonrpc(body)
+        if request is None or request.get("method") != "tools/call":
+            await self.app(scope, replay, send)
+            return
+
+        session_id = headers.get("mcp-session-id")
+        client_ip = self._client_ip(scope, headers)
+        try:
+            await self.controller.acquire(session_id, client_ip)
+        except Overloaded as exc:
+            rejected_total.inc(reason=exc.reason)
+            await _send_overloaded(send, request.get("id"), exc)
+            return
+        try:
+            await self.app(scope, replay, send)
+        finally:
+            self.controller.release(session_id, client_ip)
+
+    def _client_ip(self, scope: Scope, headers: Headers) -> Optional[str]:
+        if self.trusted_proxies:
+            entries = [
+                entry.strip()
+                for value in headers.getlist("x-forwarded-for")
+                for entry in value.split(",")
+                if entry.strip()
+            ]
+            if entries:
+                # Fewer entries than proxies means the header was not set by
+                # our proxies alone; the left-most is the best we know.
+                return _strip_port(entries[-min(self.trusted_proxies, len(entries))])
+        client = scope.get("client")
+        return client[0] if client else None
+
+
+def _strip_port(address: str) -> str:
+    """Drop the port App Service appends ("203.0.113.7:51234", "[::1]:80")."""
+    if address.startswith("["):
+        return address[1:].split("]", 1)[0]
+    if address.count(":") == 1:
+        return address.split(":", 1)[0]
+    return address
+
+
+def _parse_jsonrpc(body: bytes) -> Optional[dict]:
+    try:
+        request = json.loads(body)
+    except ValueError:
+        return None
+    return request if isinstance(request, dict) else None
+
+
+async def _send_too_large(send: Send) -> None:
+    rejected_total.inc(reason="body_too_large")
+    body = json.dumps({"error": "request body too large"}).encode()
+    await send(
+        {
+            "type": "http.response.start",
+            "status": 413,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+            ],
+        }
+    )
+    await send({"type": "http.response.body", "body": body})
+
+
+async def _send_overloaded(send: Send, request_id, exc: Overloaded) -> None:
+    payload = {
+        "jsonrpc": "2.0",
+        "id": request_id,
+        "error": {
+            "code": OVERLOADED_ERROR_CODE,
+            "message": "Server is overloaded; retry the request later",
+            "data": {
+                "retryable": True,
+                "reason": exc.reason,
+                "retryAfterMs": int(exc.retry_after * 1000),
+            },
+        },
+    }
+    body = json.dumps(payload).encode()
+    await send(
+        {
+            "type": "http.response.start",
+            "status": 200,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(max(1, round(exc.retry_after))).encode()),
+            ],
+        }
+    )
+    await send({"type": "http.response.body", "body": body})
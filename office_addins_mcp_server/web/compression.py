@@ -0,0 +1,242 @@
+"""
+Response Compression
+====================
+
+ASGI middleware that compresses HTTP responses with brotli or gzip,
+negotiated from the request's ``Accept-Encoding`` header.
+
+Unlike Starlette's ``GZipMiddleware``, server-sent event streams are
+compressed too: every chunk written by the application is flushed through
+the compressor immediately (``Z_SYNC_FLUSH`` for gzip, ``flush()`` for
+brotli), so each MCP event still reaches the client as soon as it is sent.
+Event streams are compressed whatever the size of their first event: an
+MCP stream often opens with a small progress notification and ends with a
+large result.
+
+Brotli support requires the optional ``brotli`` package; without it only
+gzip is offered.
+"""
+
+from __future__ import annotations
+
+import zlib
+from typing import Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - depends on the environment
+    brotli = None
+
+
+# Content types worth compressing.  Images and other binary formats are
+# already compressed.
+COMPRESSIBLE_CONTENT_TYPES = (
+    "application/json",
+    "text/",
+    "application/javascript",
+    "application/xml",
+    "image/svg+xml",
+)
+
+
+def supported_encodings() -> tuple[str, ...]:
+    """Return the encodings this process can produce, in preference order."""
+    return ("br", "gzip") if brotli is not None else ("gzip",)
+
+
+def negotiate_encoding(accept_encoding: str) -> Optional[str]:
+    """Pick the best supported encoding allowed by an ``Accept-Encoding`` value.
+
+    Returns ``None`` when the client accepts neither brotli nor gzip.
+    """
+    weights: dict[str, float] = {}
+    for item in accept_encoding.split(","):
+        name, _, params = item.strip().partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        weight = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                weight = float(params[2:])
+            except ValueError:
+                weight = 0.0
+        weights[name] = weight
+
+    best: Optional[str] = None
+    best_weight = 0.0
+    for encoding in supported_encodings():
+        weight = weights.get(encoding, weights.get("*", 0.0))
+        if weight > best_weight:
+            best, best_weight = encoding, weight
+    return best
+
+
+class _Compressor:
+    """Incremental compressor with a uniform flush/finish interface."""
+
+    def __init__(self, encoding: str, gzip_level: int, brotli_quality: int) -> None:
+        self.encoding = encoding
+        if encoding == "br":
+            self._brotli = brotli.Compressor(quality=brotli_quality)
+        else:
+            # wbits 16 + MAX_WBITS produces a gzip container.
+            self._zlib = zlib.compressobj(gzip_level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def flush(self, data: bytes) -> bytes:
+        """Compress ``data`` and flush it so the client can decode it now."""
+        if self.encoding == "br":
+            return self._brotli.process(data) + self._brotli.flush()
+        return self._zlib.compress(data) + self._zlib.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self, data: bytes = b"") -> bytes:
+        """Compress ``data`` and terminate the stream."""
+        if self.encoding == "br":
+            return self._brotli.process(data) + self._brotli.finish()
+        return self._zlib.compress(data) + self._zlib.flush()
+
+
+class CompressionMiddleware:
+    """Compress responses with brotli or gzip.
+
+    Parameters
+    ----------
+    app : ASGIApp
+        The application to wrap.
+    minimum_size : int
+        Responses whose complete body, or whose first streamed chunk, is
+        smaller than this many bytes are sent uncompressed.  Does not apply
+        to ``text/event-stream`` responses.
+    gzip_level : int
+        zlib compression level for gzip.
+    brotli_quality : int
+        Brotli quality (0-11).  The default favours speed, which matters for
+        per-event flushing of streams.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1024,
+        gzip_level: int = 6,
+        brotli_quality: int = 4,
+    ) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope.get("method") == "HEAD":
+            await self.app(scope, receive, send)
+            return
+        encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        responder = _CompressingResponder(self, encoding, send)
+        await self.app(scope, receive, responder.send)
+
+
+class _CompressingResponder:
+    """Per-response state of :class:`CompressionMiddleware`."""
+
+    def __init__(self, middleware: CompressionMiddleware, encoding: str, send: Send) -> None:
+        self.middleware = middleware
+        self.encoding = encoding
+        self.downstream = send
+        self.start: Optional[Message] = None
+        self.pending = b""
+        self.decided = False
+        self.compressor: Optional[_Compressor] = None
+
+    async def send(self, message: Message) -> None:
+        message_type = message["type"]
+        if message_type == "http.response.start":
+            headers = MutableHeaders(raw=message["headers"])
+            if headers.get("content-type", "").startswith("text/event-stream"):
+                # Events must reach the client as they are produced, so the
+                # headers go out at once and every event is flushed.
+                self.decided = True
+                if self._compressible(message, headers):
+                    self._start_compressing(headers)
+                    del headers["Content-Length"]
+                await self.downstream(message)
+                return
+            # Hold the headers back until the first body chunk shows whether
+            # the response should be compressed.
+            self.start = message
+            return
+        if message_type != "http.response.body" or self.decided:
+            await self._forward(message)
+            return
+
+        body = self.pending + message.get("body", b"")
+        more_body = message.get("more_body", False)
+        if not body and more_body:
+            # Nothing to judge the response by yet.
+            return
+        self.pending = b""
+        self.decided = True
+
+        headers = MutableHeaders(raw=self.start["headers"])
+        if not self._compressible(self.start, headers) or len(body) < self.middleware.minimum_size:
+            await self.downstream(self.start)
+            await self.downstream({**message, "body": body})
+            return
+
+        self._start_compressing(headers)
+        if more_body:
+            # Streaming responses: the final length is unknown, so fall back
+            # to chunked transfer.
+            del headers["Content-Length"]
+            compressed = self.compressor.flush(body)
+        else:
+            compressed = self.compressor.finish(body)
+            headers["Content-Length"] = str(len(compressed))
+        await self.downstream(self.start)
+        await self.downstream(
+            {"type": "http.response.body", "body": compressed, "more_body": more_body}
+        )
+
+    @staticmethod
+    def _compressible(start: Message, headers: MutableHeaders) -> bool:
+        return (
+            "content-encoding" not in headers
+            and start.get("status", 200) not in (204, 304)
+            and headers.get("content-type", "").startswith(COMPRESSIBLE_CONTENT_TYPES)
+        )
+
+    def _start_compressing(self, headers: MutableHeaders) -> None:
+        self.compressor = _Compressor(
+            self.encoding, self.middleware.gzip_level, self.middleware.brotli_quality
+        )
+        headers["Content-Encoding"] = self.encoding
+        headers.add_vary_header("Accept-Encoding")
+        etag = headers.get("etag")
+        if etag and not etag.startswith("W/"):
+            # The encoded bytes differ from those the strong validator names.
+            headers["ETag"] = "W/" + etag
+
+    async def _forward(self, message: Message) -> None:
+        if self.start is not None and not self.decided:
+            # A non-body message (e.g. trailers) arrived before any body.
+            self.decided = True
+            await self.downstream(self.start)
+        if self.compressor is None or message["type"] != "http.response.body":
+            await self.downstream(message)
+            return
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        if more_body:
+            data = self.compressor.flush(body) if body else b""
+        else:
+            data = self.compressor.finish(body)
+        if data or not more_body:
+            await self.downstream(
+                {"type": "http.response.body", "body": data, "more_body": more_body}
+            )
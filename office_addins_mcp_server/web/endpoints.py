@@ -0,0 +1,20 @@
+"""
+Operational Endpoints
+=====================
+
+Starlette endpoints served next to the MCP mount.
+"""
+
+from __future__ import annotations
+
+from starlette.requests import Request
+from starlette.responses import PlainTextResponse
+
+from office_addins_mcp_server.metrics import registry
+
+
+async def metrics_endpoint(request: Request) -> PlainTextResponse:
+    """Expose the metrics registry in the Prometheus text format."""
+    return PlainTextResponse(
+        registry.render(), media_type="text/plain; version=0.0.4"
+    )
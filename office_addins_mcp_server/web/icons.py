@@ -0,0 +1,395 @@
+"""
+Add-in Icon Proxy
+=================
+
+``GET /icons/{asset_id}`` serves an add-in's icon (the record's ``IconUrl``
+on ``store-images.s-microsoft.com``) so web clients rendering result lists
+do not each fetch and get throttled by the store's image host:
+
+- icons are downloaded once through the pooled upstream client and kept on
+  disk, bounded to :data:`ICON_CACHE_MAX_BYTES` with least recently used
+  eviction, and refreshed after :data:`ICON_TTL` seconds (a stale copy is
+  still served if the refresh fails);
+- ``?size=N`` returns a thumbnail no larger than ``N`` x ``N`` pixels, for
+  ``N`` in :data:`THUMBNAIL_SIZES`.  Thumbnails need the optional
+  ``Pillow`` package; without it, or for formats it cannot scale (SVG), the
+  original icon is served;
+- responses carry a strong ``ETag`` derived from the bytes and a public
+  ``Cache-Control``, and ``If-None-Match`` revalidations are answered with
+  ``304``, so browsers and CDNs absorb repeat loads.
+
+Only ``https`` URLs on :data:`ICON_HOSTS` are fetched, without following
+redirects (which could lead off those hosts), and only bodies that look like
+images are served.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import io
+import logging
+import os
+import struct
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Awaitable, Callable, NamedTuple, Optional
+from urllib.parse import urlsplit
+
+import httpx
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+
+from office_addins_mcp_server.metrics import registry
+from office_addins_mcp_server.tools import upstream
+from office_addins_mcp_server.tools.addin_tools import get_addin_details
+from office_addins_mcp_server.tools.asset_ids import AssetIdRejected, check_asset_id
+from office_addins_mcp_server.tools.catalog import catalog
+
+try:
+    from PIL import Image
+except ImportError:  # pragma: no cover - depends on the environment
+    Image = None
+
+
+logger = logging.getLogger("office-addins-mcp.icons")
+
+ICON_CACHE_DIR = os.getenv(
+    "ADDINS_ICON_CACHE_DIR", os.path.join(tempfile.gettempdir(), "office-addins-icons")
+)
+
+# Total size of the cached icon files, in bytes.
+ICON_CACHE_MAX_BYTES = int(os.getenv("ADDINS_ICON_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+
+# Seconds before a cached icon is downloaded again.
+ICON_TTL = float(os.getenv("ADDINS_ICON_TTL", "86400"))
+
+# max-age sent to browsers and CDNs, in seconds.
+ICON_MAX_AGE = int(os.getenv("ADDINS_ICON_MAX_AGE", "86400"))
+
+ICON_HOSTS = frozenset(
+    host.strip().lower()
+    for host in os.getenv("ADDINS_ICON_HOSTS", "store-images.s-microsoft.com").split(",")
+    if host.strip()
+)
+
+# Icons larger than this are not proxied.
+MAX_ICON_BYTES = 2 * 1024 * 1024
+
+THUMBNAIL_SIZES = (16, 32, 48, 64, 80, 96, 128, 256)
+
+icon_requests_total = registry.counter(
+    "addins_icon_requests_total",
+    "Icon proxy requests, by outcome.",
+    labelnames=("result",),
+)
+
+
+class Icon(NamedTuple):
+    """An icon's bytes with the metadata it is served with."""
+
+    body: bytes
+    content_type: str
+    fetched_at: float
+
+    @property
+    def etag(self) -> str:
+        return '"' + hashlib.sha256(self.body).hexdigest()[:32] + '"'
+
+
+_SIGNATURES = (
+    (b"\x89PNG\r\n\x1a\n", "image/png"),
+    (b"\xff\xd8\xff", "image/jpeg"),
+    (b"GIF87a", "image/gif"),
+    (b"GIF89a", "image/gif"),
+    (b"\x00\x00\x01\x00", "image/x-icon"),
+    (b"BM", "image/bmp"),
+)
+
+
+def sniff_image_type(body: bytes) -> Optional[str]:
+    """Return the image media type of ``body``, or ``None`` if it is not an image."""
+    for signature, content_type in _SIGNATURES:
+        if body.startswith(signature):
+            return content_type
+    if body[:4] == b"RIFF" and body[8:12] == b"WEBP":
+        return "image/webp"
+    head = body[:512].lstrip().lower()
+    if head.startswith(b"<svg") or (head.startswith(b"<?xml") and b"<svg" in head):
+        return "image/svg+xml"
+    return None
+
+
+class IconCache:
+    """Icons on disk, bounded in total size with LRU eviction.
+
+    One file per key holds the fetch time, the media type and the bytes,
+    and is replaced atomically.  Recency is tracked in memory and mirrored
+    to file modification times, so the eviction order survives restarts.
+    Concurrent misses on the same key share one fetch.
+
+    Parameters
+    ----------
+    directory : str or Path
+        Cache directory, created if needed.
+    max_bytes : int
+        Total size of the cached files kept.
+    ttl : float
+        Seconds before an entry is fetched again.
+    """
+
+    _HEADER = struct.Struct(">dH")
+
+    def __init__(
+        self,
+        directory: str | Path,
+        max_bytes: int = ICON_CACHE_MAX_BYTES,
+        ttl: float = ICON_TTL,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._clock = clock
+        self._sizes: Optional[OrderedDict[str, int]] = None
+        self._lock = threading.Lock()
+        self._inflight: dict[str, asyncio.Future] = {}
+
+    @property
+    def size(self) -> int:
+        """Total bytes of the cached files."""
+        with self._lock:
+            return sum(self._index().values())
+
+    def _index(self) -> OrderedDict[str, int]:
+        # Called with the lock held.
+        if self._sizes is None:
+            entries = []
+            if self.directory.is_dir():
+                for path in self.directory.iterdir():
+                    if path.name.startswith("."):
+                        continue
+                    try:
+                        stat = path.stat()
+                    except OSError:
+                        continue
+                    entries.append((stat.st_mtime, path.name, stat.st_size))
+            entries.sort()
+            self._sizes = OrderedDict((name, size) for _, name, size in entries)
+        return self._sizes
+
+    def _path(self, key: str) -> Path:
+        return self.directory / hashlib.sha256(key.encode()).hexdigest()
+
+    def read(self, key: str) -> Optional[Icon]:
+        """Return the cached icon for ``key``, fresh or not, marking it recently used."""
+        path = self._path(key)
+        try:
+            data = path.read_bytes()
+            fetched_at, type_length = self._HEADER.unpack_from(data)
+        except (OSError, struct.error):
+            return None
+        offset = self._HEADER.size + type_length
+        content_type = data[self._HEADER.size:offset].decode("ascii", "replace")
+        with self._lock:
+            index = self._index()
+            index[path.name] = len(data)
+            index.move_to_end(path.name)
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return Icon(data[offset:], content_type, fetched_at)
+
+    def write(self, key: str, icon: Icon) -> None:
+        """Store ``icon`` under ``key`` and evict least recently used entries."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        content_type = icon.content_type.encode("ascii")
+        data = self._HEADER.pack(icon.fetched_at, len(content_type)) + content_type + icon.body
+        path = self._path(key)
+        fd, tmp = tempfile.mkstemp(dir=self.directory, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as handle:
+                handle.write(data)
+            os.replace(tmp, path)
+        except BaseException:
+            Path(tmp).unlink(missing_ok=True)
+            raise
+        with self._lock:
+            index = self._index()
+            index[path.name] = len(data)
+            index.move_to_end(path.name)
+            total = sum(index.values())
+            victims = []
+            while total > self.max_bytes and len(index) > 1:
+                name, size = index.popitem(last=False)
+                victims.append(name)
+                total -= size
+        for name in victims:
+            (self.directory / name).unlink(missing_ok=True)
+
+    def clear(self) -> None:
+        """Remove every cached icon."""
+        with self._lock:
+            names = list(self._index())
+            self._sizes = OrderedDict()
+        for name in names:
+            (self.directory / name).unlink(missing_ok=True)
+
+    async def get_or_fetch(self, key: str, fetch: Callable[[], Awaitable[Icon]]) -> tuple[Icon, str]:
+        """Return ``(icon, result)`` for ``key``, calling ``fetch`` when missing or stale.
+
+        ``result`` is ``"hit"``, ``"miss"`` or ``"stale"`` (a stale copy
+        served because the refresh failed).
+        """
+        cached = await asyncio.to_thread(self.read, key)
+        if cached is not None and self._clock() - cached.fetched_at < self.ttl:
+            return cached, "hit"
+
+        pending = self._inflight.get(key)
+        if pending is None:
+            pending = asyncio.ensure_future(fetch())
+            self._inflight[key] = pending
+            pending.add_done_callback(lambda _: self._inflight.pop(key, None))
+            owner = True
+        else:
+            owner = False
+        try:
+            icon = await asyncio.shield(pending)
+        except Exception:
+            if cached is None:
+                raise
+            logger.warning("Serving a stale icon for %s", key, exc_info=True)
+            return cached, "stale"
+        if owner:
+            await asyncio.to_thread(self.write, key, icon)
+        return icon, "miss"
+
+
+icon_cache = IconCache(ICON_CACHE_DIR)
+
+
+class IconUnavailable(Exception):
+    """The add-in has no icon that may be proxied."""
+
+
+async def _icon_url(asset_id: str) -> str:
+    record = catalog.get(asset_id)
+    url = (record or {}).get("IconUrl")
+    if not url:
+        details = await get_addin_details(asset_id)
+        url = (details.get("Value") or {}).get("IconUrl")
+    if not url:
+        raise IconUnavailable(f"add-in {asset_id} has no icon")
+    parts = urlsplit(url)
+    if parts.scheme != "https" or (parts.hostname or "").lower() not in ICON_HOSTS:
+        raise IconUnavailable(f"icon host of {asset_id} is not allowed: {parts.hostname}")
+    return url
+
+
+async def fetch_icon(asset_id: str) -> Icon:
+    """Download the icon of ``asset_id``.
+
+    Raises
+    ------
+    IconUnavailable
+        If the add-in has no icon on an allowed host.
+    ValueError
+        If the body is too large or not an image.
+    """
+    url = await _icon_url(asset_id)
+    # A redirect could leave ICON_HOSTS, so it is an upstream error instead.
+    body = await upstream.get_bytes(url, max_bytes=MAX_ICON_BYTES, follow_redirects=False)
+    content_type = sniff_image_type(body)
+    if content_type is None:
+        raise ValueError(f"icon of {asset_id} at {url} is not an image")
+    return Icon(body, content_type, time.time())
+
+
+def make_thumbnail(icon: Icon, size: int) -> Icon:
+    """Return ``icon`` scaled down to fit ``size`` x ``size`` pixels.
+
+    The icon is returned unchanged when Pillow is not installed, the format
+    cannot be decoded, or it already fits.
+    """
+    if Image is None or icon.content_type == "image/svg+xml":
+        return icon
+    try:
+        with Image.open(io.BytesIO(icon.body)) as image:
+            if image.width <= size and image.height <= size:
+                return icon
+            image.thumbnail((size, size), Image.LANCZOS)
+            if image.mode not in ("RGB", "RGBA", "L", "LA"):
+                image = image.convert("RGBA")
+            output = io.BytesIO()
+            image.save(output, format="PNG", optimize=True)
+    except Exception:
+        logger.debug("Cannot scale a %s icon", icon.content_type, exc_info=True)
+        return icon
+    return Icon(output.getvalue(), "image/png", icon.fetched_at)
+
+
+def _not_modified(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    # Weak comparison: compression may have weakened the ETag we sent.
+    candidates = {tag.strip().removeprefix("W/") for tag in header.split(",")}
+    return "*" in candidates or etag in candidates
+
+
+async def icon_endpoint(request: Request) -> Response:
+    """Serve the icon, or a thumbnail of it, for the asset ID in the path."""
+    try:
+        asset_id = check_asset_id(request.path_params["asset_id"])
+    except AssetIdRejected as exc:
+        icon_requests_total.inc(result="not_found")
+        return JSONResponse({"error": exc.reason}, status_code=404)
+    raw_size = request.query_params.get("size")
+    size = None
+    if raw_size is not None:
+        if not raw_size.isdigit() or int(raw_size) not in THUMBNAIL_SIZES:
+            icon_requests_total.inc(result="bad_request")
+            return JSONResponse(
+                {"error": f"size must be one of {list(THUMBNAIL_SIZES)}"}, status_code=400
+            )
+        size = int(raw_size)
+
+    try:
+        icon, result = await icon_cache.get_or_fetch(asset_id, lambda: fetch_icon(asset_id))
+        if size is not None:
+
+            async def scale() -> Icon:
+                return await asyncio.to_thread(make_thumbnail, icon, size)
+
+            # Thumbnails keep their source's fetch time, so they expire with it.
+            icon, _ = await icon_cache.get_or_fetch(f"{asset_id}@{size}", scale)
+    except (IconUnavailable, AssetIdRejected) as exc:
+        icon_requests_total.inc(result="not_found")
+        return JSONResponse({"error": str(exc)}, status_code=404)
+    except httpx.HTTPStatusError as exc:
+        if exc.response.status_code == 404:
+            icon_requests_total.inc(result="not_found")
+            return JSONResponse({"error": f"add-in {asset_id} not found"}, status_code=404)
+        icon_requests_total.inc(result="error")
+        return JSONResponse({"error": f"upstream error: {exc}"}, status_code=502)
+    except (httpx.RequestError, TimeoutError, ValueError) as exc:
+        icon_requests_total.inc(result="error")
+        return JSONResponse({"error": f"upstream error: {exc}"}, status_code=502)
+
+    headers = {
+        "ETag": icon.etag,
+        "Cache-Control": f"public, max-age={ICON_MAX_AGE}, stale-while-revalidate={ICON_MAX_AGE}",
+        "X-Content-Type-Options": "nosniff",
+    }
+    if icon.content_type == "image/svg+xml":
+        # Opened directly, an SVG must not run scripts in our origin.
+        headers["Content-Security-Policy"] = "default-src 'none'; style-src 'unsafe-inline'"
+    if _not_modified(request, icon.etag):
+        icon_requests_total.inc(result="not_modified")
+        return Response(status_code=304, headers=headers)
+    icon_requests_total.inc(result=result)
+    return Response(icon.body, media_type=icon.content_type, headers=headers)
@@ -0,0 +1,57 @@
+"""
+Shared fixtures for the Office Add-ins MCP test suite.
+"""
+
+from __future__ import annotations
+
+import pytest
+
+from office_addins_mcp_server import structured_output
+from office_addins_mcp_server.resources import subscriptions
+from office_addins_mcp_server.tools import upstream
+from office_addins_mcp_server.tools.addin_tools import (
+    details_cache,
+    page_cache,
+    search_cache,
+    snapshot_cache,
+)
+from office_addins_mcp_server.tools.asset_ids import known_ids, missing_ids
+from office_addins_mcp_server.tools.catalog import catalog
+from office_addins_mcp_server.tools.changelog import changelog
+from office_addins_mcp_server.tools.fuzzy_index import title_index
+from office_addins_mcp_server.tools.manifest import (
+    manifest_parse_cache,
+    manifest_url_cache,
+)
+from office_addins_mcp_server.tools.stats import columns_cache
+
+STORES = [
+    search_cache,
+    details_cache,
+    snapshot_cache,
+    page_cache,
+    manifest_url_cache,
+    manifest_parse_cache,
+    catalog,
+    changelog,
+    subscriptions,
+    missing_ids,
+    known_ids,
+    columns_cache,
+]
+
+
+@pytest.fixture(autouse=True)
+def reset_process_state(monkeypatch):
+    """Give every test an empty title index, catalog and caches."""
+    # Retry immediately so tests exercising transient failures stay fast.
+    monkeypatch.setattr(upstream, "RETRY_BACKOFF", 0.0)
+    # Every typed tool result is checked against its schema in tests.
+    monkeypatch.setattr(structured_output, "OUTPUT_VALIDATION", "strict")
+    title_index.clear()
+    for store in STORES:
+        store.clear()
+    yield
+    title_index.clear()
+    for store in STORES:
+        store.clear()
@@ -0,0 +1,183 @@
+"""
+Tests for admission control
+===========================
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+
+import httpx
+import pytest
+from starlette.datastructures import Headers
+from starlette.responses import JSONResponse
+
+from office_addins_mcp_server.web.admission import (
+    OVERLOADED_ERROR_CODE,
+    AdmissionController,
+    AdmissionMiddleware,
+    Overloaded,
+    queue_seconds,
+)
+
+
+@pytest.mark.asyncio
+async def test_bounded_queue_and_timeout():
+    controller = AdmissionController(max_concurrent=1, max_queue=1, queue_timeout=0.05)
+    await controller.acquire("s1", "10.0.0.1")
+
+    observed = queue_seconds.count()
+    waiter = asyncio.create_task(controller.acquire("s2", "10.0.0.2"))
+    await asyncio.sleep(0)
+    assert controller.waiting == 1
+    with pytest.raises(Overloaded) as full:
+        await controller.acquire("s3", "10.0.0.3")
+    assert full.value.reason == "queue_full"
+    with pytest.raises(Overloaded) as timed_out:
+        await waiter
+    assert timed_out.value.reason == "queue_timeout"
+    # Time spent queued before timing out is recorded too.
+    assert queue_seconds.count() == observed + 1
+
+    controller.release("s1", "10.0.0.1")
+    assert controller.executing == 0
+    await controller.acquire("s4", "10.0.0.4")
+
+
+@pytest.mark.asyncio
+async def test_queued_call_is_admitted_when_a_slot_frees():
+    controller = AdmissionController(max_concurrent=1, queue_timeout=1)
+    await controller.acquire(None, None)
+    observed = queue_seconds.count()
+
+    waiter = asyncio.create_task(controller.acquire(None, None))
+    await asyncio.sleep(0.02)
+    controller.release(None, None)
+    await waiter
+
+    assert controller.executing == 1
+    assert queue_seconds.count() == observed + 1
+
+
+@pytest.mark.asyncio
+async def test_per_session_and_per_client_limits():
+    controller = AdmissionController(per_session=1, per_client=2)
+    await controller.acquire("s1", "10.0.0.1")
+    with pytest.raises(Overloaded, match="session_limit"):
+        await controller.acquire("s1", "10.0.0.1")
+    await controller.acquire("s2", "10.0.0.1")
+    with pytest.raises(Overloaded, match="client_limit"):
+        await controller.acquire("s3", "10.0.0.1")
+
+    controller.release("s1", "10.0.0.1")
+    await controller.acquire("s1", "10.0.0.1")
+
+
+class TestMiddleware:
+    """Test suite for AdmissionMiddleware."""
+
+    @staticmethod
+    def _client(app) -> httpx.AsyncClient:
+        return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test")
+
+    @staticmethod
+    def _call(method: str, request_id: int = 1) -> dict:
+        return {"jsonrpc": "2.0", "id": request_id, "method": method, "params": {}}
+
+    @pytest.mark.asyncio
+    async def test_over_limit_tool_call_gets_retryable_error(self):
+        release = asyncio.Event()
+
+        async def mcp_app(scope, receive, send):
+            body = json.loads((await receive())["body"])
+            if body["method"] == "tools/call":
+                await release.wait()
+            await JSONResponse({"jsonrpc": "2.0", "id": body["id"], "result": {}})(scope, receive, send)
+
+        controller = AdmissionController(max_concurrent=1, max_queue=0)
+        app = AdmissionMiddleware(mcp_app, controller)
+        async with self._client(app) as client:
+            first = asyncio.create_task(client.post("/mcp", json=self._call("tools/call", 1)))
+            await asyncio.sleep(0.02)
+
+            shed = await client.post("/mcp", json=self._call("tools/call", 2))
+            listed = await client.post("/mcp", json=self._call("tools/list", 3))
+            release.set()
+            admitted = await first
+
+        assert shed.headers["retry-after"]
+        error = shed.json()["error"]
+        assert shed.json()["id"] == 2
+        assert error["code"] == OVERLOADED_ERROR_CODE
+        assert error["data"]["retryable"] is True
+        assert error["data"]["reason"] == "queue_full"
+        assert listed.json()["result"] == {}
+        assert admitted.json()["id"] == 1
+        assert controller.executing == 0
+
+    def test_forwarded_for_is_trusted_only_when_enabled(self):
+        scope = {"client": ("10.0.0.9", 1234)}
+        headers = Headers({"x-forwarded-for": "198.51.100.1, 203.0.113.7:51234"})
+        trusting = AdmissionMiddleware(None, AdmissionController(), trusted_proxies=1)
+        two_hops = AdmissionMiddleware(None, AdmissionController(), trusted_proxies=2)
+        direct = AdmissionMiddleware(None, AdmissionController())
+        assert trusting._client_ip(scope, headers) == "203.0.113.7"
+        assert two_hops._client_ip(scope, headers) == "198.51.100.1"
+        assert direct._client_ip(scope, headers) == "10.0.0.9"
+
+    @pytest.mark.asyncio
+    async def test_spoofed_forwarded_for_entries_share_the_client_bucket(self):
+        release = asyncio.Event()
+
+        async def mcp_app(scope, receive, send):
+            body = json.loads((await receive())["body"])
+            await release.wait()
+            await JSONResponse({"jsonrpc": "2.0", "id": body["id"], "result": {}})(scope, receive, send)
+
+        controller = AdmissionController(per_session=10, per_client=1)
+        app = AdmissionMiddleware(mcp_app, controller, trusted_proxies=1)
+
+        def spoofed(fake_ip: str) -> dict:
+            # The client writes the left-most entry; the front end appends the real one.
+            return {"x-forwarded-for": f"{fake_ip}, 203.0.113.7"}
+
+        async with self._client(app) as client:
+            first = asyncio.create_task(
+                client.post("/mcp", json=self._call("tools/call", 1), headers=spoofed("198.51.100.1"))
+            )
+            await asyncio.sleep(0.02)
+            second = await client.post(
+                "/mcp", json=self._call("tools/call", 2), headers=spoofed("198.51.100.2")
+            )
+            release.set()
+            await first
+
+        assert second.json()["error"]["data"]["reason"] == "client_limit"
+        assert controller.executing == 0
+
+    @pytest.mark.asyncio
+    async def test_oversized_bodies_are_rejected_unread(self):
+        called = []
+
+        async def mcp_app(scope, receive, send):
+            called.append(scope)
+            await JSONResponse({})(scope, receive, send)
+
+        app = AdmissionMiddleware(mcp_app, AdmissionController(), max_body_size=1024)
+        call = self._call("tools/call")
+        call["params"] = {"arguments": {"query": "x" * 2000}}
+
+        async def chunked():
+            payload = json.dumps(call).encode()
+            for start in range(0, len(payload), 256):
+                yield payload[start:start + 256]
+
+        async with self._client(app) as client:
+            declared = await client.post("/mcp", json=call)
+            streamed = await client.post("/mcp", content=chunked())
+            small = await client.post("/mcp", json=self._call("tools/call"))
+
+        assert declared.status_code == streamed.status_code == 413
+        assert small.status_code == 200
+        assert len(called) == 1
@@ -0,0 +1,83 @@
+"""
+Tests for asset ID fast rejection
+=================================
+
+These tests run offline against mocked Office Add-ins API responses.
+"""
+
+from __future__ import annotations
+
+import httpx
+import pytest
+
+from office_addins_mcp_server.tools import asset_ids
+from office_addins_mcp_server.tools.addin_tools import get_addin_details, search_addins
+from office_addins_mcp_server.tools.asset_ids import (
+    AssetIdRejected,
+    BloomFilter,
+    known_ids,
+    missing_ids,
+)
+from office_addins_mcp_server.tools.changelog import refresh_catalog
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("asset_id", ["INVALID_ID_123", "WA", "WA12x", "104381441", ""])
+async def test_malformed_ids_are_rejected_without_a_request(asset_id):
+    with pytest.raises(httpx.HTTPStatusError) as info:
+        await get_addin_details(asset_id)
+    assert isinstance(info.value, AssetIdRejected)
+    assert info.value.response.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_ids_are_normalized(httpx_mock):
+    httpx_mock.add_response(json={"Value": {"Id": "WA104381441"}})
+    await get_addin_details(" wa104381441 ")
+    assert httpx_mock.get_requests()[0].url.params["assetid"] == "WA104381441"
+
+
+@pytest.mark.asyncio
+async def test_missing_ids_are_cached_until_seen_again(httpx_mock):
+    httpx_mock.add_response(status_code=404)
+
+    with pytest.raises(httpx.HTTPStatusError) as first:
+        await get_addin_details("WA100000001")
+    assert not isinstance(first.value, AssetIdRejected)
+    with pytest.raises(AssetIdRejected):
+        await get_addin_details("WA100000001")
+    assert len(httpx_mock.get_requests()) == 1
+
+    # A search returning the add-in clears the negative entry.
+    httpx_mock.add_response(json={"TotalCount": 1, "Values": [{"Id": "WA100000001"}]})
+    await search_addins(assetids=["WA100000001"], paginate=False)
+    assert "WA100000001" not in missing_ids
+
+
+def test_bloom_filter_has_no_false_negatives():
+    bloom = BloomFilter(error_rate=0.01)
+    ids = [f"WA{100000000 + i}" for i in range(2000)]
+    bloom.rebuild(ids)
+
+    assert all(asset_id in bloom for asset_id in ids)
+    others = [f"WA{200000000 + i}" for i in range(2000)]
+    false_positives = sum(asset_id in bloom for asset_id in others)
+    assert false_positives < 60
+    assert len(bloom._bits) < 2000 * 2
+
+
+@pytest.mark.asyncio
+async def test_unknown_ids_rejected_after_complete_scan(httpx_mock, monkeypatch):
+    monkeypatch.setattr(asset_ids, "REJECT_UNKNOWN_IDS", True)
+    httpx_mock.add_response(
+        json={"TotalCount": 2, "Values": [{"Id": "WA100000001"}, {"Id": "WA100000002"}]}
+    )
+    assert (await refresh_catalog())["Complete"] is True
+    assert known_ids.built_at is not None
+
+    with pytest.raises(AssetIdRejected) as info:
+        await get_addin_details("WA999999999")
+    assert info.value.reason == "not in the last catalog scan"
+
+    httpx_mock.add_response(json={"Value": {"Id": "WA100000002"}})
+    assert (await get_addin_details("WA100000002"))["Value"]["Id"] == "WA100000002"
@@ -0,0 +1,86 @@
+"""
+Tests for the response cache
+============================
+"""
+
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from office_addins_mcp_server.tools.cache import TTLCache
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_expiry_and_lru_eviction():
+    clock = FakeClock()
+    cache = TTLCache(maxsize=2, ttl=10, clock=clock)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)  # evicts "b", the least recently used
+    assert cache.get("b") is None
+    clock.now = 11
+    assert cache.get("a") is None
+    assert len(cache) == 1
+
+
+@pytest.mark.asyncio
+async def test_get_or_fetch_coalesces_concurrent_misses():
+    cache = TTLCache()
+    calls = 0
+
+    async def fetch():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return {"value": calls}
+
+    results = await asyncio.gather(*(cache.get_or_fetch("k", fetch) for _ in range(5)))
+    assert calls == 1
+    assert all(r == {"value": 1} for r in results)
+
+
+@pytest.mark.asyncio
+async def test_get_or_fetch_does_not_cache_errors():
+    cache = TTLCache()
+
+    async def fail():
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError):
+        await cache.get_or_fetch("k", fail)
+    assert cache.get("k") is None
+
+    async def ok():
+        return 1
+
+    assert await cache.get_or_fetch("k", ok) == 1
+
+
+@pytest.mark.asyncio
+async def test_waiter_retries_when_owner_is_cancelled():
+    cache = TTLCache()
+    started = asyncio.Event()
+
+    async def slow():
+        started.set()
+        await asyncio.sleep(10)
+
+    async def fast():
+        return "fresh"
+
+    owner = asyncio.create_task(cache.get_or_fetch("k", slow))
+    await started.wait()
+    waiter = asyncio.create_task(cache.get_or_fetch("k", fast))
+    await asyncio.sleep(0)
+    owner.cancel()
+    assert await waiter == "fresh"
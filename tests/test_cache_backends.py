@@ -0,0 +1,268 @@
+"""
+Tests for the shared cache backends
+===================================
+
+The Redis backend is exercised against a small in-process server speaking
+the Redis protocol; Office Add-ins API responses are mocked.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+
+import pytest
+import pytest_asyncio
+
+from office_addins_mcp_server.tools.addin_tools import search_addins, search_cache
+from office_addins_mcp_server.tools.cache_backends import (
+    CacheBackend,
+    DiskBackend,
+    MemoryBackend,
+    RedisBackend,
+    SharedCache,
+    backend_from_url,
+    decode_value,
+    encode_value,
+    shared_lookups_total,
+)
+from office_addins_mcp_server.tools.fuzzy_index import title_index
+
+
+class RedisStandIn:
+    """Enough of a Redis server for the backend: PING, AUTH, SELECT, GET,
+    MGET, SET (with PX) and DEL, with commands recorded per read."""
+
+    def __init__(self, password: str | None = None) -> None:
+        self.password = password
+        self.data: dict[bytes, tuple[float | None, bytes]] = {}
+        self.commands: list[list[bytes]] = []
+        self.reads = 0
+        self.connections = 0
+        self.server: asyncio.AbstractServer | None = None
+
+    async def start(self) -> str:
+        self.server = await asyncio.start_server(self._serve, "127.0.0.1", 0)
+        port = self.server.sockets[0].getsockname()[1]
+        auth = f":{self.password}@" if self.password else ""
+        return f"redis://{auth}127.0.0.1:{port}/2"
+
+    async def stop(self) -> None:
+        self.server.close()
+        await self.server.wait_closed()
+
+    async def _read_command(self, reader: asyncio.StreamReader) -> list[bytes]:
+        count = int((await reader.readuntil(b"\r\n"))[1:-2])
+        args = []
+        for _ in range(count):
+            size = int((await reader.readuntil(b"\r\n"))[1:-2])
+            args.append((await reader.readexactly(size + 2))[:-2])
+        return args
+
+    @staticmethod
+    def _bulk(value: bytes | None) -> bytes:
+        return b"$-1\r\n" if value is None else b"$%d\r\n%s\r\n" % (len(value), value)
+
+    def _get(self, key: bytes) -> bytes | None:
+        expires, value = self.data.get(key, (None, None))
+        if expires is not None and expires <= time.monotonic():
+            self.data.pop(key)
+            return None
+        return value
+
+    def _reply(self, args: list[bytes], state: dict) -> bytes:
+        name = args[0].upper()
+        if self.password and not state["authed"] and name != b"AUTH":
+            return b"-NOAUTH Authentication required.\r\n"
+        if name == b"AUTH":
+            state["authed"] = args[-1].decode() == self.password
+            return b"+OK\r\n" if state["authed"] else b"-WRONGPASS\r\n"
+        if name in (b"PING", b"SELECT"):
+            return b"+PONG\r\n" if name == b"PING" else b"+OK\r\n"
+        if name == b"GET":
+            return self._bulk(self._get(args[1]))
+        if name == b"MGET":
+            return b"*%d\r\n" % (len(args) - 1) + b"".join(self._bulk(self._get(k)) for k in args[1:])
+        if name == b"SET":
+            expires = None
+            if len(args) == 5 and args[3].upper() == b"PX":
+                expires = time.monotonic() + int(args[4]) / 1000
+            self.data[args[1]] = (expires, args[2])
+            return b"+OK\r\n"
+        if name == b"DEL":
+            return b":%d\r\n" % int(self.data.pop(args[1], None) is not None)
+        return b"-ERR unknown command\r\n"
+
+    async def _serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        state = {"authed": False}
+        self.connections += 1
+        try:
+            while True:
+                args = await self._read_command(reader)
+                batch = [args]
+                # Everything already buffered arrived in the same pipeline.
+                while reader._buffer:  # noqa: SLF001
+                    batch.append(await self._read_command(reader))
+                self.reads += 1
+                self.commands.extend(batch)
+                writer.write(b"".join(self._reply(command, state) for command in batch))
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            writer.close()
+
+
+@pytest_asyncio.fixture
+async def redis_url():
+    server = RedisStandIn(password="s3cret")
+    url = await server.start()
+    yield url, server
+    await server.stop()
+
+
+def test_values_round_trip_and_large_ones_are_compressed():
+    small = {"Id": "WA1"}
+    large = {"Values": [{"Title": "Calendar " * 20}] * 20}
+    assert encode_value(small).startswith(b"j")
+    assert encode_value(large).startswith(b"z")
+    assert len(encode_value(large)) < len(encode_value(large, compress_min_size=10**9))
+    assert decode_value(encode_value(large)) == large
+
+
+def test_backend_from_url(tmp_path):
+    assert isinstance(backend_from_url("memory"), MemoryBackend)
+    assert isinstance(backend_from_url(f"disk:{tmp_path}"), DiskBackend)
+    backend = backend_from_url("rediss://:pw@cache.example.net:6380/1")
+    assert (backend.host, backend.port, backend.password, backend.db, backend.tls) == (
+        "cache.example.net", 6380, "pw", 1, True,
+    )
+    with pytest.raises(ValueError):
+        backend_from_url("memcached://localhost")
+
+
+
+def test_incomplete_backend_fails_when_created():
+    class NoDelete(CacheBackend):
+        async def get_many(self, keys):
+            return [None] * len(keys)
+
+        async def set_many(self, items, ttl):
+            pass
+
+    with pytest.raises(TypeError, match="delete"):
+        NoDelete()
+
+@pytest.mark.asyncio
+async def test_disk_backend_expires_and_sweeps(tmp_path):
+    backend = DiskBackend(tmp_path, max_entries=2)
+    await backend.set_many({"a": b"1", "b": b"2", "c": b"3"}, ttl=60)
+    await backend.set("gone", b"4", ttl=-1)
+    assert await backend.get_many(["a", "gone", "missing"]) == [b"1", None, None]
+
+    assert backend.sweep() == 1
+    assert len(list(tmp_path.iterdir())) == 2
+
+
+@pytest.mark.asyncio
+async def test_redis_backend_pipelines_batches(redis_url):
+    url, server = redis_url
+    backend = RedisBackend(url)
+    try:
+        assert await backend.ping()
+        await backend.set_many({"a": b"1", "b": b"2", "c": b"3"}, ttl=60)
+        server.reads = 0
+        server.commands.clear()
+
+        assert await backend.get_many(["a", "x", "c"]) == [b"1", None, b"3"]
+        assert server.reads == 1
+        assert [c[0] for c in server.commands] == [b"MGET"]
+
+        await backend.set_many({"d": b"4", "e": b"5"}, ttl=0.05)
+        assert server.reads == 2
+        await asyncio.sleep(0.06)
+        assert await backend.get("d") is None
+        await backend.delete("a")
+        assert await backend.get("a") is None
+    finally:
+        await backend.close()
+
+
+@pytest.mark.asyncio
+async def test_shared_cache_falls_back_when_backend_is_down():
+    clock_now = [0.0]
+    shared = SharedCache(
+        RedisBackend("redis://127.0.0.1:1"), retry_after=30, clock=lambda: clock_now[0]
+    )
+    await shared.set("k", {"v": 1}, ttl=60)
+    assert await shared.get("k") is None
+    assert shared.available is False
+
+    # While the backend is bypassed, nothing is attempted.
+    shared.backend = MemoryBackend()
+    await shared.backend.set("k", encode_value({"v": 1}), ttl=60)
+    assert await shared.get("k") is None
+
+    clock_now[0] += 31
+    assert await shared.get("k") == {"v": 1}
+
+
+@pytest.mark.asyncio
+async def test_redis_pool_contention_does_not_trip_the_breaker(redis_url):
+    url, server = redis_url
+    shared = SharedCache(RedisBackend(url, pool_size=2, timeout=0.05))
+    await shared.set("k", {"v": 1}, ttl=60)
+
+    values = await asyncio.gather(*(shared.get("k") for _ in range(20)))
+    assert values == [{"v": 1}] * 20
+    assert server.connections <= 2
+
+    # Every connection is taken: the lookup misses, the backend stays in use.
+    busy = shared_lookups_total.value(result="busy")
+    slots = shared.backend._slots
+    for _ in range(2):
+        await slots.acquire()
+    assert await shared.get("k") is None
+    assert shared_lookups_total.value(result="busy") == busy + 1
+    assert shared.available
+    for _ in range(2):
+        slots.release()
+    assert await shared.get("k") == {"v": 1}
+    await shared.close()
+
+
+@pytest.mark.asyncio
+async def test_search_cache_is_shared_between_instances(redis_url, httpx_mock, monkeypatch):
+    url, _ = redis_url
+    shared = SharedCache(RedisBackend(url))
+    monkeypatch.setattr(search_cache, "shared", shared)
+    httpx_mock.add_response(json={"TotalCount": 1, "Values": [{"Id": "WA1", "Title": "Zoom"}]})
+
+    first = await search_addins(query="zoom", paginate=False)
+
+    # Another instance: empty local cache and index, same shared tier.
+    search_cache.clear()
+    title_index.clear()
+    second = await search_addins(query="zoom", paginate=False)
+
+    assert second == first
+    assert len(httpx_mock.get_requests()) == 1
+    assert title_index.suggest("Zoo")
+    await shared.close()
+
+
+@pytest.mark.asyncio
+async def test_locale_searches_use_one_batched_lookup(redis_url, httpx_mock, monkeypatch):
+    url, server = redis_url
+    shared = SharedCache(RedisBackend(url))
+    monkeypatch.setattr(search_cache, "shared", shared)
+    httpx_mock.add_response(json={"TotalCount": 1, "Values": [{"Id": "WA1", "Title": "Zoom"}]}, is_reusable=True)
+
+    await search_addins(query="zoom", locales=["de-DE", "fr-FR"])
+    search_cache.clear()
+    server.commands.clear()
+
+    await search_addins(query="zoom", locales=["de-DE", "fr-FR"])
+
+    assert len(httpx_mock.get_requests()) == 2
+    assert [c[0] for c in server.commands] == [b"MGET"]
+    assert len(server.commands[0]) == 3
+    await shared.close()
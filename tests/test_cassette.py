@@ -0,0 +1,128 @@
+"""
+Tests for upstream record and replay
+====================================
+
+Recording runs against mocked Office Add-ins API responses; replay runs
+without any network access.
+"""
+
+from __future__ import annotations
+
+import gzip
+
+import httpx
+import pytest
+
+from office_addins_mcp_server.tools import cassette, upstream
+from office_addins_mcp_server.tools.addin_tools import search_addins
+from office_addins_mcp_server.tools.cassette import (
+    CassetteWriter,
+    ReplayTransport,
+    load_cassette,
+    replay_misses_total,
+    request_key,
+)
+
+
+@pytest.fixture
+def mode(monkeypatch, tmp_path):
+    """Switch the upstream client to a cassette mode for one test."""
+    path = tmp_path / "traffic.jsonl.gz"
+
+    async def switch(name: str, scale: float = 0.0) -> None:
+        await upstream.aclose()
+        cassette.close()
+        monkeypatch.setattr(cassette, "CASSETTE_MODE", name)
+        monkeypatch.setattr(cassette, "CASSETTE_PATH", str(path))
+        monkeypatch.setattr(cassette, "REPLAY_LATENCY_SCALE", scale)
+        monkeypatch.setattr(cassette, "_replay_entries", None)
+
+    switch.path = path
+    yield switch
+    cassette.close()
+
+
+@pytest.mark.asyncio
+async def test_record_then_replay_offline(httpx_mock, mode):
+    httpx_mock.add_response(json={"TotalCount": 1, "Values": [{"Id": "WA1", "Title": "Zoom"}]})
+    httpx_mock.add_response(content=b"\x89PNG icon", headers={"Content-Type": "image/png"})
+
+    await mode("record")
+    live = await upstream.get_json("search", params={"qu": "zoom", "top": 5},
+                                   headers={"Accept-Language": "es-ES"})
+    icon = await upstream.get_bytes("https://store-images.s-microsoft.com/image/apps.1")
+    await upstream.aclose()
+    cassette.close()
+
+    entries = load_cassette(mode.path)
+    assert [entry["status"] for entry in entries] == [200, 200]
+    assert entries[0]["headers"] == {"accept-language": "es-ES"}
+    assert "text" in entries[0] and "base64" in entries[1]
+    assert all(entry["latency_ms"] >= 0 for entry in entries)
+
+    await mode("replay")
+    # Same request with the query in another order, and no network mock left.
+    replayed = await upstream.get_json("search", params={"top": 5, "qu": "zoom"},
+                                       headers={"Accept-Language": "es-ES"})
+    assert replayed == live
+    assert await upstream.get_bytes("https://store-images.s-microsoft.com/image/apps.1") == icon
+
+
+@pytest.mark.asyncio
+async def test_replay_serves_tools_and_reports_misses(httpx_mock, mode):
+    httpx_mock.add_response(json={"TotalCount": 1, "Values": [{"Id": "WA1"}]})
+    await mode("record")
+    await search_addins(query="zoom", autocorrect=False, paginate=False)
+    await upstream.aclose()
+
+    await mode("replay")
+    assert (await search_addins(query="zoom", autocorrect=False, paginate=False))["TotalCount"] == 1
+
+    before = replay_misses_total.value()
+    with pytest.raises(httpx.ConnectError):
+        await upstream.get_json("search", params={"qu": "never recorded"})
+    assert replay_misses_total.value() == before + 1 + upstream.MAX_RETRIES
+
+
+@pytest.mark.asyncio
+async def test_replay_scales_latency_and_cycles_responses(tmp_path):
+    writer = CassetteWriter(tmp_path / "c.jsonl.gz")
+    request = httpx.Request("GET", "https://example.com/a")
+    for body, latency in ((b'{"n": 1}', 0.2), (b'{"n": 2}', 0.4)):
+        writer.write(request, 200, {"content-type": "application/json"}, body, latency)
+    writer.close()
+    slept = []
+
+    async def sleep(seconds: float) -> None:
+        slept.append(seconds)
+
+    transport = ReplayTransport(load_cassette(tmp_path / "c.jsonl.gz"), 0.5, sleep=sleep)
+    async with httpx.AsyncClient(transport=transport) as client:
+        bodies = [(await client.get("https://example.com/a")).json()["n"] for _ in range(3)]
+
+    assert bodies == [1, 2, 1]
+    assert slept == pytest.approx([0.1, 0.2, 0.1])
+
+
+def test_truncated_cassette_keeps_complete_exchanges(tmp_path):
+    path = tmp_path / "c.jsonl.gz"
+    writer = CassetteWriter(path)
+    request = httpx.Request("GET", "https://example.com/a")
+    for _ in range(3):
+        writer.write(request, 200, {"content-type": "application/json"}, b"{}", 0.01)
+    # A crash leaves the flushed lines without the gzip trailer.
+    crashed = tmp_path / "crashed.jsonl.gz"
+    crashed.write_bytes(path.read_bytes())
+    writer.close()
+    assert len(load_cassette(crashed)) == 3
+
+    path.write_bytes(gzip.compress(b'{"not": "a cassette"}\n'))
+    with pytest.raises(ValueError):
+        load_cassette(path)
+
+
+def test_request_key():
+    assert request_key("get", "https://x/s?b=2&a=1") == request_key("GET", "https://x/s?a=1&b=2")
+    assert request_key("GET", "https://x/s", {"accept-language": "fr-FR"}) != request_key(
+        "GET", "https://x/s"
+    )
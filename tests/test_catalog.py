@@ -0,0 +1,72 @@
+"""
+Tests for the local add-in catalog
+==================================
+"""
+
+from __future__ import annotations
+
+import pytest
+
+from office_addins_mcp_server.tools.catalog import Catalog, decode_cursor, encode_cursor
+
+
+def record(asset_id: str, *categories: str, **fields) -> dict:
+    return {
+        "Id": asset_id,
+        "Title": f"Add-in {asset_id}",
+        "Categories": [{"Id": c, "Title": c} for c in categories],
+        **fields,
+    }
+
+
+def test_reports_only_real_changes():
+    catalog = Catalog()
+    events = []
+    catalog.add_listener(lambda ids, categories: events.append((ids, categories)))
+
+    assert catalog.add_records([record("WA1", "Productivity")]) == ["WA1"]
+    assert catalog.add_records([record("WA1", "Productivity")]) == []
+    assert catalog.add_records([record("WA1", "Productivity", Rating=4.5)]) == ["WA1"]
+
+    assert events == [(["WA1"], {"Productivity"}), (["WA1"], {"Productivity"})]
+
+
+def test_search_records_keep_details_fields():
+    catalog = Catalog()
+    catalog.add_records([record("WA1", "Productivity", ManifestUrl="https://x/m.xml")])
+
+    assert catalog.add_records([record("WA1", "Productivity")]) == []
+    assert catalog.get("WA1")["ManifestUrl"] == "https://x/m.xml"
+
+
+def test_category_pages_are_stable_under_inserts():
+    catalog = Catalog()
+    catalog.add_records([record(f"WA{i:02d}", "Productivity") for i in range(0, 10, 2)])
+
+    first, cursor = catalog.list_category("Productivity", limit=2)
+    assert [r["Id"] for r in first] == ["WA00", "WA02"]
+
+    # Records added before the cursor position do not shift later pages.
+    catalog.add_records([record("WA01", "Productivity"), record("WA05", "Productivity")])
+    second, cursor = catalog.list_category("Productivity", cursor=cursor, limit=2)
+    assert [r["Id"] for r in second] == ["WA04", "WA05"]
+    third, cursor = catalog.list_category("Productivity", cursor=cursor, limit=2)
+    assert [r["Id"] for r in third] == ["WA06", "WA08"]
+    assert cursor is None
+
+
+def test_category_moves_and_eviction():
+    catalog = Catalog(maxsize=2)
+    catalog.add_records([record("WA1", "Productivity"), record("WA2", "Education")])
+    catalog.add_records([record("WA1", "Education")])
+    assert catalog.categories() == {"Education": 2}
+
+    catalog.add_records([record("WA3", "Reference")])
+    assert "WA2" not in catalog
+    assert catalog.categories() == {"Education": 1, "Reference": 1}
+
+
+def test_cursor_round_trip_and_rejection():
+    assert decode_cursor(encode_cursor("WA104381441")) == "WA104381441"
+    with pytest.raises(ValueError):
+        decode_cursor("not a cursor")
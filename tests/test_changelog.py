@@ -0,0 +1,190 @@
+"""
+Tests for the catalog change log
+================================
+
+These tests run offline against mocked Office Add-ins API responses.
+"""
+
+from __future__ import annotations
+
+import httpx
+import pytest
+
+from office_addins_mcp_server.tools.addin_tools import get_addin_details
+from office_addins_mcp_server.tools.catalog import catalog
+from office_addins_mcp_server.tools.changelog import (
+    ChangeLog,
+    changelog,
+    get_catalog_changes,
+    refresh_catalog,
+)
+
+
+def record(asset_id: str, **fields) -> dict:
+    return {
+        "Id": asset_id,
+        "Title": f"Add-in {asset_id}",
+        "Version": "1.0.0",
+        "Pricing": {"Category": "Free"},
+        "Permissions": [{"Id": "ReadDocument"}],
+        "Rating": 4.0,
+        **fields,
+    }
+
+
+class Clock:
+    def __init__(self) -> None:
+        self.now = 1_750_000_000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_logs_tracked_field_changes_only():
+    log = ChangeLog()
+    log.mark_baseline()
+    log.observe("WA1", record("WA1"))
+    log.observe("WA1", record("WA1", Rating=4.5, NumberOfVotes=10))
+    log.observe("WA1", record("WA1", Permissions=[{"Id": "ReadWriteDocument"}]))
+
+    entries, _ = log.since(0)
+    assert [e["Change"] for e in entries] == ["added", "updated"]
+    assert entries[1]["Fields"] == ["Permissions"]
+    assert entries[1]["PermissionsChanged"] is True
+
+
+def test_list_order_does_not_count_as_change():
+    log = ChangeLog()
+    perms = [{"Id": "A"}, {"Id": "B"}]
+    log.observe("WA1", record("WA1", Permissions=perms))
+    assert log.observe("WA1", record("WA1", Permissions=perms[::-1])) is None
+
+
+def test_first_sightings_are_silent_before_baseline():
+    log = ChangeLog()
+    assert log.observe("WA1", record("WA1")) is None
+    log.mark_baseline()
+    assert log.observe("WA2", record("WA2"))["Change"] == "added"
+
+
+def test_dropped_entries_mark_answer_truncated():
+    clock = Clock()
+    log = ChangeLog(maxlen=2, clock=clock)
+    log.observe("WA1", record("WA1"))
+    for version in ("1.1", "1.2", "1.3"):
+        clock.now += 60
+        log.observe("WA1", record("WA1", Version=version))
+
+    entries, truncated = log.since(0)
+    assert [e["Fields"] for e in entries] == [["Version"], ["Version"]]
+    assert truncated is True
+    assert log.since(clock.now - 30) == (entries[-1:], False)
+
+
+@pytest.mark.asyncio
+async def test_refresh_logs_additions_updates_and_removals(httpx_mock, monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(changelog, "_clock", clock)
+    store = {"WA1": record("WA1"), "WA2": record("WA2")}
+
+    def respond(request: httpx.Request) -> httpx.Response:
+        values = list(store.values())
+        return httpx.Response(200, json={"TotalCount": len(values), "Values": values})
+
+    httpx_mock.add_callback(respond, is_reusable=True)
+    assert (await refresh_catalog())["Complete"] is True
+    checkpoint = "2025-06-15T15:06:40Z"
+    clock.now += 10
+
+    store["WA1"] = record("WA1", Version="2.0.0", Pricing={"Category": "Paid"})
+    store["WA3"] = record("WA3")
+    del store["WA2"]
+    result = await refresh_catalog()
+    assert result == {"Records": 2, "Removed": 1, "Complete": True}
+
+    changes = await get_catalog_changes(checkpoint, include_diffs=True)
+    by_id = {value["AssetId"]: value for value in changes["Values"]}
+    assert by_id["WA1"]["Change"] == "updated"
+    assert by_id["WA1"]["Diff"]["Version"] == {"Old": "1.0.0", "New": "2.0.0"}
+    assert by_id["WA1"]["Fields"] == ["Version", "Pricing"]
+    assert by_id["WA3"]["Change"] == "added"
+    assert by_id["WA2"]["Change"] == "removed"
+    assert changes["Summary"] == {"added": 1, "updated": 1, "removed": 1, "permissions": 0}
+    assert changes["BaselineAt"] == checkpoint
+
+    later = await get_catalog_changes(changes["Until"])
+    assert later["TotalCount"] == 0
+
+
+@pytest.mark.asyncio
+async def test_incomplete_refresh_does_not_remove(httpx_mock):
+    catalog.add_records([record("WA9")])
+    httpx_mock.add_response(json={"TotalCount": 500, "Values": [record("WA1")]})
+    httpx_mock.add_response(json={"TotalCount": 500, "Values": []})
+
+    result = await refresh_catalog(page_size=2)
+
+    assert result["Complete"] is False
+    assert "WA9" in catalog
+
+
+@pytest.mark.asyncio
+async def test_refresh_completes_when_the_api_caps_page_size(httpx_mock):
+    catalog.add_records([record("WA9")])
+    ids = ["WA1", "WA2", "WA3"]
+
+    def capped(request: httpx.Request) -> httpx.Response:
+        skip = int(request.url.params["skiptoitem"])
+        values = [record(asset_id) for asset_id in ids[skip:skip + 1]]
+        return httpx.Response(200, json={"TotalCount": len(ids), "Values": values})
+
+    httpx_mock.add_callback(capped, is_reusable=True)
+    result = await refresh_catalog(page_size=2)
+
+    assert result == {"Records": 3, "Removed": 1, "Complete": True}
+    assert changelog.baseline_at is not None
+
+
+@pytest.mark.asyncio
+async def test_refresh_reports_removal_of_evicted_addins(httpx_mock, monkeypatch):
+    store = {"WA1": record("WA1"), "WA2": record("WA2")}
+
+    def respond(request: httpx.Request) -> httpx.Response:
+        values = list(store.values())
+        return httpx.Response(200, json={"TotalCount": len(values), "Values": values})
+
+    httpx_mock.add_callback(respond, is_reusable=True)
+    await refresh_catalog()
+    # Evicted from the catalog (size limit or memory budget), then withdrawn.
+    monkeypatch.setattr(catalog, "maxsize", 1)
+    catalog.add_records([record("WA2", Version="1.1.0")])
+    assert "WA1" not in catalog
+    del store["WA1"]
+
+    result = await refresh_catalog()
+
+    assert result["Removed"] == 1
+    changes = await get_catalog_changes("2000-01-01T00:00:00", change_types=["removed"])
+    assert [(v["AssetId"], v["Title"]) for v in changes["Values"]] == [("WA1", "Add-in WA1")]
+    assert "WA1" not in changelog.ids()
+
+
+@pytest.mark.asyncio
+async def test_withdrawn_addin_is_logged_as_removed(httpx_mock):
+    catalog.add_records([record("WA1")])
+    httpx_mock.add_response(status_code=404)
+
+    with pytest.raises(httpx.HTTPStatusError):
+        await get_addin_details("WA1")
+
+    changes = await get_catalog_changes("2000-01-01T00:00:00", change_types=["removed"])
+    assert [v["AssetId"] for v in changes["Values"]] == ["WA1"]
+    assert "WA1" not in catalog
+
+
+@pytest.mark.asyncio
+async def test_rejects_bad_arguments():
+    with pytest.raises(ValueError):
+        await get_catalog_changes("yesterday")
+    with pytest.raises(ValueError):
+        await get_catalog_changes("2025-01-01", change_types=["renamed"])
@@ -0,0 +1,184 @@
+"""
+Tests for response compression
+==============================
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import zlib
+
+import httpx
+import pytest
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse, StreamingResponse
+from starlette.routing import Route
+
+from office_addins_mcp_server.web.compression import CompressionMiddleware, negotiate_encoding
+
+brotli = pytest.importorskip("brotli")
+
+
+LARGE = {"Values": [{"Id": f"WA{i}", "Title": "Mini Calendar and Date Picker"} for i in range(200)]}
+EVENTS = [f"event: message\ndata: {json.dumps(LARGE)}\n\n".encode(), b": ping\n\n", b"data: done\n\n"]
+
+
+async def large(request):
+    return JSONResponse(LARGE)
+
+
+async def small(request):
+    return JSONResponse({"ok": True})
+
+
+async def events(request):
+    async def stream():
+        for event in EVENTS:
+            yield event
+
+    return StreamingResponse(stream(), media_type="text/event-stream")
+
+
+PROGRESS = b'event: message\ndata: {"method": "notifications/progress"}\n\n'
+
+
+async def progress_then_result(request):
+    async def stream():
+        yield PROGRESS
+        yield EVENTS[0]
+
+    return StreamingResponse(stream(), media_type="text/event-stream")
+
+
+APP = CompressionMiddleware(
+    Starlette(
+        routes=[
+            Route("/large", large),
+            Route("/small", small),
+            Route("/events", events),
+            Route("/progress", progress_then_result),
+        ]
+    ),
+    minimum_size=512,
+)
+
+
+async def _get(path: str, accept_encoding: str) -> httpx.Response:
+    transport = httpx.ASGITransport(app=APP)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        return await client.get(path, headers={"Accept-Encoding": accept_encoding})
+
+
+@pytest.mark.parametrize(
+    "header, expected",
+    [
+        ("gzip, deflate, br", "br"),
+        ("gzip", "gzip"),
+        ("br;q=0.5, gzip;q=0.8", "gzip"),
+        ("br;q=0, gzip;q=0", None),
+        ("identity", None),
+        ("*", "br"),
+    ],
+)
+def test_negotiate_encoding(header, expected):
+    assert negotiate_encoding(header) == expected
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("encoding", ["br", "gzip"])
+async def test_large_response_is_compressed(encoding):
+    response = await _get("/large", encoding)
+
+    assert response.headers["content-encoding"] == encoding
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert int(response.headers["content-length"]) < len(json.dumps(LARGE))
+    assert response.json() == LARGE
+
+
+@pytest.mark.asyncio
+async def test_small_response_and_identity_are_not_compressed():
+    assert "content-encoding" not in (await _get("/small", "br, gzip")).headers
+    assert "content-encoding" not in (await _get("/large", "identity")).headers
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("encoding", ["br", "gzip"])
+async def test_event_stream_chunks_decode_incrementally(encoding):
+    messages = []
+    requests = [{"type": "http.request", "body": b"", "more_body": False}]
+
+    async def receive():
+        if requests:
+            return requests.pop()
+        await asyncio.Event().wait()
+
+    async def send(message):
+        messages.append(message)
+
+    scope = {
+        "type": "http",
+        "method": "GET",
+        "path": "/events",
+        "raw_path": b"/events",
+        "query_string": b"",
+        "headers": [(b"accept-encoding", encoding.encode())],
+        "scheme": "http",
+        "server": ("test", 80),
+        "root_path": "",
+    }
+    await APP(scope, receive, send)
+
+    start = messages[0]
+    assert (b"content-encoding", encoding.encode()) in start["headers"]
+    assert all(name != b"content-length" for name, _ in start["headers"])
+
+    decoder = brotli.Decompressor() if encoding == "br" else zlib.decompressobj(16 + zlib.MAX_WBITS)
+    decoded = [decoder.process(m["body"]) if encoding == "br" else decoder.decompress(m["body"])
+               for m in messages[1:]]
+    # Every event is decodable as soon as its chunk arrives.
+    assert decoded[:3] == EVENTS
+    assert messages[-1]["more_body"] is False
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("encoding", ["br", "gzip"])
+async def test_event_stream_opening_with_a_small_event_is_compressed(encoding):
+    assert len(PROGRESS) < 512
+    response = await _get("/progress", encoding)
+
+    assert response.headers["content-encoding"] == encoding
+    assert response.content == PROGRESS + EVENTS[0]
+    assert response.num_bytes_downloaded < len(EVENTS[0])
+
+
+@pytest.mark.asyncio
+async def test_event_stream_headers_are_sent_before_the_first_event():
+    first_event = asyncio.Event()
+    messages = []
+
+    async def app(scope, receive, send):
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 200,
+                "headers": [(b"content-type", b"text/event-stream")],
+            }
+        )
+        # Nothing to send yet, as while a long tool call runs.
+        await send({"type": "http.response.body", "body": b"", "more_body": True})
+        await first_event.wait()
+        await send({"type": "http.response.body", "body": PROGRESS, "more_body": False})
+
+    async def send(message):
+        messages.append(message)
+
+    scope = {"type": "http", "method": "GET", "headers": [(b"accept-encoding", b"gzip")]}
+    task = asyncio.create_task(CompressionMiddleware(app)(scope, None, send))
+    await asyncio.sleep(0.01)
+
+    assert [message["type"] for message in messages] == ["http.response.start"]
+    assert (b"content-encoding", b"gzip") in messages[0]["headers"]
+    first_event.set()
+    await task
+    assert zlib.decompress(messages[-1]["body"], 16 + zlib.MAX_WBITS) == PROGRESS
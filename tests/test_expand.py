@@ -0,0 +1,114 @@
+"""
+Tests for the search_and_expand composite tool
+==============================================
+
+These tests run offline: API responses are mocked, and the MCP client and
+server are connected through in-memory streams.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+
+import httpx
+import pytest
+from mcp.shared.memory import create_connected_server_and_client_session
+
+from office_addins_mcp_server.server import create_mcp_server
+from office_addins_mcp_server.tools.addin_tools import get_addin_details
+from office_addins_mcp_server.tools.expand import search_and_expand
+
+SEARCH_URL = "https://api.addins.omex.office.net/api/addins/search"
+DETAILS_URL = "https://api.addins.omex.office.net/api/addins/details"
+
+HITS = [
+    {"Id": "WA1", "Title": "Zoom", "Rating": 4.5},
+    {"Id": "WA2", "Title": "Teams", "Rating": 4.0},
+    {"Id": "WA3", "Title": "Webex", "Rating": 3.5},
+]
+
+
+def details(asset_id: str) -> dict:
+    return {"Value": {"Id": asset_id, "ManifestUrl": f"https://example.com/{asset_id}.xml",
+                      "Pricing": {"Category": "Free"}}}
+
+
+@pytest.mark.asyncio
+async def test_expands_top_hits_concurrently(httpx_mock):
+    httpx_mock.add_response(url=f"{SEARCH_URL}?qu=meeting", json={"TotalCount": 3, "Values": HITS})
+    in_flight, peak = 0, 0
+
+    async def respond(request: httpx.Request) -> httpx.Response:
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return httpx.Response(200, json=details(request.url.params["assetid"]))
+
+    httpx_mock.add_callback(respond, url=f"{DETAILS_URL}?assetid=WA1")
+    httpx_mock.add_callback(respond, url=f"{DETAILS_URL}?assetid=WA2")
+
+    result = await search_and_expand({"query": "meeting"}, top_k=2)
+
+    assert peak == 2
+    assert result["TotalCount"] == 3
+    assert result["Expanded"] == 2
+    assert [v["Id"] for v in result["Values"]] == ["WA1", "WA2", "WA3"]
+    assert result["Values"][0]["ManifestUrl"] == "https://example.com/WA1.xml"
+    assert result["Values"][0]["Title"] == "Zoom"
+    assert "ManifestUrl" not in result["Values"][2]
+
+    # The details are cached for later get_addin_details calls.
+    assert (await get_addin_details("WA2"))["Value"]["Id"] == "WA2"
+    assert len(httpx_mock.get_requests()) == 3
+
+
+@pytest.mark.asyncio
+async def test_failed_details_keep_search_fields_and_projection_applies(httpx_mock):
+    httpx_mock.add_response(url=f"{SEARCH_URL}?qu=meeting", json={"TotalCount": 3, "Values": HITS})
+    httpx_mock.add_response(url=f"{DETAILS_URL}?assetid=WA1", json=details("WA1"))
+    httpx_mock.add_response(url=f"{DETAILS_URL}?assetid=WA2", status_code=404)
+
+    result = await search_and_expand(
+        {"query": "meeting"}, top_k=2, fields=["Id", "Pricing.Category"]
+    )
+
+    assert result["Values"] == [
+        {"Id": "WA1", "Pricing.Category": "Free"},
+        {"Id": "WA2", "Pricing.Category": None},
+        {"Id": "WA3", "Pricing.Category": None},
+    ]
+
+
+@pytest.mark.asyncio
+async def test_rejects_bad_arguments():
+    with pytest.raises(ValueError):
+        await search_and_expand({"query": "x"}, top_k=100)
+    with pytest.raises(ValueError):
+        await search_and_expand({"cursor": "abc"})
+
+
+@pytest.mark.asyncio
+async def test_tool_streams_expanded_records_as_progress(httpx_mock):
+    httpx_mock.add_response(url=f"{SEARCH_URL}?qu=meeting", json={"TotalCount": 3, "Values": HITS})
+    for asset_id in ("WA1", "WA2", "WA3"):
+        httpx_mock.add_response(url=f"{DETAILS_URL}?assetid={asset_id}", json=details(asset_id))
+    events = []
+
+    async def on_progress(progress: float, total: float | None, message: str | None) -> None:
+        events.append((progress, total, json.loads(message)))
+
+    server = create_mcp_server()
+    async with create_connected_server_and_client_session(server._mcp_server) as client:
+        result = await client.call_tool(
+            "search_and_expand",
+            {"search": {"query": "meeting"}, "top_k": 3, "fields": ["Id", "ManifestUrl"]},
+            progress_callback=on_progress,
+        )
+
+    assert not result.isError
+    assert [(done, total) for done, total, _ in events] == [(1, 3), (2, 3), (3, 3)]
+    assert sorted(record["Id"] for _, _, record in events) == ["WA1", "WA2", "WA3"]
+    assert all(set(record) == {"Id", "ManifestUrl"} for _, _, record in events)
@@ -0,0 +1,152 @@
+"""
+Tests for streaming bulk export
+===============================
+
+These tests run offline against mocked Office Add-ins API responses.
+"""
+
+from __future__ import annotations
+
+import json
+
+import httpx
+import pytest
+from click.testing import CliRunner
+
+from benchmarks.payloads import search_response
+from office_addins_mcp_server.server import main
+from office_addins_mcp_server.tools import export
+from office_addins_mcp_server.tools.export import export_addins, export_path
+
+
+CATALOG = search_response(top=23, total=23, seed=1)["Values"]
+
+
+def make_responder(fail_at: int | None = None):
+    def respond(request: httpx.Request) -> httpx.Response:
+        skip = int(request.url.params["skiptoitem"])
+        top = int(request.url.params["top"])
+        if skip == fail_at:
+            return httpx.Response(500)
+        values = CATALOG[skip:skip + top]
+        return httpx.Response(200, json={"TotalCount": len(CATALOG), "Values": values})
+
+    return respond
+
+
+def read_ndjson(path) -> list[dict]:
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+
+@pytest.mark.asyncio
+async def test_streams_projected_filtered_pages(httpx_mock, tmp_path):
+    httpx_mock.add_callback(make_responder(), is_reusable=True)
+    output = tmp_path / "addins.ndjson"
+
+    summary = await export_addins(
+        str(output),
+        fields=["Id", "Pricing.Category"],
+        filters={"min_rating": 3.0},
+        page_size=5,
+    )
+
+    expected = [
+        {"Id": r["Id"], "Pricing.Category": r["Pricing"]["Category"]}
+        for r in CATALOG
+        if r["Rating"] >= 3.0
+    ]
+    assert read_ndjson(output) == expected
+    assert summary["Records"] == len(expected)
+    assert summary["Pages"] == 5
+    assert summary["Skipped"] == len(CATALOG) - len(expected)
+    assert not (tmp_path / "addins.ndjson.checkpoint.json").exists()
+
+
+@pytest.mark.asyncio
+async def test_resumes_from_checkpoint_after_failure(httpx_mock, tmp_path):
+    output = tmp_path / "addins.ndjson"
+    httpx_mock.add_callback(make_responder(fail_at=10), is_reusable=True)
+    with pytest.raises(httpx.HTTPStatusError):
+        await export_addins(str(output), fields=["Id"], page_size=5)
+
+    checkpoint = json.loads((tmp_path / "addins.ndjson.checkpoint.json").read_text())
+    assert checkpoint["Offset"] == 10
+    # Simulate a partial line written after the checkpoint.
+    with open(output, "ab") as f:
+        f.write(b'{"Id": "WA-partial')
+
+    httpx_mock.reset()
+    httpx_mock.add_callback(make_responder(), is_reusable=True)
+    summary = await export_addins(str(output), fields=["Id"], page_size=5)
+
+    assert summary["Resumed"] is True
+    assert [row["Id"] for row in read_ndjson(output)] == [r["Id"] for r in CATALOG]
+    requested = [int(r.url.params["skiptoitem"]) for r in httpx_mock.get_requests()]
+    assert requested == [10, 15, 20]
+
+
+@pytest.mark.asyncio
+async def test_pages_capped_below_page_size_are_followed(httpx_mock, tmp_path):
+    def capped(request: httpx.Request) -> httpx.Response:
+        # The API returns at most 4 rows whatever ``top`` asks for.
+        skip = int(request.url.params["skiptoitem"])
+        return httpx.Response(200, json={"TotalCount": len(CATALOG), "Values": CATALOG[skip:skip + 4]})
+
+    httpx_mock.add_callback(capped, is_reusable=True)
+    output = tmp_path / "addins.ndjson"
+
+    summary = await export_addins(str(output), fields=["Id"], page_size=10)
+
+    assert [row["Id"] for row in read_ndjson(output)] == [r["Id"] for r in CATALOG]
+    assert summary["Pages"] == 6
+    requested = [int(r.url.params["skiptoitem"]) for r in httpx_mock.get_requests()]
+    assert requested == [0, 4, 8, 12, 16, 20]
+
+
+@pytest.mark.asyncio
+async def test_checkpoint_of_other_export_is_rejected(httpx_mock, tmp_path):
+    output = tmp_path / "addins.ndjson"
+    output.write_text("")
+    (tmp_path / "addins.ndjson.checkpoint.json").write_text(json.dumps({"Fingerprint": "x"}))
+
+    with pytest.raises(ValueError, match="different export"):
+        await export_addins(str(output))
+
+
+@pytest.mark.asyncio
+async def test_parquet_parts(httpx_mock, tmp_path, monkeypatch):
+    pq = pytest.importorskip("pyarrow.parquet")
+    monkeypatch.setattr(export, "PARQUET_ROWS_PER_PART", 10)
+    httpx_mock.add_callback(make_responder(), is_reusable=True)
+    output = tmp_path / "addins.parquet"
+
+    summary = await export_addins(
+        str(output), format="parquet", fields=["Id", "Categories"], page_size=5
+    )
+
+    parts = sorted(output.glob("part-*.parquet"))
+    assert len(parts) == 3
+    table = pq.read_table(parts[0])
+    assert table.column_names == ["Id", "Categories"]
+    assert json.loads(table.column("Categories")[0].as_py()) == CATALOG[0]["Categories"]
+    assert summary["Records"] == len(CATALOG)
+
+
+def test_export_path_stays_in_export_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(export, "EXPORT_DIR", str(tmp_path))
+
+    assert export_path("dump.ndjson") == tmp_path.resolve() / "dump.ndjson"
+    with pytest.raises(ValueError):
+        export_path("../escape.ndjson")
+
+
+def test_cli_subcommand(httpx_mock, tmp_path):
+    httpx_mock.add_callback(make_responder(), is_reusable=True)
+    output = tmp_path / "addins.ndjson"
+
+    result = CliRunner().invoke(
+        main, ["export", str(output), "--field", "Id", "--max-records", "7", "--page-size", "5"]
+    )
+
+    assert result.exit_code == 0, result.output
+    assert len(read_ndjson(output)) == 7
@@ -0,0 +1,119 @@
+"""
+Tests for the fuzzy title index
+===============================
+
+These tests run offline: the index is fed with sample records shaped like the
+Office Add-ins API responses documented in Office-AddIns-Search-API-Guide.md.
+"""
+
+from __future__ import annotations
+
+import pytest
+
+from office_addins_mcp_server.tools.addin_tools import search_addins, suggest_addins
+from office_addins_mcp_server.tools.fuzzy_index import TitleIndex, edit_distance, title_index
+
+
+SAMPLE_RECORDS = [
+    {"Id": "WA104381441", "Title": "Zoom for Outlook", "ProviderName": "Zoom Video Communications"},
+    {"Id": "WA104380121", "Title": "DocuSign for Word", "ProviderName": "DocuSign Inc."},
+    {"Id": "WA102957665", "Title": "Mini Calendar and Date Picker", "ProviderName": "VERTEX42"},
+    {"Id": "WA104379999", "Title": "Calendar Charts", "ProviderName": "VERTEX42"},
+]
+
+SEARCH_URL = "https://api.addins.omex.office.net/api/addins/search"
+
+
+@pytest.fixture
+def index() -> TitleIndex:
+    idx = TitleIndex()
+    idx.add_records(SAMPLE_RECORDS)
+    return idx
+
+
+class TestTitleIndex:
+    """Test suite for TitleIndex lookups."""
+
+    def test_prefix_completion(self, index):
+        results = index.suggest("zoo")
+        assert results[0]["Id"] == "WA104381441"
+        assert results[0]["Score"] == 1.0
+
+    def test_word_prefix_completion(self, index):
+        results = index.suggest("outl")
+        assert [r["Id"] for r in results][:1] == ["WA104381441"]
+
+    def test_typo_tolerant_lookup(self, index):
+        assert index.suggest("Zooom")[0]["Id"] == "WA104381441"
+        assert index.suggest("Docusing")[0]["Id"] == "WA104380121"
+
+    def test_provider_match_returns_all_addins(self, index):
+        results = index.suggest("vertex")
+        assert {r["Id"] for r in results} == {"WA102957665", "WA104379999"}
+        assert all(r["MatchedOn"] == "ProviderName" for r in results)
+
+    def test_limit_and_unknown_text(self, index):
+        assert len(index.suggest("calendar", limit=1)) == 1
+        assert index.suggest("xyzzy") == []
+
+    def test_correct_query(self, index):
+        assert index.correct_query("Docusing") == "Docusign"
+        assert index.correct_query("calender picker") == "calendar picker"
+        # Words left alone keep their case and punctuation.
+        assert index.correct_query('"Mini" calender, (Outlook)!') == '"Mini" calendar, (Outlook)!'
+        # Known words, inflections and short words are left alone.
+        assert index.correct_query("zoom") is None
+        assert index.correct_query("chart") is None
+        assert index.correct_query("zom") is None
+
+    def test_edit_distance_transposition(self):
+        assert edit_distance("docusing", "docusign") == 1
+        assert edit_distance("zooom", "zoom") == 1
+        assert edit_distance("abcdef", "uvwxyz", limit=2) == 3
+
+
+class TestSuggestAndAutocorrect:
+    """Test suite for the tool-level integration of the index."""
+
+    @pytest.mark.asyncio
+    async def test_search_feeds_index(self, httpx_mock):
+        httpx_mock.add_response(json={"TotalCount": 4, "Values": SAMPLE_RECORDS})
+        await search_addins(query="zoom")
+
+        result = await suggest_addins("Zooom")
+        assert result["TotalCount"] >= 1
+        assert result["Values"][0]["Id"] == "WA104381441"
+
+    @pytest.mark.asyncio
+    async def test_search_rewrites_query_without_results(self, httpx_mock):
+        title_index.add_records(SAMPLE_RECORDS)
+        httpx_mock.add_response(url=f"{SEARCH_URL}?qu=Docusing", json={"TotalCount": 0, "Values": []})
+        httpx_mock.add_response(
+            url=f"{SEARCH_URL}?qu=Docusign",
+            json={"TotalCount": 1, "Values": SAMPLE_RECORDS[1:2]},
+        )
+
+        result = await search_addins(query="Docusing")
+        assert result["QueryRewrite"] == {"Original": "Docusing", "Rewritten": "Docusign"}
+        assert result["TotalCount"] == 1
+
+    @pytest.mark.asyncio
+    async def test_query_with_results_is_not_rewritten(self, httpx_mock):
+        # "translate" is unknown to the index but a correctly spelled word.
+        title_index.add_records([{"Id": "WA1", "Title": "Translator for Outlook"}])
+        httpx_mock.add_response(
+            url=f"{SEARCH_URL}?qu=Translate+text",
+            json={"TotalCount": 1, "Values": [{"Id": "WA2", "Title": "Translate"}]},
+        )
+
+        result = await search_addins(query="Translate text")
+        assert "QueryRewrite" not in result
+        assert len(httpx_mock.get_requests()) == 1
+
+    @pytest.mark.asyncio
+    async def test_autocorrect_can_be_disabled(self, httpx_mock):
+        title_index.add_records(SAMPLE_RECORDS)
+        httpx_mock.add_response(url=f"{SEARCH_URL}?qu=Docusing", json={"TotalCount": 0, "Values": []})
+
+        result = await search_addins(query="Docusing", autocorrect=False)
+        assert "QueryRewrite" not in result
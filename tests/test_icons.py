@@ -0,0 +1,189 @@
+"""
+Tests for the icon proxy endpoint
+=================================
+
+These tests run offline: the store's image host and the Office Add-ins API
+are mocked, and the endpoint is called through an in-process ASGI transport.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import io
+
+import httpx
+import pytest
+from starlette.applications import Starlette
+from starlette.routing import Route
+
+from office_addins_mcp_server.tools.catalog import catalog
+from office_addins_mcp_server.web import icons
+from office_addins_mcp_server.web.compression import CompressionMiddleware
+from office_addins_mcp_server.web.icons import Icon, IconCache, icon_endpoint, sniff_image_type
+
+ICON_URL = "https://store-images.s-microsoft.com/image/apps.1"
+DETAILS_URL = "https://api.addins.omex.office.net/api/addins/details"
+PNG = b"\x89PNG\r\n\x1a\n" + b"\x00" * 64
+
+APP = Starlette(routes=[Route("/icons/{asset_id}", icon_endpoint)])
+
+
+@pytest.fixture(autouse=True)
+def cache(tmp_path, monkeypatch):
+    cache = IconCache(tmp_path / "icons")
+    monkeypatch.setattr(icons, "icon_cache", cache)
+    return cache
+
+
+async def get(path: str, app=APP, **headers) -> httpx.Response:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        return await client.get(path, headers=headers)
+
+
+@pytest.mark.asyncio
+async def test_icon_is_fetched_once_and_revalidated(httpx_mock):
+    catalog.add_records([{"Id": "WA1", "IconUrl": ICON_URL}])
+    httpx_mock.add_response(url=ICON_URL, content=PNG)
+
+    first, second = await asyncio.gather(get("/icons/WA1"), get("/icons/wa1"))
+
+    assert first.status_code == second.status_code == 200
+    assert first.content == PNG
+    assert first.headers["content-type"] == "image/png"
+    assert first.headers["etag"] == second.headers["etag"]
+    assert "max-age=" in first.headers["cache-control"]
+    assert len(httpx_mock.get_requests()) == 1
+
+    revalidated = await get("/icons/WA1", **{"If-None-Match": first.headers["etag"]})
+    assert revalidated.status_code == 304
+    assert revalidated.content == b""
+
+
+@pytest.mark.asyncio
+async def test_icon_url_falls_back_to_details(httpx_mock):
+    httpx_mock.add_response(
+        url=f"{DETAILS_URL}?assetid=WA2", json={"Value": {"Id": "WA2", "IconUrl": ICON_URL}}
+    )
+    httpx_mock.add_response(url=ICON_URL, content=PNG)
+
+    response = await get("/icons/WA2")
+
+    assert response.status_code == 200
+    assert response.content == PNG
+
+
+@pytest.mark.asyncio
+async def test_untrusted_hosts_and_non_images_are_refused(httpx_mock):
+    catalog.add_records(
+        [
+            {"Id": "WA3", "IconUrl": "https://evil.example.com/icon.png"},
+            {"Id": "WA4", "IconUrl": ICON_URL},
+        ]
+    )
+    httpx_mock.add_response(url=ICON_URL, content=b"<html>throttled</html>")
+
+    assert (await get("/icons/WA3")).status_code == 404
+    assert (await get("/icons/WA4")).status_code == 502
+    assert (await get("/icons/not-an-id")).status_code == 404
+    assert (await get("/icons/WA4?size=17")).status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_redirects_off_the_icon_hosts_are_not_followed(httpx_mock):
+    catalog.add_records([{"Id": "WA5", "IconUrl": ICON_URL}])
+    httpx_mock.add_response(
+        url=ICON_URL, status_code=302, headers={"Location": "http://169.254.169.254/latest"}
+    )
+
+    assert (await get("/icons/WA5")).status_code == 502
+    assert [str(request.url) for request in httpx_mock.get_requests()] == [ICON_URL]
+
+
+@pytest.mark.asyncio
+async def test_stale_icon_served_when_refresh_fails(httpx_mock, cache):
+    catalog.add_records([{"Id": "WA1", "IconUrl": ICON_URL}])
+    cache.write("WA1", Icon(PNG, "image/png", fetched_at=0.0))
+    httpx_mock.add_response(url=ICON_URL, status_code=503)
+    httpx_mock.add_response(url=ICON_URL, status_code=503)
+    httpx_mock.add_response(url=ICON_URL, status_code=503)
+
+    response = await get("/icons/WA1")
+
+    assert response.status_code == 200
+    assert response.content == PNG
+
+
+def test_cache_evicts_least_recently_used(tmp_path):
+    cache = IconCache(tmp_path, max_bytes=400)
+    for key in ("a", "b", "c"):
+        cache.write(key, Icon(b"x" * 100, "image/png", 1.0))
+    cache.read("a")
+    cache.write("d", Icon(b"x" * 100, "image/png", 1.0))
+
+    assert cache.read("b") is None
+    assert all(cache.read(key) is not None for key in ("a", "c", "d"))
+    assert cache.size <= 400
+
+    # The index is rebuilt from the directory by a new instance.
+    assert IconCache(tmp_path, max_bytes=400).size == cache.size
+
+
+@pytest.mark.parametrize(
+    "body, expected",
+    [
+        (PNG, "image/png"),
+        (b"\xff\xd8\xff\xe0", "image/jpeg"),
+        (b"RIFF\x00\x00\x00\x00WEBPVP8 ", "image/webp"),
+        (b'<?xml version="1.0"?><svg xmlns="http://www.w3.org/2000/svg"/>', "image/svg+xml"),
+        (b"<!doctype html>", None),
+    ],
+)
+def test_sniff_image_type(body, expected):
+    assert sniff_image_type(body) == expected
+
+
+@pytest.mark.asyncio
+async def test_compression_weakens_the_etag(httpx_mock):
+    svg = b'<svg xmlns="http://www.w3.org/2000/svg">' + b"<g/>" * 500 + b"</svg>"
+    catalog.add_records([{"Id": "WA5", "IconUrl": ICON_URL}])
+    httpx_mock.add_response(url=ICON_URL, content=svg)
+    app = CompressionMiddleware(APP, minimum_size=100)
+
+    response = await get("/icons/WA5", app=app, **{"Accept-Encoding": "gzip"})
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["etag"].startswith('W/"')
+    assert "default-src 'none'" in response.headers["content-security-policy"]
+    revalidated = await get("/icons/WA5", app=app, **{"If-None-Match": response.headers["etag"]})
+    assert revalidated.status_code == 304
+
+
+@pytest.mark.asyncio
+async def test_thumbnails(httpx_mock):
+    image_module = pytest.importorskip("PIL.Image")
+    output = io.BytesIO()
+    image_module.new("RGBA", (200, 100), (255, 0, 0, 255)).save(output, format="PNG")
+    catalog.add_records([{"Id": "WA6", "IconUrl": ICON_URL}])
+    httpx_mock.add_response(url=ICON_URL, content=output.getvalue())
+
+    response = await get("/icons/WA6?size=64")
+
+    assert response.status_code == 200
+    with image_module.open(io.BytesIO(response.content)) as thumbnail:
+        assert thumbnail.size == (64, 32)
+    original = await get("/icons/WA6")
+    assert original.headers["etag"] != response.headers["etag"]
+    assert len(httpx_mock.get_requests()) == 1
+
+
+@pytest.mark.asyncio
+async def test_thumbnail_without_pillow_serves_original(httpx_mock, monkeypatch):
+    monkeypatch.setattr(icons, "Image", None)
+    catalog.add_records([{"Id": "WA7", "IconUrl": ICON_URL}])
+    httpx_mock.add_response(url=ICON_URL, content=PNG)
+
+    response = await get("/icons/WA7?size=32")
+
+    assert response.status_code == 200
+    assert response.content == PNG
@@ -0,0 +1,141 @@
+"""
+Tests for the structured logging pipeline
+=========================================
+
+These tests run offline against mocked Office Add-ins API responses.
+"""
+
+from __future__ import annotations
+
+import io
+import json
+import logging
+import queue
+
+import pytest
+from mcp.server.fastmcp import FastMCP
+
+from office_addins_mcp_server.logs import (
+    CorrelationFilter,
+    NonBlockingQueueHandler,
+    SamplingFilter,
+    configure_logging,
+    dropped_total,
+    log_context,
+    shutdown_logging,
+)
+from office_addins_mcp_server.server import register_tools
+
+
+class Clock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def make_record(msg: str = "hello %s", level: int = logging.DEBUG, name: str = "test") -> logging.LogRecord:
+    return logging.LogRecord(name, level, __file__, 1, msg, ("world",), None)
+
+
+@pytest.fixture
+def output():
+    stream = io.StringIO()
+    configure_logging(level="DEBUG", stream=stream, json_format=True)
+    yield stream
+    configure_logging()
+
+
+def read_lines(stream: io.StringIO) -> list[dict]:
+    shutdown_logging()
+    return [json.loads(line) for line in stream.getvalue().splitlines()]
+
+
+def test_records_are_json_with_correlation_fields(output):
+    logger = logging.getLogger("office-addins-mcp.test")
+    with log_context(tool="search_addins", request_id=7) as context:
+        logger.debug("searching %r", "zoom", extra={"page": 2})
+    try:
+        raise RuntimeError("boom")
+    except RuntimeError:
+        logger.exception("failed")
+
+    first, second = read_lines(output)
+    assert first["message"] == "searching 'zoom'"
+    assert first["level"] == "DEBUG"
+    assert first["logger"] == "office-addins-mcp.test"
+    assert first["tool"] == "search_addins"
+    assert first["request_id"] == 7
+    assert first["call_id"] == context["call_id"]
+    assert first["page"] == 2
+    assert "call_id" not in second
+    assert "RuntimeError: boom" in second["exception"]
+
+
+def test_message_is_not_formatted_when_enqueued():
+    class Loud:
+        def __str__(self) -> str:
+            raise AssertionError("formatted while enqueueing")
+
+    records: queue.Queue = queue.Queue()
+    handler = NonBlockingQueueHandler(records)
+    handler.handle(logging.LogRecord("test", logging.INFO, __file__, 1, "value %s", (Loud(),), None))
+    record = records.get_nowait()
+    assert record.msg == "value %s"
+
+
+def test_full_queue_drops_instead_of_blocking():
+    handler = NonBlockingQueueHandler(queue.Queue(1))
+    before = dropped_total.value(reason="queue_full")
+    handler.handle(make_record())
+    handler.handle(make_record())
+    assert dropped_total.value(reason="queue_full") == before + 1
+
+
+def test_rate_limit_is_per_message_type_and_reports_drops():
+    clock = Clock()
+    limiter = SamplingFilter(rate=1, burst=2, clock=clock)
+
+    assert [limiter.filter(make_record("hot %s")) for _ in range(4)] == [True, True, False, False]
+    assert limiter.filter(make_record("rare %s")) is True
+    assert limiter.filter(make_record("hot %s", level=logging.WARNING)) is True
+
+    clock.now += 1
+    record = make_record("hot %s")
+    assert limiter.filter(record) is True
+    assert record.dropped == 2
+
+
+def test_sampling_applies_to_logger_and_children():
+    limiter = SamplingFilter(rate=0, sample={"office-addins-mcp.upstream": 0.0})
+    assert limiter.filter(make_record(name="office-addins-mcp.upstream.search")) is False
+    assert limiter.filter(make_record(name="office-addins-mcp")) is True
+    assert limiter.filter(make_record(name="office-addins-mcp.upstream", level=logging.ERROR)) is True
+
+
+def test_context_does_not_override_explicit_fields():
+    record = make_record()
+    record.tool = "explicit"
+    with log_context(tool="implicit"):
+        CorrelationFilter().filter(record)
+    assert record.tool == "explicit"
+    assert record.call_id
+
+
+@pytest.mark.asyncio
+async def test_tool_call_links_upstream_requests(output, httpx_mock):
+    httpx_mock.add_response(json={"Id": "WA104221234", "Title": "Zoom"})
+    mcp = FastMCP("test")
+    register_tools(mcp)
+
+    await mcp.call_tool("get_addin_details", {"asset_id": "WA104221234"})
+
+    lines = read_lines(output)
+    upstream = [line for line in lines if line["logger"] == "office-addins-mcp.upstream"]
+    tool = [line for line in lines if line["message"].startswith("Fetching add-in details")]
+    assert len(upstream) == 1
+    assert upstream[0]["outcome"] == "ok"
+    assert upstream[0]["tool"] == "get_addin_details"
+    assert upstream[0]["upstream_url"].endswith("/details")
+    assert upstream[0]["call_id"] == tool[0]["call_id"]
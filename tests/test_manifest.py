@@ -0,0 +1,115 @@
+"""
+Tests for add-in manifest retrieval
+===================================
+
+These tests run offline against a sample manifest in tests/data and mocked
+Office Add-ins API responses.
+"""
+
+from __future__ import annotations
+
+import hashlib
+from pathlib import Path
+
+import pytest
+
+from office_addins_mcp_server.tools import manifest
+from office_addins_mcp_server.tools.manifest import (
+    ManifestParser,
+    get_addin_manifest,
+    get_addin_manifests,
+    parse_manifest,
+)
+
+
+MANIFEST_XML = (Path(__file__).parent / "data" / "taskpane_manifest.xml").read_bytes()
+DETAILS_URL = "https://api.addins.omex.office.net/api/addins/details"
+MANIFEST_URL = "https://addinsinstallation.store.office.com/app/download?assetid={}&cmu=en-US"
+
+
+def _details(asset_id: str) -> dict:
+    return {"Value": {"Id": asset_id, "Title": asset_id, "ManifestUrl": MANIFEST_URL.format(asset_id)}}
+
+
+class TestParseManifest:
+    """Test suite for parse_manifest."""
+
+    def test_extracts_compact_summary(self):
+        summary = parse_manifest([MANIFEST_XML])
+
+        assert summary["Type"] == "TaskPaneApp"
+        assert summary["DisplayName"] == "Mini Calendar and Date Picker"
+        assert summary["Hosts"] == ["Workbook"]
+        assert summary["Permissions"] == "ReadWriteDocument"
+        assert summary["Requirements"]["Sets"] == [
+            {"Name": "ExcelApi", "MinVersion": "1.2"},
+            {"Name": "DialogApi", "MinVersion": "1.1"},
+        ]
+        assert summary["ExtensionPoints"] == [
+            {"Host": "Workbook", "Type": "PrimaryCommandSurface"},
+            {"Host": "Workbook", "Type": "ContextMenu"},
+        ]
+
+    def test_chunk_boundaries_do_not_matter(self):
+        chunks = [MANIFEST_XML[i:i + 7] for i in range(0, len(MANIFEST_XML), 7)]
+        assert parse_manifest(chunks) == parse_manifest([MANIFEST_XML])
+
+    @pytest.mark.parametrize("content", [b"", b"<OfficeApp>", b"<html></html>"])
+    def test_rejects_invalid_content(self, content):
+        with pytest.raises(ValueError):
+            parse_manifest([content])
+
+    def test_rejects_other_documents_before_they_end(self):
+        parser = ManifestParser()
+        with pytest.raises(ValueError, match="root <html>"):
+            parser.feed(b"<html><body>" + b"x" * 100)
+
+
+class TestGetAddinManifest:
+    """Test suite for manifest download and caching."""
+
+    @pytest.mark.asyncio
+    async def test_fetches_manifest_from_details(self, httpx_mock):
+        httpx_mock.add_response(url=f"{DETAILS_URL}?assetid=WA1", json=_details("WA1"))
+        httpx_mock.add_response(url=MANIFEST_URL.format("WA1"), content=MANIFEST_XML)
+
+        result = await get_addin_manifest("WA1")
+
+        assert result["AssetId"] == "WA1"
+        assert result["Size"] == len(MANIFEST_XML)
+        assert result["Manifest"]["Hosts"] == ["Workbook"]
+
+    @pytest.mark.asyncio
+    async def test_identical_content_shares_one_summary(self, httpx_mock):
+        for asset_id in ("WA1", "WA2"):
+            httpx_mock.add_response(url=f"{DETAILS_URL}?assetid={asset_id}", json=_details(asset_id))
+            httpx_mock.add_response(url=MANIFEST_URL.format(asset_id), content=MANIFEST_XML)
+
+        result = await get_addin_manifests(["WA1", "WA2", "WA1"])
+
+        assert [v["AssetId"] for v in result["Values"]] == ["WA1", "WA2"]
+        first, second = result["Values"]
+        assert first["Sha256"] == second["Sha256"] == hashlib.sha256(MANIFEST_XML).hexdigest()
+        assert len(manifest.manifest_parse_cache) == 1
+        assert result["Errors"] == {}
+
+    @pytest.mark.asyncio
+    async def test_batch_reports_errors(self, httpx_mock):
+        httpx_mock.add_response(url=f"{DETAILS_URL}?assetid=WA1", json=_details("WA1"))
+        httpx_mock.add_response(url=MANIFEST_URL.format("WA1"), content=b"not xml")
+        httpx_mock.add_response(url=f"{DETAILS_URL}?assetid=WA2", json={"Value": {"Id": "WA2"}})
+
+        result = await get_addin_manifests(["WA1", "WA2"])
+
+        assert result["TotalCount"] == 0
+        assert "malformed" in result["Errors"]["WA1"]
+        assert "no ManifestUrl" in result["Errors"]["WA2"]
+
+    @pytest.mark.asyncio
+    async def test_oversized_manifest_is_rejected(self, httpx_mock, monkeypatch):
+        monkeypatch.setattr(manifest, "MAX_MANIFEST_BYTES", 100)
+        httpx_mock.add_response(url=f"{DETAILS_URL}?assetid=WA1", json=_details("WA1"))
+        httpx_mock.add_response(url=MANIFEST_URL.format("WA1"), content=MANIFEST_XML)
+
+        with pytest.raises(ValueError, match="exceeds"):
+            await get_addin_manifest("WA1")
@@ -0,0 +1,153 @@
+"""
+Tests for the memory budget
+===========================
+"""
+
+from __future__ import annotations
+
+import httpx
+import pytest
+from starlette.applications import Starlette
+from starlette.routing import Mount
+
+from office_addins_mcp_server.memory_budget import (
+    ENTRY_OVERHEAD,
+    MemoryBudget,
+    approximate_size,
+    evictions_total,
+    memory_budget,
+)
+from office_addins_mcp_server.metrics import registry
+from office_addins_mcp_server.tools.cache import TTLCache
+from office_addins_mcp_server.tools.catalog import Catalog, catalog
+from office_addins_mcp_server.web.admin import admin_routes
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def record(asset_id: str, text: str = "") -> dict:
+    return {"Id": asset_id, "Title": f"Add-in {asset_id}", "Description": text, "Categories": ["Tools"]}
+
+
+def test_approximate_size_grows_with_content():
+    small = approximate_size({"Title": "x"})
+    large = approximate_size({"Title": "x" * 1000, "Tags": ["a", "b"]})
+    assert small > 0
+    assert large >= small + 1000
+
+
+def test_cache_tracks_bytes_only_once_registered():
+    clock = FakeClock()
+    cache = TTLCache(maxsize=10, ttl=10, clock=clock)
+    cache.set("a", "x" * 100)
+    assert cache.nbytes == 0
+
+    budget = MemoryBudget(limit=0)
+    budget.register("test", cache)
+    cache.set("b", "x" * 100)
+    size = cache.nbytes
+    assert size >= 100 + ENTRY_OVERHEAD
+    cache.set("b", "x" * 1000)
+    assert cache.nbytes == size + 900
+
+    clock.now = 5
+    cache.get("b")
+    clock.now = 20
+    # Expired entries are the first to go.
+    assert cache.coldest()[0] == float("inf")
+    cache.pop("b")
+    assert cache.nbytes == 0
+    # Eviction is disabled, so usage is only reported.
+    assert budget.enforce() == 0
+    assert budget.usage() == {"test": 0}
+
+
+def test_budget_evicts_idle_and_large_entries_across_caches():
+    clock = FakeClock()
+    hot = TTLCache(maxsize=100, ttl=1000, clock=clock)
+    cold = TTLCache(maxsize=100, ttl=1000, clock=clock)
+    budget = MemoryBudget(limit=10_000)
+    budget.register("hot", hot)
+    budget.register("cold", cold)
+
+    cold.set("old", "x" * 2000)
+    clock.now = 100
+    for i in range(5):
+        hot.set(i, "x" * 1000)
+    assert len(cold) == 1 and len(hot) == 5
+
+    # Growing past the budget evicts the idle entry of the other cache first.
+    hot.set("new", "x" * 1500)
+    assert len(cold) == 0
+    assert len(hot) == 6
+    assert budget.used <= budget.limit
+
+
+def test_weight_keeps_costly_entries_longer():
+    clock = FakeClock()
+    cheap = TTLCache(maxsize=100, ttl=1000, clock=clock)
+    costly = TTLCache(maxsize=100, ttl=1000, clock=clock)
+    budget = MemoryBudget(limit=0)
+    budget.register("cheap", cheap, weight=1.0)
+    budget.register("costly", costly, weight=10.0)
+    costly.set("a", "x" * 1000)
+    clock.now = 5
+    cheap.set("b", "x" * 1000)
+
+    # The costly entry is older but still worth more.
+    budget.limit = budget.used - 1
+    before = evictions_total.value(component="cheap")
+    assert budget.enforce() == 1
+    assert len(costly) == 1 and len(cheap) == 0
+    assert evictions_total.value(component="cheap") == before + 1
+
+
+def test_catalog_evictions_keep_the_index_consistent():
+    clock = FakeClock()
+    store = Catalog(clock=clock)
+    budget = MemoryBudget(limit=0)
+    budget.register("catalog", store)
+
+    store.add_records([record("WA1", "x" * 500)])
+    clock.now = 50
+    store.add_records([record("WA2"), record("WA3")])
+    assert store.nbytes > 500
+    version = store.version
+
+    budget.limit = budget.used - 1
+    budget.enforce()
+    assert "WA1" not in store
+    assert store.categories() == {"Tools": 2}
+    assert store.version > version
+
+    store.remove("WA2")
+    store.clear()
+    assert store.nbytes == 0 and store.coldest() is None
+
+
+@pytest.mark.asyncio
+async def test_usage_is_exported_and_served_to_admins():
+    catalog.add_records([record("WA9", "x" * 200)])
+
+    rendered = registry.render()
+    assert f'addins_memory_bytes{{component="catalog"}} {catalog.nbytes:g}' in rendered
+    assert "addins_memory_budget_bytes" in rendered
+
+    app = Starlette(routes=[Mount("/admin", routes=admin_routes("s3cret"))])
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        assert (await client.get("/admin/budget")).status_code == 401
+        response = await client.get("/admin/budget", headers={"Authorization": "Bearer s3cret"})
+
+    snapshot = response.json()
+    assert snapshot["BudgetBytes"] == memory_budget.limit
+    components = {component["Name"]: component for component in snapshot["Components"]}
+    assert {"catalog", "search", "details", "manifest_summaries"} <= set(components)
+    assert components["catalog"]["Entries"] == 1
+    assert components["catalog"]["Bytes"] == catalog.nbytes > 200
@@ -0,0 +1,55 @@
+"""
+Tests for the metrics registry
+==============================
+"""
+
+from __future__ import annotations
+
+import pytest
+
+from office_addins_mcp_server.metrics import Registry, _Metric
+
+
+def test_prometheus_rendering():
+    registry = Registry()
+    calls = registry.counter("calls_total", "Calls.", labelnames=("tool",))
+    latency = registry.histogram("latency_seconds", "Latency.", buckets=(0.1, 1.0))
+    registry.gauge("items", "Items.", callback=lambda: 3)
+
+    calls.inc(tool="search_addins")
+    calls.inc(2, tool="search_addins")
+    latency.observe(0.05)
+    latency.observe(0.5)
+
+    text = registry.render()
+    assert '# TYPE calls_total counter' in text
+    assert 'calls_total{tool="search_addins"} 3' in text
+    assert 'latency_seconds_bucket{le="0.1"} 1' in text
+    assert 'latency_seconds_bucket{le="+Inf"} 2' in text
+    assert 'latency_seconds_count 2' in text
+    assert 'items 3' in text
+
+
+def test_reregistering_returns_the_same_metric():
+    registry = Registry()
+    assert registry.counter("c", "C.") is registry.counter("c", "C.")
+
+
+def test_labelled_callback_gauge():
+    registry = Registry()
+    usage = {("search",): 2048, ("catalog",): 512}
+    gauge = registry.gauge("bytes", "Bytes.", labelnames=("component",), callback=lambda: usage)
+
+    assert gauge.value(component="search") == 2048
+    assert gauge.value(component="icons") == 0
+    text = registry.render()
+    assert 'bytes{component="catalog"} 512' in text
+    assert 'bytes{component="search"} 2048' in text
+
+
+def test_metric_without_samples_fails_when_created():
+    class Silent(_Metric):
+        kind = "gauge"
+
+    with pytest.raises(TypeError, match="samples"):
+        Silent("silent", "Silent.")
@@ -0,0 +1,129 @@
+"""
+Tests for snapshot cursors and next-page prefetch
+=================================================
+
+These tests run offline against mocked Office Add-ins API responses.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import base64
+import json
+
+import httpx
+import pytest
+
+from office_addins_mcp_server.tools import addin_tools
+from office_addins_mcp_server.tools.addin_tools import (
+    cursor_pages_total,
+    search_addins,
+    search_addins_multi,
+    snapshot_cache,
+)
+
+
+class Store:
+    """A mutable result list served through the search endpoint."""
+
+    def __init__(self, size: int) -> None:
+        self.ids = [f"WA{i:02d}" for i in range(size)]
+        self.requests: list[int] = []
+
+    def respond(self, request: httpx.Request) -> httpx.Response:
+        skip = int(request.url.params.get("skiptoitem", "0"))
+        top = int(request.url.params.get("top", "5"))
+        self.requests.append(skip)
+        values = [{"Id": i, "Title": i} for i in self.ids[skip:skip + top]]
+        return httpx.Response(200, json={"TotalCount": len(self.ids), "Values": values})
+
+
+async def settle() -> None:
+    """Let background prefetches finish."""
+    await asyncio.gather(*addin_tools._prefetch_tasks)
+
+
+@pytest.mark.asyncio
+async def test_sequential_pages_are_prefetched(httpx_mock):
+    store = Store(12)
+    httpx_mock.add_callback(store.respond, is_reusable=True)
+    prefetched = cursor_pages_total.value(source="prefetched")
+
+    ids = []
+    page = await search_addins(query="calendar", top=5)
+    while True:
+        ids += [a["Id"] for a in page["Values"]]
+        if "NextCursor" not in page:
+            break
+        await settle()
+        page = await search_addins(cursor=page["NextCursor"])
+
+    assert ids == store.ids
+    assert store.requests == [0, 5, 10]
+    assert cursor_pages_total.value(source="prefetched") - prefetched == 2
+
+
+@pytest.mark.asyncio
+async def test_pages_stay_consistent_when_store_shifts(httpx_mock, monkeypatch):
+    monkeypatch.setattr(addin_tools, "_prefetch_page", lambda *args: None)
+    store = Store(10)
+    httpx_mock.add_callback(store.respond, is_reusable=True)
+
+    first = await search_addins(query="calendar", top=5)
+    # A new add-in appears at the top, shifting every later result by one.
+    store.ids.insert(0, "WA-new")
+    second = await search_addins(cursor=first["NextCursor"])
+
+    assert [a["Id"] for a in second["Values"]] == ["WA05", "WA06", "WA07", "WA08"]
+    assert second["TotalCount"] == 10
+    # Re-reading a page of the snapshot returns the same page.
+    again = await search_addins(cursor=first["NextCursor"])
+    assert again["Values"] == second["Values"]
+
+
+@pytest.mark.asyncio
+async def test_invalid_and_expired_cursors(httpx_mock):
+    store = Store(10)
+    httpx_mock.add_callback(store.respond, is_reusable=True)
+    first = await search_addins(query="calendar", top=5)
+    await settle()
+
+    with pytest.raises(ValueError, match="invalid"):
+        await search_addins(cursor="garbage")
+    snapshot_cache.clear()
+    with pytest.raises(ValueError, match="expired"):
+        await search_addins(cursor=first["NextCursor"])
+
+
+@pytest.mark.asyncio
+async def test_cursor_carries_no_request_state(httpx_mock, monkeypatch):
+    monkeypatch.setattr(addin_tools, "_prefetch_page", lambda *args: None)
+    monkeypatch.setattr(addin_tools, "MAX_SNAPSHOT_PAGE_SIZE", 4)
+    store = Store(20)
+    httpx_mock.add_callback(store.respond, is_reusable=True)
+    first = await search_addins(query="calendar", top=8, locale="fr-FR")
+
+    cursor = first["NextCursor"]
+    state = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    assert set(state) == {"s", "o"}
+    # Request fields added to a cursor by the caller are ignored.
+    state.update(p={"qu": "other"}, h={"X-Injected": "1"}, n=10_000)
+    forged = base64.urlsafe_b64encode(json.dumps(state).encode()).decode()
+    await search_addins(cursor=forged)
+
+    request = httpx_mock.get_requests()[-1]
+    assert request.url.params["qu"] == "calendar"
+    assert request.url.params["top"] == "4"
+    assert request.headers["accept-language"].startswith("fr-FR")
+    assert "x-injected" not in request.headers
+
+
+@pytest.mark.asyncio
+async def test_multi_search_does_not_paginate(httpx_mock):
+    store = Store(10)
+    httpx_mock.add_callback(store.respond, is_reusable=True)
+
+    await search_addins_multi([{"query": "calendar", "top": 5}])
+
+    assert store.requests == [0]
+    assert len(snapshot_cache) == 0
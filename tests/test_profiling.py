@@ -0,0 +1,85 @@
+"""
+Tests for the profiling hooks and admin diagnostics endpoints
+=============================================================
+"""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+
+import httpx
+import pytest
+from starlette.applications import Starlette
+from starlette.routing import Mount
+
+from office_addins_mcp_server.profiling import StackSampler, dump_tasks, trace_allocations
+from office_addins_mcp_server.web.admin import admin_routes
+
+
+def busy_wait(seconds: float) -> None:
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        pass
+
+
+def test_sampler_records_folded_stacks():
+    sampler = StackSampler(threading.get_ident(), interval=0.001)
+    sampler.start()
+    busy_wait(0.1)
+    sampler.stop()
+
+    lines = sampler.folded().splitlines()
+    stack, count = lines[0].rsplit(" ", 1)
+    assert int(count) > 0
+    assert stack.split(";")[-1] == "tests.test_profiling.busy_wait"
+    assert not sampler.running
+
+
+@pytest.mark.asyncio
+async def test_task_dump_and_allocation_trace():
+    async def sleeper() -> None:
+        await asyncio.sleep(10)
+
+    task = asyncio.create_task(sleeper(), name="sleeper")
+    await asyncio.sleep(0)
+    try:
+        tasks = {t["Name"]: t for t in dump_tasks()}
+        assert tasks["sleeper"]["State"] == "pending"
+        assert "sleeper" in tasks["sleeper"]["Stack"][0]
+
+        async def allocate() -> list:
+            await asyncio.sleep(0.01)
+            return [bytearray(1024) for _ in range(200)]
+
+        keep = asyncio.create_task(allocate())
+        result = await trace_allocations(0.05, top=5)
+        assert len(result["Top"]) <= 5
+        assert result["PeakBytes"] >= 200 * 1024
+        assert keep.done()
+    finally:
+        task.cancel()
+
+
+@pytest.mark.asyncio
+async def test_admin_routes_require_token():
+    app = Starlette(routes=[Mount("/admin", routes=admin_routes("s3cret"))])
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        assert (await client.get("/admin/tasks")).status_code == 401
+        wrong = await client.get("/admin/tasks", headers={"Authorization": "Bearer nope"})
+        assert wrong.status_code == 401
+
+        auth = {"Authorization": "Bearer s3cret"}
+        tasks = await client.get("/admin/tasks", headers=auth)
+        assert tasks.status_code == 200
+        assert tasks.json()["TotalCount"] >= 1
+
+        profile = await client.get("/admin/profile?seconds=0.1&interval=0.002", headers=auth)
+        assert profile.status_code == 200
+        assert int(profile.headers["X-Profile-Samples"]) > 0
+        assert profile.text.strip()
+
+        bad = await client.get("/admin/profile?seconds=9999", headers=auth)
+        assert bad.status_code == 400
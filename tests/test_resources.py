@@ -0,0 +1,102 @@
+"""
+Tests for the catalog MCP resources
+===================================
+
+These tests run offline: the MCP client and server are connected through
+in-memory streams and API responses are mocked.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+
+import httpx
+import mcp.types as types
+import pytest
+from mcp.shared.memory import create_connected_server_and_client_session
+
+from office_addins_mcp_server import resources
+from office_addins_mcp_server.server import create_mcp_server
+from office_addins_mcp_server.tools.addin_tools import search_addins
+from office_addins_mcp_server.tools.catalog import catalog
+
+
+def record(asset_id: str, category: str = "Productivity", **fields) -> dict:
+    return {
+        "Id": asset_id,
+        "Title": f"Add-in {asset_id}",
+        "Categories": [{"Id": category, "Title": category}],
+        **fields,
+    }
+
+
+def read_json(result: types.ReadResourceResult) -> dict:
+    return json.loads(result.contents[0].text)
+
+
+@pytest.mark.asyncio
+async def test_category_listing_pages_with_cursor(monkeypatch):
+    monkeypatch.setattr(resources, "CATEGORY_PAGE_SIZE", 2)
+    catalog.add_records([record(f"WA{i}") for i in range(1, 6)])
+    server = create_mcp_server()
+
+    async with create_connected_server_and_client_session(server._mcp_server) as client:
+        ids = []
+        uri = "addins://category/Productivity"
+        while uri:
+            page = read_json(await client.read_resource(uri))
+            assert page["TotalCount"] == 5
+            ids += [value["Id"] for value in page["Values"]]
+            uri = page["NextUri"]
+
+        categories = read_json(await client.read_resource("addins://categories"))
+
+    assert ids == ["WA1", "WA2", "WA3", "WA4", "WA5"]
+    assert categories["Values"] == [
+        {"Id": "Productivity", "Count": 5, "Uri": "addins://category/Productivity"}
+    ]
+
+
+@pytest.mark.asyncio
+async def test_addin_resource_fetches_unknown_records_once(httpx_mock):
+    httpx_mock.add_response(json={"Value": record("WA7", Title="Zoom")})
+    server = create_mcp_server()
+
+    async with create_connected_server_and_client_session(server._mcp_server) as client:
+        first = read_json(await client.read_resource("addin://WA7"))
+        second = read_json(await client.read_resource("addin://WA7"))
+
+    assert first["Title"] == second["Title"] == "Zoom"
+    assert len(httpx_mock.get_requests()) == 1
+
+
+@pytest.mark.asyncio
+async def test_subscribers_are_notified_of_changes(httpx_mock):
+    catalog.add_records([record("WA1", Rating=4.0)])
+    httpx_mock.add_response(
+        json={"TotalCount": 2, "Values": [record("WA1", Rating=4.5), record("WA2")]}
+    )
+    updated: list[str] = []
+    received = asyncio.Event()
+
+    async def on_message(message) -> None:
+        if isinstance(message, types.ServerNotification) and isinstance(
+            message.root, types.ResourceUpdatedNotification
+        ):
+            updated.append(str(message.root.params.uri))
+            if len(updated) == 2:
+                received.set()
+
+    server = create_mcp_server()
+    async with create_connected_server_and_client_session(
+        server._mcp_server, message_handler=on_message
+    ) as client:
+        await client.subscribe_resource("addin://WA1")
+        await client.subscribe_resource("addins://category/Productivity")
+        await client.subscribe_resource("addin://WA3")
+
+        await search_addins(query="zoom")
+        await asyncio.wait_for(received.wait(), 1.0)
+
+    assert sorted(updated) == ["addin://WA1", "addins://category/Productivity"]
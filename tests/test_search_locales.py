@@ -0,0 +1,96 @@
+"""
+Tests for locale-aware and multi-locale search
+==============================================
+
+These tests run offline against mocked Office Add-ins API responses.
+"""
+
+from __future__ import annotations
+
+import asyncio
+
+import httpx
+import pytest
+
+from office_addins_mcp_server.tools.addin_tools import locale_params, search_addins
+
+
+def _addin(asset_id: str, title: str) -> dict:
+    return {"Id": asset_id, "Title": title, "ProductId": f"guid-{asset_id}"}
+
+
+PAGES = {
+    "en-US": [_addin("WA1", "Calendar"), _addin("WA2", "Scheduler")],
+    "de-DE": [_addin("WA3", "Kalender"), _addin("WA1", "Calendar")],
+    "ja-JP": [_addin("WA1", "Calendar")],
+}
+
+
+def test_locale_params():
+    params, headers = locale_params("es-ES")
+    assert params == {"lc": "es-ES", "ui": "es", "omkt": "es-es", "rs": "ES"}
+    assert headers == {"Accept-Language": "es-ES,es;q=0.9"}
+
+
+@pytest.mark.asyncio
+async def test_single_locale_is_sent_upstream(httpx_mock):
+    httpx_mock.add_response(json={"TotalCount": 0, "Values": []})
+
+    await search_addins(query="calendario", locale="es-ES")
+
+    request = httpx_mock.get_request()
+    assert request.url.params["lc"] == "es-ES"
+    assert request.url.params["rs"] == "ES"
+    assert request.headers["Accept-Language"] == "es-ES,es;q=0.9"
+
+
+@pytest.mark.asyncio
+async def test_multi_locale_merge_runs_concurrently(httpx_mock):
+    in_flight = 0
+    peak = 0
+
+    async def respond(request: httpx.Request) -> httpx.Response:
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.05)
+        in_flight -= 1
+        values = PAGES[request.url.params["lc"]]
+        return httpx.Response(200, json={"TotalCount": len(values), "Values": values})
+
+    httpx_mock.add_callback(respond, is_reusable=True)
+
+    result = await search_addins(query="calendar", locales=["en-US", "de-DE", "ja-JP"])
+
+    assert peak == 3
+    assert [a["Id"] for a in result["Values"]] == ["WA1", "WA3", "WA2"]
+    assert result["Values"][0]["Locales"] == ["en-US", "de-DE", "ja-JP"]
+    assert result["TotalCount"] == 3
+    assert result["LocaleTotals"] == {"en-US": 2, "de-DE": 2, "ja-JP": 1}
+
+    # Each locale is cached separately, so a repeat costs no requests.
+    await search_addins(query="calendar", locales=["ja-JP", "en-US"])
+    assert len(httpx_mock.get_requests()) == 3
+
+
+@pytest.mark.asyncio
+async def test_multi_locale_partial_failure(httpx_mock):
+    def respond(request: httpx.Request) -> httpx.Response:
+        if request.url.params["lc"] == "de-DE":
+            return httpx.Response(503)
+        return httpx.Response(200, json={"TotalCount": 2, "Values": PAGES["en-US"]})
+
+    httpx_mock.add_callback(respond, is_reusable=True)
+
+    result = await search_addins(query="calendar", locales=["en-US", "de-DE"])
+
+    assert [a["Id"] for a in result["Values"]] == ["WA1", "WA2"]
+    assert "de-DE" in result["LocaleErrors"]
+
+
+@pytest.mark.asyncio
+async def test_multi_locale_all_failed_raises(httpx_mock):
+    httpx_mock.add_response(status_code=500, is_reusable=True)
+
+    with pytest.raises(httpx.HTTPStatusError):
+        await search_addins(query="calendar", locales=["en-US", "de-DE"])
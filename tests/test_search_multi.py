@@ -0,0 +1,96 @@
+"""
+Tests for batched multi-query search
+====================================
+
+These tests run offline against mocked Office Add-ins API responses.
+"""
+
+from __future__ import annotations
+
+import httpx
+import pytest
+
+from office_addins_mcp_server.tools.addin_tools import search_addins_multi
+
+
+RESULTS = {
+    "calendar": ["WA1", "WA2", "WA3"],
+    "scheduling": ["WA2", "WA4"],
+    "booking": ["WA4", "WA2"],
+}
+
+
+def respond(request: httpx.Request) -> httpx.Response:
+    query = request.url.params["qu"]
+    if query == "broken":
+        return httpx.Response(500)
+    values = [{"Id": asset_id, "Title": asset_id} for asset_id in RESULTS[query]]
+    return httpx.Response(200, json={"TotalCount": len(values), "Values": values})
+
+
+@pytest.mark.asyncio
+async def test_dedupes_and_reports_matches(httpx_mock):
+    httpx_mock.add_callback(respond, is_reusable=True)
+
+    result = await search_addins_multi(
+        [{"query": "calendar"}, {"query": "scheduling"}, {"query": "booking"}]
+    )
+
+    assert [a["Id"] for a in result["Values"]] == ["WA1", "WA2", "WA3", "WA4"]
+    assert result["TotalCount"] == 4
+    wa2 = result["Values"][1]
+    assert wa2["Matches"] == [
+        {"Query": 0, "Rank": 2},
+        {"Query": 1, "Rank": 1},
+        {"Query": 2, "Rank": 2},
+    ]
+    assert [q["TotalCount"] for q in result["Queries"]] == [3, 2, 2]
+
+
+@pytest.mark.asyncio
+async def test_rrf_fusion_ranks_consensus_first(httpx_mock):
+    httpx_mock.add_callback(respond, is_reusable=True)
+
+    result = await search_addins_multi(
+        [{"query": "calendar"}, {"query": "scheduling"}, {"query": "booking"}],
+        fusion="rrf",
+    )
+
+    ids = [a["Id"] for a in result["Values"]]
+    assert ids[:2] == ["WA2", "WA4"]
+    scores = [a["FusedScore"] for a in result["Values"]]
+    assert scores == sorted(scores, reverse=True)
+
+
+@pytest.mark.asyncio
+async def test_identical_specs_share_one_request(httpx_mock):
+    httpx_mock.add_callback(respond, is_reusable=True)
+
+    await search_addins_multi([{"query": "calendar"}, {"query": "calendar"}])
+
+    assert len(httpx_mock.get_requests()) == 1
+
+
+@pytest.mark.asyncio
+async def test_partial_failure_is_reported(httpx_mock):
+    httpx_mock.add_callback(respond, is_reusable=True)
+
+    result = await search_addins_multi([{"query": "calendar"}, {"query": "broken"}])
+
+    assert result["TotalCount"] == 3
+    assert "HTTPStatusError" in result["Queries"][1]["Error"]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "queries, fusion",
+    [
+        ([], None),
+        ([{"query": "a"}] * 11, None),
+        ([{"qu": "a"}], None),
+        ([{"query": "a"}], "borda"),
+    ],
+)
+async def test_invalid_arguments(queries, fusion):
+    with pytest.raises(ValueError):
+        await search_addins_multi(queries, fusion=fusion)
@@ -0,0 +1,211 @@
+"""
+Tests for catalog statistics
+============================
+
+These tests run offline against records added directly to the local catalog
+or returned by mocked Office Add-ins API responses.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import random
+import time
+
+import pytest
+
+from office_addins_mcp_server.tools import stats
+from office_addins_mcp_server.tools.catalog import catalog
+from office_addins_mcp_server.tools.stats import addin_stats
+
+RECORDS = [
+    {
+        "Id": "WA1",
+        "ProviderName": "Contoso",
+        "Rating": 4.0,
+        "NumberOfVotes": 10,
+        "DateReleased": "2021-03-01T00:00:00",
+        "Pricing": {"Category": "Free"},
+        "Categories": [{"Id": "Productivity"}, {"Id": "Communication"}],
+        "SupportedClients": [{"Client": "Win32_Outlook"}, {"Client": "Mac_Outlook"}],
+    },
+    {
+        "Id": "WA2",
+        "ProviderName": "Contoso",
+        "Rating": 2.0,
+        "NumberOfVotes": 30,
+        "DateReleased": "2022-05-01T00:00:00",
+        "Pricing": {"Category": "Paid"},
+        "Categories": [{"Id": "Productivity"}],
+        "SupportedClients": [{"Client": "Win32_Excel"}],
+    },
+    {
+        "Id": "WA3",
+        "ProviderName": "Fabrikam",
+        "Rating": 5.0,
+        "NumberOfVotes": 0,
+        "DateReleased": "2022-01-01T00:00:00",
+        "Pricing": {"Category": "Free"},
+        "Categories": [{"Id": "Productivity"}],
+        "SupportedClients": [{"Client": "Win32_Outlook"}],
+    },
+    {
+        "Id": "WA4",
+        "ProviderName": "Fabrikam",
+        "Rating": 3.0,
+        "NumberOfVotes": 5,
+        "Pricing": {"Category": "Free"},
+        "Categories": [],
+        "SupportedClients": [{"Client": "Win32_Word"}],
+    },
+]
+
+
+@pytest.fixture(params=["arrow", "python"])
+def engine(request, monkeypatch):
+    if request.param == "arrow":
+        pytest.importorskip("pyarrow")
+    else:
+        monkeypatch.setattr(stats, "pyarrow", None)
+    return request.param
+
+
+@pytest.mark.asyncio
+async def test_group_by_category(engine):
+    catalog.add_records(RECORDS)
+
+    result = await addin_stats(group_by="category")
+
+    assert result["GroupBy"] == "category"
+    assert result["CatalogRecords"] == 4
+    assert result["TotalCount"] == 2
+    productivity, communication = result["Values"]
+    assert productivity == {
+        "Key": "Productivity",
+        "Count": 3,
+        "MeanRating": 3.0,
+        "MedianRating": 3.0,
+        "WeightedRating": 2.5,
+        "Votes": 40,
+        "Released": {"2021": 1, "2022": 2},
+    }
+    assert communication["Key"] == "Communication"
+    assert communication["Count"] == 1
+
+
+@pytest.mark.asyncio
+async def test_filters_and_ordering(engine):
+    catalog.add_records(RECORDS)
+
+    result = await addin_stats(
+        group_by="provider", free=True, clients=["outlook"], metrics=["mean_rating"]
+    )
+    assert result["Values"] == [
+        {"Key": "Contoso", "Count": 1, "MeanRating": 4.0},
+        {"Key": "Fabrikam", "Count": 1, "MeanRating": None},
+    ]
+
+    result = await addin_stats(group_by="client", order_by="weighted_rating", top=2)
+    assert [v["Key"] for v in result["Values"]] == ["Mac_Outlook", "Win32_Outlook"]
+    assert result["TotalCount"] == 4
+
+    result = await addin_stats(group_by="pricing", categories=["productivity"], min_votes=1)
+    assert [(v["Key"], v["Count"]) for v in result["Values"]] == [("Free", 1), ("Paid", 1)]
+
+
+class Clock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.mark.asyncio
+async def test_columns_follow_catalog_changes_after_max_staleness(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(stats.columns_cache, "_clock", clock)
+    monkeypatch.setattr(stats.columns_cache, "max_staleness", 30.0)
+    catalog.add_records(RECORDS[:2])
+    assert (await addin_stats(group_by="pricing"))["CatalogRecords"] == 2
+    rebuilds = stats.column_rebuilds_total.value()
+
+    catalog.add_records(RECORDS[2:])
+    catalog.remove("WA1")
+    clock.now = 10
+    # Within the staleness window the previous columns are served.
+    assert (await addin_stats(group_by="pricing"))["CatalogRecords"] == 2
+    assert stats.column_rebuilds_total.value() == rebuilds
+
+    clock.now = 31
+    result = await addin_stats(group_by="pricing", order_by="key")
+    assert result["CatalogRecords"] == 3
+    assert [(v["Key"], v["Count"]) for v in result["Values"]] == [("Free", 2), ("Paid", 1)]
+    await addin_stats(group_by="client")
+    assert stats.column_rebuilds_total.value() == rebuilds + 1
+
+
+@pytest.mark.asyncio
+async def test_refresh_scans_the_catalog(httpx_mock):
+    # Columns built before the scan are not served after it.
+    await addin_stats(group_by="provider")
+    httpx_mock.add_response(json={"TotalCount": 2, "Values": RECORDS[:2]})
+
+    result = await addin_stats(group_by="provider", refresh=True)
+
+    assert result["CatalogRecords"] == 2
+    assert result["BaselineAt"] is not None
+
+
+@pytest.mark.asyncio
+async def test_concurrent_refreshes_share_one_scan(httpx_mock):
+    httpx_mock.add_response(json={"TotalCount": 2, "Values": RECORDS[:2]})
+
+    results = await asyncio.gather(
+        *(addin_stats(group_by="pricing", refresh=True) for _ in range(5))
+    )
+
+    assert len(httpx_mock.get_requests()) == 1
+    assert {result["CatalogRecords"] for result in results} == {2}
+
+
+@pytest.mark.asyncio
+async def test_rejects_bad_arguments():
+    with pytest.raises(ValueError):
+        await addin_stats(group_by="color")
+    with pytest.raises(ValueError):
+        await addin_stats(metrics=["mode"])
+    with pytest.raises(ValueError):
+        await addin_stats(order_by="size")
+    with pytest.raises(ValueError):
+        await addin_stats(top=0)
+
+
+@pytest.mark.asyncio
+async def test_engines_agree_on_a_large_catalog(monkeypatch):
+    pytest.importorskip("pyarrow")
+    rng = random.Random(7)
+    clients = ["Win32_Outlook", "Mac_Outlook", "Win32_Excel", "Win32_Word", "TeamsHost"]
+    catalog.add_records(
+        {
+            "Id": f"WA{100000000 + i}",
+            "ProviderName": f"Provider {i % 300}",
+            "Rating": rng.choice([None, 1.0, 2.5, 3.0, 4.5, 5.0]),
+            "NumberOfVotes": rng.randrange(0, 500),
+            "DateReleased": f"{rng.randrange(2015, 2026)}-01-01T00:00:00",
+            "Pricing": {"Category": rng.choice(["Free", "Paid", "Freemium"])},
+            "Categories": [{"Id": f"Cat{rng.randrange(20)}"} for _ in range(rng.randrange(3))],
+            "SupportedClients": [{"Client": c} for c in rng.sample(clients, rng.randrange(1, 4))],
+        }
+        for i in range(10000)
+    )
+
+    for group in stats.STATS_GROUPS:
+        started = time.perf_counter()
+        arrow = await addin_stats(group_by=group, clients=["outlook"], top=500)
+        if group == stats.STATS_GROUPS[-1]:
+            assert time.perf_counter() - started < 0.5
+        with monkeypatch.context() as patch:
+            patch.setattr(stats, "pyarrow", None)
+            python = await addin_stats(group_by=group, clients=["outlook"], top=500)
+        assert arrow == python
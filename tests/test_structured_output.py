@@ -0,0 +1,143 @@
+"""
+Tests for the structured output of the MCP tools
+================================================
+
+These tests run offline: API responses are mocked, and the MCP client and
+server are connected through in-memory streams.
+"""
+
+from __future__ import annotations
+
+import json
+
+import pytest
+from mcp import types
+from mcp.server.fastmcp import FastMCP
+from mcp.shared.memory import create_connected_server_and_client_session
+
+from office_addins_mcp_server import structured_output
+from office_addins_mcp_server.server import create_mcp_server, register_tools
+from office_addins_mcp_server.structured_output import (
+    OutputValidator,
+    install_structured_output,
+    validation_failures_total,
+)
+
+SEARCH_URL = "https://api.addins.omex.office.net/api/addins/search"
+
+RECORD = {
+    "Id": "WA104381441",
+    "Title": "Zoom for Outlook",
+    "Rating": 4,
+    "Pricing": {"Category": "Free", "Price": "Free"},
+    "SupportedClients": [{"Client": "Win32_Outlook", "DisplayName": "Outlook on Windows"}],
+    "SomethingNew": {"Added": "later"},
+}
+
+
+def server_with(mode: str, sample_rate: float = 1.0) -> FastMCP:
+    mcp = FastMCP("test")
+    register_tools(mcp)
+    install_structured_output(mcp, OutputValidator(mode, sample_rate))
+    return mcp
+
+
+@pytest.mark.asyncio
+async def test_typed_tools_list_output_schemas():
+    server = create_mcp_server()
+    async with create_connected_server_and_client_session(server._mcp_server) as client:
+        tools = {tool.name: tool for tool in (await client.list_tools()).tools}
+
+    search = tools["search_addins"].outputSchema
+    assert search["required"] == ["TotalCount", "Values"]
+    assert {"QueryRewrite", "NextCursor", "LocaleTotals"} <= set(search["properties"])
+    assert "Value" in tools["get_addin_details"].outputSchema["properties"]
+    assert tools["suggest_addins"].outputSchema is None
+
+
+@pytest.mark.asyncio
+async def test_result_is_returned_as_is(httpx_mock):
+    payload = {"TotalCount": 1, "Values": [RECORD]}
+    httpx_mock.add_response(url=f"{SEARCH_URL}?qu=zoom", json=payload)
+
+    server = create_mcp_server()
+    async with create_connected_server_and_client_session(server._mcp_server) as client:
+        result = await client.call_tool("search_addins", {"query": "zoom", "autocorrect": False})
+
+    assert not result.isError
+    # Unset optional fields are not filled in and unknown fields are kept.
+    assert result.structuredContent == payload
+    assert json.loads(result.content[0].text) == payload
+
+
+@pytest.mark.asyncio
+async def test_strict_mode_rejects_mismatching_results(httpx_mock):
+    httpx_mock.add_response(json={"TotalCount": "many", "Values": [RECORD]})
+    before = validation_failures_total.value(tool="search_addins")
+
+    mcp = server_with("strict")
+    async with create_connected_server_and_client_session(mcp._mcp_server) as client:
+        result = await client.call_tool("search_addins", {"query": "zoom", "autocorrect": False})
+
+    assert result.isError
+    assert "Output validation error" in result.content[0].text
+    assert validation_failures_total.value(tool="search_addins") == before + 1
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("mode, failures", [("sample", 1), ("off", 0)])
+async def test_lenient_modes_return_mismatching_results(httpx_mock, mode, failures):
+    httpx_mock.add_response(json={"TotalCount": "many", "Values": [RECORD]})
+    before = validation_failures_total.value(tool="search_addins")
+
+    # Called on the server directly: MCP clients validate structured content too.
+    mcp = server_with(mode)
+    request = types.CallToolRequest(
+        method="tools/call",
+        params=types.CallToolRequestParams(
+            name="search_addins", arguments={"query": "zoom", "autocorrect": False}
+        ),
+    )
+    result = (await mcp._mcp_server.request_handlers[types.CallToolRequest](request)).root
+
+    assert not result.isError
+    assert result.structuredContent["TotalCount"] == "many"
+    assert validation_failures_total.value(tool="search_addins") == before + failures
+
+
+def test_sample_rate():
+    draws = iter([0.5, 0.05])
+    validator = OutputValidator("sample", 0.1, rng=lambda: next(draws))
+    calls = []
+
+    class Model:
+        @staticmethod
+        def model_validate(value):
+            calls.append(value)
+
+    validator.check("tool", Model, 1)
+    validator.check("tool", Model, 2)
+    assert calls == [2]
+
+    with pytest.raises(ValueError):
+        OutputValidator("loose")
+
+
+@pytest.mark.asyncio
+async def test_tool_errors_are_reported():
+    server = create_mcp_server()
+    async with create_connected_server_and_client_session(server._mcp_server) as client:
+        result = await client.call_tool("get_addin_details", {"asset_id": "not-an-id"})
+
+    assert result.isError
+    assert "not found" in result.content[0].text
+
+
+
+def test_default_mode_is_read_when_the_validator_is_created(monkeypatch):
+    # The suite runs strict (see conftest); deployments choose their own mode.
+    assert OutputValidator().mode == "strict"
+    monkeypatch.setattr(structured_output, "OUTPUT_VALIDATION", "sample")
+    monkeypatch.setattr(structured_output, "OUTPUT_VALIDATION_SAMPLE", 0.25)
+    validator = OutputValidator()
+    assert (validator.mode, validator.sample_rate) == ("sample", 0.25)
@@ -0,0 +1,105 @@
+"""
+Tests for the shared Office Add-ins API client
+==============================================
+
+These tests run offline against mocked responses and cover deadlines,
+retries and cancellation.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from types import SimpleNamespace
+
+import httpx
+import pytest
+from mcp.types import RequestParams
+
+from office_addins_mcp_server.server import DEFAULT_TOOL_TIMEOUT, tool_timeout
+from office_addins_mcp_server.tools import upstream
+
+
+async def _slow(request: httpx.Request) -> httpx.Response:
+    await asyncio.sleep(5)
+    return httpx.Response(200, json={})
+
+
+@pytest.mark.asyncio
+async def test_deadline_bounds_the_request(httpx_mock):
+    httpx_mock.add_callback(_slow)
+
+    started = time.monotonic()
+    with upstream.deadline(0.1):
+        with pytest.raises(upstream.DeadlineExceeded):
+            await upstream.get_json("search")
+
+    assert time.monotonic() - started < 1
+    assert upstream.get_limiter()._value == upstream.MAX_CONCURRENCY
+
+
+@pytest.mark.asyncio
+async def test_expired_deadline_sends_nothing(httpx_mock):
+    with upstream.deadline(-1):
+        with pytest.raises(upstream.DeadlineExceeded):
+            await upstream.get_json("search")
+
+    assert httpx_mock.get_requests() == []
+
+
+@pytest.mark.asyncio
+async def test_nested_deadline_only_shortens():
+    with upstream.deadline(1):
+        with upstream.deadline(10):
+            assert upstream.remaining() <= 1
+    assert upstream.remaining() is None
+
+
+@pytest.mark.asyncio
+async def test_cancellation_releases_the_limiter(httpx_mock):
+    httpx_mock.add_callback(_slow)
+
+    task = asyncio.create_task(upstream.get_json("search"))
+    await asyncio.sleep(0.05)
+    assert upstream.get_limiter()._value == upstream.MAX_CONCURRENCY - 1
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+    assert upstream.get_limiter()._value == upstream.MAX_CONCURRENCY
+
+
+@pytest.mark.asyncio
+async def test_transient_status_is_retried(httpx_mock):
+    httpx_mock.add_response(status_code=503)
+    httpx_mock.add_response(json={"TotalCount": 0, "Values": []})
+
+    assert await upstream.get_json("search") == {"TotalCount": 0, "Values": []}
+    assert len(httpx_mock.get_requests()) == 2
+
+
+@pytest.mark.asyncio
+async def test_client_errors_are_not_retried(httpx_mock):
+    httpx_mock.add_response(status_code=404)
+
+    with pytest.raises(httpx.HTTPStatusError):
+        await upstream.get_json("details")
+    assert len(httpx_mock.get_requests()) == 1
+
+
+@pytest.mark.asyncio
+async def test_retries_are_bounded(httpx_mock):
+    httpx_mock.add_exception(httpx.ConnectError("down"), is_reusable=True)
+
+    with pytest.raises(httpx.ConnectError):
+        await upstream.get_json("search")
+    assert len(httpx_mock.get_requests()) == upstream.MAX_RETRIES + 1
+
+
+def test_tool_timeout_from_request_meta():
+    def ctx(meta):
+        return SimpleNamespace(request_context=SimpleNamespace(meta=meta))
+
+    assert tool_timeout(ctx(RequestParams.Meta(timeoutMs=500))) == 0.5
+    assert tool_timeout(ctx(RequestParams.Meta(timeoutMs=10_000_000))) == DEFAULT_TOOL_TIMEOUT
+    assert tool_timeout(ctx(None)) == DEFAULT_TOOL_TIMEOUT